@@ -51,6 +51,19 @@ def main():
     print("\nSales by year and status:")
     print(sales_by_year_status)
 
+    # Detail rows, per-year subtotals and the grand total from one query.
+    # Rolled-up keys are NULL; grouping_id is 0 for detail rows, 1 for a
+    # year's subtotal and 3 for the grand total.
+    sales_with_subtotals = (
+        order_items.group_by("created_year", "status")
+        .aggregate("order_count", "total_sales")
+        .with_subtotals()
+        .order_by("created_year", "grouping_id", "status")
+        .execute()
+    )
+    print("\nSales by year and status, with subtotals:")
+    print(sales_with_subtotals)
+
 
 if __name__ == "__main__":
     main()
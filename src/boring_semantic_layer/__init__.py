@@ -14,6 +14,11 @@ from .api import (
 from .config import (
     options,
 )
+from .connections import (
+    ConnectionRegistry,
+    close_connections,
+    connection_registry,
+)
 from .errors import (
     BackendError,
     BSLError,
@@ -32,10 +37,33 @@ from .ops import (
     Dimension,
     Measure,
 )
+from .pagination import (
+    Page,
+    ResultPager,
+)
 from .profile import (
     ProfileError,
     get_connection,
 )
+from .query_profile import QueryProfile
+from .result_cache import (
+    clear_result_cache,
+    register_data_version,
+    result_cache_info,
+)
+from .single_flight import SingleFlight
+from .time_range import (
+    TimeRange,
+    TimeRangeCache,
+)
+from .tracing import (
+    QueryTrace,
+    trace,
+)
+from .value_index import (
+    DimensionValueIndex,
+    DimensionValueIndexStore,
+)
 from .yaml import (
     from_config,
     from_yaml,
@@ -64,6 +92,22 @@ __all__ = [
     "options",
     "ProfileError",
     "get_connection",
+    "ConnectionRegistry",
+    "close_connections",
+    "connection_registry",
+    "clear_result_cache",
+    "register_data_version",
+    "result_cache_info",
+    "SingleFlight",
+    "QueryProfile",
+    "Page",
+    "ResultPager",
+    "QueryTrace",
+    "trace",
+    "DimensionValueIndex",
+    "DimensionValueIndexStore",
+    "TimeRange",
+    "TimeRangeCache",
 ]
 
 
@@ -1,5 +1,4 @@
 import json
-import re
 import sys
 from collections.abc import Mapping
 from pathlib import Path
@@ -10,7 +9,11 @@ from fastmcp import FastMCP
 from pydantic import Field
 from pydantic.functional_validators import BeforeValidator
 
+from ...pagination import ResultPager, query_key
 from ...query import find_time_dimension
+from ...single_flight import SingleFlight, request_key
+from ...time_range import TimeRangeCache
+from ...value_index import DimensionValueIndexStore, MatchMode
 from ..utils.chart_handler import generate_chart_with_data
 from ..utils.prompts import load_prompt
 
@@ -53,6 +56,14 @@ class MCPSemanticModel(FastMCP):
     ):
         super().__init__(name=name, instructions=instructions, **kwargs)
         self.models = models
+        # Per-dimension value/frequency indexes backing search_dimension_values.
+        self.value_indexes = DimensionValueIndexStore()
+        # Per-time-dimension min/max backing get_time_range.
+        self.time_ranges = TimeRangeCache()
+        # Identical query tool calls in flight share one execution.
+        self.single_flight = SingleFlight()
+        # Results kept between pages of paginated query_model calls.
+        self.pager = ResultPager()
         self._register_tools()
 
     def _register_tools(self):
@@ -114,20 +125,7 @@ class MCPSemanticModel(FastMCP):
             if not time_dim_name:
                 raise ValueError(f"Model {model_name} has no time dimension")
 
-            # Access column directly from table to avoid Deferred recursion issue
-            # time_dim.expr(tbl) returns a Deferred object that causes infinite
-            # recursion when passed to tbl.aggregate()
-            tbl = model.table
-            # For joined models, dimension names have table prefix (e.g., 'flights.flight_date')
-            # but the actual column name is just the part after the dot ('flight_date')
-            col_name = time_dim_name.split(".")[-1] if "." in time_dim_name else time_dim_name
-            time_col = tbl[col_name]
-            result = tbl.aggregate(start=time_col.min(), end=time_col.max()).execute()
-
-            return {
-                "start": result["start"].iloc[0].isoformat(),
-                "end": result["end"].iloc[0].isoformat(),
-            }
+            return self.time_ranges.get(model_name, model, time_dim_name).as_dict()
 
         @self.tool(
             name="query_model",
@@ -241,32 +239,80 @@ class MCPSemanticModel(FastMCP):
                     description=load_prompt(PROMPTS_DIR, "tool-query-param-chart_spec.md"),
                 ),
             ] = None,
+            page_size: Annotated[
+                int | None,
+                Field(
+                    default=None,
+                    ge=1,
+                    description=load_prompt(PROMPTS_DIR, "tool-query-param-page_size.md"),
+                ),
+            ] = None,
+            cursor: Annotated[
+                str | None,
+                Field(
+                    default=None,
+                    description=load_prompt(PROMPTS_DIR, "tool-query-param-cursor.md"),
+                ),
+            ] = None,
         ) -> str:
             if model_name not in self.models:
                 raise ValueError(f"Model {model_name} not found")
+            if cursor is not None and page_size is None:
+                raise ValueError("cursor requires page_size")
 
             model = self.models[model_name]
-            query_result = model.query(
-                dimensions=dimensions,
-                measures=measures,
-                filters=filters or [],
-                order_by=order_by,
-                limit=limit,
-                time_grain=time_grain,
-                time_grains=time_grains,
-                time_range=time_range,
-            )
+            spec = {
+                "dimensions": dimensions,
+                "measures": measures,
+                "filters": filters or [],
+                "order_by": order_by,
+                "limit": limit,
+                "time_grain": time_grain,
+                "time_grains": time_grains,
+                "time_range": time_range,
+            }
 
-            return generate_chart_with_data(
-                query_result,
-                get_records=get_records,
-                records_limit=records_limit,
-                get_chart=get_chart,
-                chart_backend=chart_backend,
-                chart_format=chart_format,
-                chart_spec=chart_spec,
-                default_backend="altair",
+            def run() -> str:
+                query_result = model.query(**spec)
+                if page_size is not None:
+                    page = self.pager.page(
+                        query_result,
+                        key=query_key(model, spec),
+                        page_size=page_size,
+                        cursor=cursor,
+                        order_by=order_by,
+                    )
+                    response = {
+                        "columns": list(page.rows.columns),
+                        "records": json.loads(
+                            page.rows.to_json(orient="records", date_format="iso")
+                        ),
+                        "next_cursor": page.next_cursor,
+                    }
+                    if page.total_rows is not None:
+                        response["total_rows"] = page.total_rows
+                    return json.dumps(response)
+                return generate_chart_with_data(
+                    query_result,
+                    get_records=get_records,
+                    records_limit=records_limit,
+                    get_chart=get_chart,
+                    chart_backend=chart_backend,
+                    chart_format=chart_format,
+                    chart_spec=chart_spec,
+                    default_backend="altair",
+                )
+
+            key = request_key(
+                "query_model",
+                model_name,
+                id(model),
+                [dimensions, measures, filters, order_by, limit],
+                [time_grain, time_grains, time_range],
+                [get_records, records_limit, get_chart, chart_backend, chart_format, chart_spec],
+                [page_size, cursor],
             )
+            return self.single_flight.do(key, run)
 
         @self.tool(
             name="compare_periods",
@@ -398,29 +444,40 @@ class MCPSemanticModel(FastMCP):
                 raise ValueError(f"Model {model_name} not found")
 
             model = self.models[model_name]
-            query_result = model.compare_periods(
-                dimensions=dimensions,
-                measures=measures,
-                current_time_range=current_time_range,
-                previous_time_range=previous_time_range,
-                filters=filters or [],
-                time_dimension=time_dimension,
-                time_grain=time_grain,
-                time_grains=time_grains,
-                order_by=order_by,
-                limit=limit,
-            )
 
-            return generate_chart_with_data(
-                query_result,
-                get_records=get_records,
-                records_limit=records_limit,
-                get_chart=get_chart,
-                chart_backend=chart_backend,
-                chart_format=chart_format,
-                chart_spec=chart_spec,
-                default_backend="altair",
+            def run() -> str:
+                query_result = model.compare_periods(
+                    dimensions=dimensions,
+                    measures=measures,
+                    current_time_range=current_time_range,
+                    previous_time_range=previous_time_range,
+                    filters=filters or [],
+                    time_dimension=time_dimension,
+                    time_grain=time_grain,
+                    time_grains=time_grains,
+                    order_by=order_by,
+                    limit=limit,
+                )
+                return generate_chart_with_data(
+                    query_result,
+                    get_records=get_records,
+                    records_limit=records_limit,
+                    get_chart=get_chart,
+                    chart_backend=chart_backend,
+                    chart_format=chart_format,
+                    chart_spec=chart_spec,
+                    default_backend="altair",
+                )
+
+            key = request_key(
+                "compare_periods",
+                model_name,
+                id(model),
+                [dimensions, measures, current_time_range, previous_time_range, filters],
+                [time_dimension, time_grain, time_grains, order_by, limit],
+                [get_records, records_limit, get_chart, chart_backend, chart_format, chart_spec],
             )
+            return self.single_flight.do(key, run)
 
         @self.tool(
             name="search_dimension_values",
@@ -431,6 +488,15 @@ class MCPSemanticModel(FastMCP):
             dimension_name: str,
             search_term: str | None = None,
             limit: int = 20,
+            match: Annotated[
+                MatchMode,
+                Field(
+                    description=(
+                        "'contains' matches the search term anywhere in a value; "
+                        "'prefix' only at the start."
+                    ),
+                ),
+            ] = "contains",
         ) -> dict:
             if model_name not in self.models:
                 raise ValueError(f"Model '{model_name}' not found")
@@ -444,78 +510,10 @@ class MCPSemanticModel(FastMCP):
                     f"Available dimensions: {list(dims.keys())}"
                 )
 
-            from boring_semantic_layer.nested_compile import get_ibis_module as _get_ibis_module
-
-            dim = dims[dimension_name]
-            tbl = model.table
-            # Match the ibis module of the underlying table so sort keys
-            # don't mix plain ibis with xorq-vendored types (which causes
-            # infinite recursion in xorq's ``bind``).
-            ibis_module = _get_ibis_module(tbl)
-            col_expr = dim(tbl)
-
-            # Aggregate by value to get frequency counts
-            agg = (
-                tbl.select(col_expr.name("_value"))
-                .filter(lambda t: t["_value"].notnull())
-                .group_by("_value")
-                .aggregate(frequency=lambda t: t.count())
+            return self.value_indexes.search(
+                model_name, model, dimension_name, search_term, limit, match
             )
 
-            # Total distinct count (before applying search filter)
-            total_distinct = int(agg.count().execute())
-
-            def _to_value_list(df):
-                return [
-                    {"value": str(row["_value"]), "count": int(row["frequency"])}
-                    for _, row in df.iterrows()
-                ]
-
-            def _fetch(base_agg, n):
-                """Fetch top n+1 rows and return (values_list, is_complete)."""
-                df = base_agg.order_by(ibis_module.desc("frequency")).limit(n + 1).execute()
-                complete = len(df) <= n
-                return _to_value_list(df.head(n)), complete
-
-            _SEP = r"[\s\-_.,]+"
-
-            # Apply case-insensitive search filter if provided
-            if search_term:
-                search_normalized = re.sub(_SEP, " ", search_term.lower()).strip()
-                filtered_agg = agg.filter(
-                    lambda t: (
-                        t["_value"]
-                        .cast("string")
-                        .lower()
-                        .re_replace(_SEP, " ")
-                        .strip()
-                        .contains(search_normalized)
-                    )
-                )
-                values, is_complete = _fetch(filtered_agg, limit)
-
-                # Fallback: if search returned nothing, show top values as reference
-                if not values:
-                    fallback_values, fallback_complete = _fetch(agg, limit)
-                    return {
-                        "total_distinct": total_distinct,
-                        "is_complete": fallback_complete,
-                        "values": [],
-                        "fallback_top_values": fallback_values,
-                        "note": (
-                            f"No matches found for '{search_term}'. "
-                            "Showing top values for reference — use one of these exact spellings."
-                        ),
-                    }
-            else:
-                values, is_complete = _fetch(agg, limit)
-
-            return {
-                "total_distinct": total_distinct,
-                "is_complete": is_complete,
-                "values": values,
-            }
-
 
 def create_mcp_server(
     models: Mapping[str, Any],
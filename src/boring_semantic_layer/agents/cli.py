@@ -298,6 +298,7 @@ def cmd_serve(args):
         port=args.port,
         reload=args.reload,
         cors_origins=cors_origins,
+        reload_models=getattr(args, "reload_models", False),
     )
 
 
@@ -462,6 +463,11 @@ def main():
         action="store_true",
         help="Enable auto-reload on code changes (development only)",
     )
+    serve_parser.add_argument(
+        "--reload-models",
+        action="store_true",
+        help="Watch the config and swap in edited models without restarting",
+    )
     serve_parser.add_argument(
         "--cors-origins",
         help="Comma-separated CORS allowlist. Defaults to BSL_CORS_ORIGINS or no origins.",
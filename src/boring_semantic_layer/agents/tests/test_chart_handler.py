@@ -862,3 +862,55 @@ class TestChartTypeOverride:
         )
         # Result is None for plotext static format (renders to terminal)
         assert result is None  # plotext static format returns None after rendering
+
+
+@pytest.fixture
+def airports_query():
+    import ibis
+
+    from boring_semantic_layer import to_semantic_table
+
+    tbl = ibis.memtable({"origin": [f"AIRPORT_{i:02d}" for i in range(30)], "delay": range(30)})
+    model = (
+        to_semantic_table(tbl, name="airports")
+        .with_dimensions(origin=lambda t: t.origin)
+        .with_measures(flight_count=lambda t: t.count())
+    )
+    return model.group_by("origin").aggregate("flight_count").order_by("origin")
+
+
+def test_records_limit_is_pushed_into_query(airports_query):
+    """Only records_limit rows are fetched; total_rows comes from a COUNT(*)."""
+    from boring_semantic_layer.expr import SemanticTable
+
+    fetched = []
+    execute = SemanticTable.execute
+
+    def spy(self, **kwargs):
+        result = execute(self, **kwargs)
+        fetched.append(len(result))
+        return result
+
+    with patch.object(SemanticTable, "execute", spy):
+        result = json.loads(
+            generate_chart_with_data(airports_query, records_limit=5, get_chart=False)
+        )
+
+    assert fetched == [5]
+    assert result["total_rows"] == 30
+    assert result["returned_rows"] == 5
+    assert [r["origin"] for r in result["records"]] == [f"AIRPORT_{i:02d}" for i in range(5)]
+
+
+def test_records_limit_above_result_size_skips_count(airports_query):
+    from boring_semantic_layer.expr import SemanticTable
+
+    with patch.object(SemanticTable, "row_count") as row_count:
+        result = json.loads(
+            generate_chart_with_data(airports_query, records_limit=50, get_chart=False)
+        )
+
+    row_count.assert_not_called()
+    assert result["total_rows"] == 30
+    assert len(result["records"]) == 30
+    assert "returned_rows" not in result
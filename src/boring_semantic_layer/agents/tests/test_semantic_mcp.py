@@ -337,6 +337,30 @@ class TestQueryModel:
 
             assert result.content[0].text is not None
 
+    @pytest.mark.asyncio
+    async def test_query_with_page_size_returns_cursor_pages(self, sample_models):
+        """Test paging through a query result with cursors."""
+        mcp = MCPSemanticModel(models=sample_models)
+        query = {
+            "model_name": "flights",
+            "dimensions": ["carrier"],
+            "measures": ["flight_count"],
+            "order_by": [["carrier", "asc"]],
+            "page_size": 2,
+        }
+
+        async with Client(mcp) as client:
+            first = json.loads((await client.call_tool("query_model", query)).content[0].text)
+            second = json.loads(
+                (await client.call_tool("query_model", {**query, "cursor": first["next_cursor"]}))
+                .content[0]
+                .text
+            )
+
+        assert [r["carrier"] for r in first["records"]] == ["AA", "DL"]
+        assert [r["carrier"] for r in second["records"]] == ["UA"]
+        assert second["next_cursor"] is None
+
     @pytest.mark.asyncio
     async def test_query_with_get_chart_false_returns_records_only(self, sample_models):
         """Test query with get_chart=False returns only records."""
@@ -637,7 +661,7 @@ class TestDescriptionSupport:
         flights_data = pd.DataFrame(
             {"carrier": ["AA", "UA"], "distance": [100, 200]},
         )
-        flights_tbl = con.create_table("flights", flights_data, overwrite=True)
+        flights_tbl = con.create_table("flights_described", flights_data, overwrite=True)
 
         flights = (
             to_semantic_table(
@@ -664,7 +688,7 @@ class TestDescriptionSupport:
         flights_data = pd.DataFrame(
             {"carrier": ["AA", "UA"], "distance": [100, 200]},
         )
-        flights_tbl = con.create_table("flights", flights_data, overwrite=True)
+        flights_tbl = con.create_table("flights_described", flights_data, overwrite=True)
 
         flights = (
             to_semantic_table(flights_tbl, name="flights")
@@ -689,8 +713,8 @@ class TestDescriptionSupport:
         carriers_data = pd.DataFrame(
             {"code": ["AA", "UA"], "name": ["American", "United"]},
         )
-        flights_tbl = con.create_table("flights", flights_data, overwrite=True)
-        carriers_tbl = con.create_table("carriers", carriers_data, overwrite=True)
+        flights_tbl = con.create_table("flights_described", flights_data, overwrite=True)
+        carriers_tbl = con.create_table("carriers_described", carriers_data, overwrite=True)
 
         flights = (
             to_semantic_table(
@@ -15,6 +15,7 @@ from langchain_core.tools import ToolException
 from boring_semantic_layer.agents.utils.chart_handler import generate_chart_with_data
 from boring_semantic_layer.agents.utils.prompts import load_prompt
 from boring_semantic_layer.safe_eval import safe_eval
+from boring_semantic_layer.single_flight import SingleFlight, request_key
 from boring_semantic_layer.yaml import from_yaml
 
 
@@ -161,6 +162,7 @@ class BSLTools:
         self.profile_file = profile_file
         self.chart_backend = chart_backend
         self._error_callback: Callable[[str], None] | None = None
+        self._single_flight = SingleFlight()
         self.models = from_yaml(
             str(model_path),
             profile=profile,
@@ -304,7 +306,7 @@ class BSLTools:
         # Extract model name for error context
         model_name = self._extract_model_name(query)
 
-        try:
+        def run() -> str:
             # Match the models' ibis flavor so agent-built literals
             # (ibis.literal, ibis.cases, ...) compose with the tables.
             ibis_module = _models_ibis_module(self.models)
@@ -328,6 +330,17 @@ class BSLTools:
                 return_json=False,  # CLI mode: show table in terminal
                 error_callback=self._error_callback,
             )
+
+        try:
+            # Identical calls in flight share one execution; only the
+            # executing call renders the table and chart in the terminal.
+            key = request_key(
+                id(self.models),
+                query.strip(),
+                [get_records, records_limit, records_displayed_limit],
+                [get_chart, chart_backend, chart_format, chart_spec],
+            )
+            return self._single_flight.do(key, run)
         except Exception as e:
             error_str = str(e)
             # Truncate error to avoid context overflow (Ibis repr can be huge)
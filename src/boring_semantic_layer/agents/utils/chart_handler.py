@@ -8,6 +8,8 @@ from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
+from boring_semantic_layer.tracing import phase
+
 
 def _enhance_error_message(error: Exception) -> str:
     """Enhance error messages with helpful tips for LLM agents."""
@@ -85,7 +87,8 @@ def _render_cli_chart(
     open_in_browser = backend in ("altair", "plotly")
     try:
         if open_in_browser:
-            chart_obj = query_result.chart(spec=spec, backend=backend, format="static")
+            with phase("chart"):
+                chart_obj = query_result.chart(spec=spec, backend=backend, format="static")
             chart_url = _open_chart_in_browser(chart_obj, backend)
             if chart_url:
                 print(f"\n📊 Chart opened in browser ({backend}): {chart_url}")
@@ -96,7 +99,8 @@ def _render_cli_chart(
                 error_callback(msg) if error_callback else print(f"\n{msg}")
                 return error_str
         else:
-            query_result.chart(spec=spec, backend=backend, format=format_type)
+            with phase("chart"):
+                query_result.chart(spec=spec, backend=backend, format=format_type)
             return None
     except Exception as e:
         # Truncate long error messages (Ibis can produce huge expression dumps)
@@ -112,6 +116,25 @@ def _render_cli_chart(
         return error_str
 
 
+def _execute(query_result: Any, fetch_limit: int | None) -> tuple[Any, int]:
+    """Execute ``query_result`` fetching at most ``fetch_limit`` rows.
+
+    Returns the fetched rows and the total row count. For semantic
+    expressions the limit is pushed into the query and, when the limited
+    fetch comes back full, the total is counted by the backend, so large
+    results are never transferred just to be sliced.
+    """
+    from boring_semantic_layer.expr import SemanticTable
+
+    if fetch_limit is None or not isinstance(query_result, SemanticTable):
+        result_df = query_result.execute()
+        return result_df, len(result_df)
+    result_df = query_result.limit(fetch_limit).execute()
+    if len(result_df) < fetch_limit:
+        return result_df, len(result_df)
+    return result_df, query_result.row_count()
+
+
 def generate_chart_with_data(
     query_result: Any,
     get_records: bool = True,
@@ -126,8 +149,17 @@ def generate_chart_with_data(
     error_callback: Callable[[str], None] | None = None,
 ) -> str:
     """Generate chart from query result with control over records and chart output."""
+    if not get_records:
+        fetch_limit: int | None = 0
+    elif not records_limit:
+        fetch_limit = None
+    elif return_json:
+        fetch_limit = records_limit
+    else:
+        display_limit = records_displayed_limit if records_displayed_limit is not None else 10
+        fetch_limit = max(records_limit, display_limit)
     try:
-        result_df = query_result.execute()
+        result_df, total_rows = _execute(query_result, fetch_limit)
     except Exception as e:
         enhanced_error = _enhance_error_message(e)
         error_msg = f"❌ Query Execution Error: {enhanced_error}"
@@ -135,7 +167,6 @@ def generate_chart_with_data(
             error_callback(error_msg) if error_callback else print(f"\n{error_msg}\n")
         return json.dumps({"error": enhanced_error}) if return_json else error_msg
 
-    total_rows = len(result_df)
     columns = list(result_df.columns)
     backend = chart_backend or default_backend
     # Accept both formats: {"spec": {...}} (legacy) or {"chart_type": "bar"} (direct)
@@ -147,7 +178,8 @@ def generate_chart_with_data(
 
     # CLI mode
     if not return_json:
-        all_records = json.loads(result_df.to_json(orient="records", date_format="iso"))
+        with phase("convert"):
+            all_records = json.loads(result_df.to_json(orient="records", date_format="iso"))
 
         if get_records:
             from boring_semantic_layer.chart.plotext_chart import display_table
@@ -194,7 +226,8 @@ def generate_chart_with_data(
     # JSON/API mode
     records = None
     if get_records:
-        all_records = json.loads(result_df.to_json(orient="records", date_format="iso"))
+        with phase("convert"):
+            all_records = json.loads(result_df.to_json(orient="records", date_format="iso"))
         records = all_records[:records_limit] if records_limit else all_records
 
     def build_response(**kwargs: Any) -> str:
@@ -221,7 +254,8 @@ def generate_chart_with_data(
         )
 
     try:
-        chart_result = query_result.chart(spec=spec, backend=backend, format=format_type)
+        with phase("chart"):
+            chart_result = query_result.chart(spec=spec, backend=backend, format=format_type)
         if format_type == "json":
             chart_data = (
                 chart_result
@@ -15,11 +15,62 @@ from ._xorq import Config
 class Options(Config):
     """Boring Semantic Layer configuration options.
 
-    Currently, all optimizations are always enabled and built into the relation
-    operations. This configuration class is reserved for future configuration options.
+    Projection pushdown is always enabled and built into the relation
+    operations; the options below tune behaviour that trades memory for speed.
+
+    Attributes:
+        compile_cache: Memoize compiled aggregate plans keyed by the structural
+            shape of the query, so repeated queries skip recompilation.
+        compile_cache_size: Maximum number of cached plans (LRU eviction).
+        result_cache: Cache executed query results keyed by the query's
+            fingerprint and the data versions of its sources (opt-in).
+        result_cache_max_bytes: Memory budget of the result cache; least
+            recently used results are evicted beyond it.
+        result_cache_ttl: Seconds after which a cached result expires
+            regardless of data versions; ``None`` disables expiry.
+        value_index_dir: Directory where dimension value indexes used by
+            value search are persisted as parquet; ``None`` keeps them in
+            memory only.
+        value_index_max_age: Seconds after which a dimension value index is
+            refreshed with the rows past its watermark even when no source
+            data version changed; ``None`` refreshes only on data-version
+            changes, which rebuild it.
+        time_range_max_age: Seconds after which a cached time range is
+            recomputed even when no source data version changed; ``None``
+            recomputes only on data-version changes.
+        connection_registry: Share one connection per resolved profile
+            config across ``get_connection`` calls instead of reconnecting.
+            Off by default: callers of a shared connection also share its
+            session state (settings, temporary objects, transactions).
+        connection_health_check_interval: Minimum seconds between health
+            checks of a shared connection when it is handed out; ``None``
+            disables them.
+        thread_cursors: Execute semantic queries issued outside the main
+            thread on a per-thread cursor of their DuckDB backend, so
+            threads sharing one embedded database query it concurrently.
+            Applies to backends opened from a profile only; queries a
+            cursor cannot resolve (TEMP tables) run on the shared
+            connection one thread at a time.
+        page_cache_rows: Results of at most this many rows are kept in
+            memory by ``ResultPager`` while they are paged through; larger
+            results are paged by keyset queries on the backend.
+        page_cache_max_age: Seconds a result kept for paging is served;
+            ``None`` keeps it until evicted or its data version changes.
     """
 
-    pass
+    compile_cache: bool = True
+    compile_cache_size: int = 256
+    result_cache: bool = False
+    result_cache_max_bytes: int = 256 * 1024 * 1024
+    result_cache_ttl: float | None = None
+    value_index_dir: str | None = None
+    value_index_max_age: float | None = 300.0
+    time_range_max_age: float | None = 300.0
+    connection_registry: bool = False
+    connection_health_check_interval: float | None = 30.0
+    thread_cursors: bool = True
+    page_cache_rows: int = 10_000
+    page_cache_max_age: float | None = 300.0
 
 
 # Global options instance
@@ -0,0 +1,274 @@
+"""Process-wide registry of backend connections built from profiles.
+
+``get_connection`` opens a new connection, and re-registers every parquet
+table of the profile, on each call. With ``options.connection_registry``
+on, the registry instead keeps one shared connection per resolved profile
+config (environment variables expanded), so models loaded from the same
+profile by the server, agent workers and YAML loaders share a connection
+and its loaded tables. Sharing is opt-in: callers then also share session
+state (``SET`` options, temporary objects, open transactions). With it
+off, connections are only tracked (``track``) for their per-thread
+connections.
+
+Threads executing concurrently should not share one connection object:
+
+* for DuckDB, ``thread_backend`` hands each thread its own cursor on the
+  shared database, with the temporary views of the shared connection (the
+  parquet tables a profile loads) replayed onto it;
+* for other backends registered from a profile, each thread gets a pooled
+  connection built from the same config.
+
+Shared connections are health-checked at most every
+``options.connection_health_check_interval`` seconds when handed out, and
+reconnected if the check fails; the failed connection is closed, and
+models still built on it must be reloaded. ``close`` disconnects them
+explicitly.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+import weakref
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from attrs import define, field
+
+from .config import options
+
+logger = logging.getLogger(__name__)
+
+
+def config_key(config: Mapping[str, Any]) -> str:
+    """Canonical key of a resolved profile config."""
+    return json.dumps(config, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _disconnect(con: Any) -> None:
+    try:
+        con.disconnect()
+    except Exception:  # noqa: BLE001 - a broken connection is dropped anyway
+        logger.debug("disconnect failed", exc_info=True)
+
+
+def _is_healthy(con: Any) -> bool:
+    """Cheap round trip to the backend."""
+    try:
+        raw = getattr(con, "con", None)
+        if getattr(con, "name", None) == "duckdb" and raw is not None:
+            # DuckDB's ``execute`` (and so ``raw_sql``) returns the shared
+            # connection itself, which must not be closed.
+            raw.execute("SELECT 1").fetchall()
+            return True
+        raw_sql = getattr(con, "raw_sql", None)
+        if raw_sql is None:
+            con.list_tables()
+            return True
+        result = raw_sql("SELECT 1")
+        close = getattr(result, "close", None)
+        if callable(close) and result is not raw:
+            close()
+        return True
+    except Exception:  # noqa: BLE001 - any failure means reconnect
+        logger.debug("health check failed", exc_info=True)
+        return False
+
+
+def _duckdb_cursor(con: Any) -> Any | None:
+    """A backend on a new cursor of DuckDB backend ``con``, with its temp views."""
+    raw = getattr(con, "con", None)
+    from_connection = getattr(type(con), "from_connection", None)
+    if raw is None or from_connection is None:
+        return None
+    views = [
+        sql
+        for (sql,) in raw.execute(
+            "SELECT sql FROM duckdb_views() WHERE temporary AND NOT internal"
+        ).fetchall()
+    ]
+    cursor = from_connection(raw.cursor())
+    for sql in views:
+        cursor.con.execute(sql)
+    return cursor
+
+
+@define
+class _Entry:
+    # The connection, or a weak reference to an adopted one.
+    target: Any
+    con_id: int
+    connect: Callable[[], Any] | None
+    poolable: bool
+    key: str | None = None
+    checked: float = field(factory=time.monotonic)
+    threads: dict[int, Any] = field(factory=dict)
+    # Serializes worker-thread queries that fall back to the connection itself.
+    lock: threading.Lock = field(factory=threading.Lock)
+
+    @property
+    def connection(self) -> Any:
+        return self.target() if isinstance(self.target, weakref.ref) else self.target
+
+
+class ConnectionRegistry:
+    """Shared connections keyed by resolved profile config.
+
+    Thread-safe; ``connection_registry`` is the process-wide instance used
+    by ``get_connection``.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_key: dict[str, _Entry] = {}
+        self._by_id: dict[int, _Entry] = {}
+
+    def get(
+        self,
+        config: Mapping[str, Any],
+        connect: Callable[[], Any],
+        *,
+        poolable: bool = True,
+    ) -> Any:
+        """The shared connection for ``config``, created with ``connect()`` if missing.
+
+        ``poolable`` says whether ``connect()`` may also be called to open
+        per-thread connections of non-DuckDB backends.
+        """
+        key = config_key(config)
+        with self._lock:
+            entry = self._by_key.get(key)
+            if entry is not None and self._healthy(entry):
+                return entry.connection
+            if entry is not None:
+                logger.warning(
+                    "reconnecting %s backend after failed health check", config.get("type")
+                )
+                self._drop(key, entry)
+            con = connect()
+            entry = _Entry(con, id(con), connect, poolable, key)
+            self._by_key[key] = entry
+            self._by_id[id(con)] = entry
+            return con
+
+    def track(self, con: Any, connect: Callable[[], Any], *, poolable: bool = True) -> Any:
+        """Hand out per-thread connections for ``con`` without sharing it.
+
+        ``con`` is tracked weakly: once it is garbage collected, its
+        per-thread connections are closed. Returns ``con``.
+        """
+        with self._lock:
+            entry = _Entry(weakref.ref(con), id(con), connect, poolable)
+            try:
+                weakref.finalize(con, self._forget, entry)
+            except TypeError:
+                return con
+            self._by_id[id(con)] = entry
+        return con
+
+    def thread_backend(self, con: Any, *, refresh: bool = False) -> Any:
+        """The connection the calling thread should execute ``con``'s queries on.
+
+        Only backends opened from a profile are split: DuckDB backends get a
+        cursor per thread, others a pooled connection per thread. Anything
+        else, such as a user's own ``ibis.duckdb.connect()`` whose temp
+        tables a cursor could not see, is returned as is. ``refresh``
+        replaces the calling thread's connection, e.g. to pick up temporary
+        views created since.
+        """
+        thread = threading.get_ident()
+        with self._lock:
+            entry = self._entry_of(con)
+            if entry is None:
+                return con
+            backend = entry.threads.get(thread)
+            if refresh and backend is not None:
+                del entry.threads[thread]
+                if backend is not con:
+                    _disconnect(backend)
+                backend = None
+            if backend is None:
+                backend = self._open_for_thread(entry)
+                entry.threads[thread] = backend
+            return backend
+
+    def shared_lock(self, con: Any) -> threading.Lock | None:
+        """Lock serializing worker-thread queries run on ``con`` itself, if tracked."""
+        with self._lock:
+            entry = self._entry_of(con)
+            return entry.lock if entry is not None else None
+
+    def config_key_of(self, con: Any) -> str | None:
+        """``config_key`` of the profile config ``con`` was opened from, if any."""
+        with self._lock:
+            entry = self._entry_of(con)
+            return entry.key if entry is not None else None
+
+    def close(self, con: Any | None = None) -> None:
+        """Disconnect ``con`` and its per-thread connections (all if ``None``).
+
+        Tracked connections (see ``track``) belong to their caller: only
+        their per-thread connections are closed.
+        """
+        with self._lock:
+            for key, entry in list(self._by_key.items()):
+                if con is None or entry.connection is con:
+                    self._drop(key, entry)
+            for entry in list(self._by_id.values()):
+                if con is None or entry.connection is con:
+                    self._drop(None, entry)
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def _healthy(self, entry: _Entry) -> bool:
+        interval = options.connection_health_check_interval
+        now = time.monotonic()
+        if interval is None or now - entry.checked < interval:
+            return True
+        entry.checked = now
+        return _is_healthy(entry.connection)
+
+    def _entry_of(self, con: Any) -> _Entry | None:
+        entry = self._by_id.get(id(con))
+        return entry if entry is not None and entry.connection is con else None
+
+    def _forget(self, entry: _Entry) -> None:
+        with self._lock:
+            self._drop(None, entry)
+
+    def _open_for_thread(self, entry: _Entry) -> Any:
+        con = entry.connection
+        if getattr(con, "name", None) == "duckdb":
+            try:
+                cursor = _duckdb_cursor(con)
+            except Exception:  # noqa: BLE001 - fall back to the shared connection
+                logger.debug("could not open a DuckDB cursor", exc_info=True)
+                cursor = None
+            return cursor if cursor is not None else con
+        if entry.poolable and entry.connect is not None:
+            return entry.connect()
+        return con
+
+    def _drop(self, key: str | None, entry: _Entry) -> None:
+        if key is not None:
+            self._by_key.pop(key, None)
+        if self._by_id.get(entry.con_id) is entry:
+            del self._by_id[entry.con_id]
+        threads, entry.threads = list(entry.threads.values()), {}
+        for backend in threads:
+            if backend is not entry.connection:
+                _disconnect(backend)
+        if entry.key is not None and entry.connection is not None:
+            _disconnect(entry.connection)
+
+
+#: The process-wide registry used by ``get_connection``.
+connection_registry = ConnectionRegistry()
+
+
+def close_connections() -> None:
+    """Disconnect every connection held by the process-wide registry."""
+    connection_registry.close()
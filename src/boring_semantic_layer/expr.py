@@ -12,14 +12,20 @@ from ibis.expr.types.groupby import GroupedTable as IbisGroupedTable
 from ibis.expr.types.relations import Table as IbisTable
 from returns.result import Success, safe
 
+from . import result_cache
 from ._xorq import (
     GroupedTable,
     Table,
+    get_ibis_module,
 )
+from .config import options
+from .errors import QueryError, SerializationError
 from .measure_scope import MeasureScope
 from .ops import (
     Dimension,
+    IndexStrategy,
     Measure,
+    MeasureAlgebra,
     NestAggSpec,
     SemanticAggregateOp,
     SemanticFilterOp,
@@ -43,7 +49,10 @@ from .ops import (
     _normalize_to_name,
     _unwrap,
     make_bare_ref_lambda,
+    reaggregate,
+    rollup,
 )
+from .tracing import annotate, capturing_sql, phase
 
 logger = logging.getLogger(__name__)
 
@@ -122,16 +131,36 @@ _BLOCKED_IBIS_METHODS = [
 def to_untagged(expr):
     from .ops import _rebind_to_canonical_backend
 
-    if isinstance(expr, SemanticTable):
-        return _rebind_to_canonical_backend(expr.op().to_untagged())
+    with phase("compile"):
+        if isinstance(expr, SemanticTable):
+            return _rebind_to_canonical_backend(expr.op().to_untagged())
 
-    result = safe(lambda: expr.to_untagged())()
-    if isinstance(result, Success):
-        return _rebind_to_canonical_backend(result.unwrap())
+        result = safe(lambda: expr.to_untagged())()
+        if isinstance(result, Success):
+            return _rebind_to_canonical_backend(result.unwrap())
 
     raise TypeError(f"Cannot convert {type(expr)} to Ibis expression")
 
 
+def _execute_traced(expr, run: Callable):
+    """``run(expr)`` on the calling thread's backend, timed as the ``execute`` phase.
+
+    When an active trace captures SQL, it is also generated up front (phase
+    ``sql``) and attached to the trace; otherwise it is only compiled by the
+    backend.
+    """
+    from .ops import _execute_on_thread_backend
+
+    if capturing_sql():
+        with phase("sql"):
+            try:
+                annotate("sql", ibis.to_sql(expr))
+            except Exception:  # noqa: BLE001 - not every backend renders SQL
+                logger.debug("could not render SQL for the query trace", exc_info=True)
+    with phase("execute"):
+        return _execute_on_thread_backend(expr, run)
+
+
 def _flatten_group_keys(keys: tuple) -> tuple:
     """Flatten list/tuple arguments so ``group_by(["a", "b"])`` works like ibis."""
     flat: list = []
@@ -155,6 +184,18 @@ def _query_module():
     return importlib.import_module("boring_semantic_layer.query")
 
 
+def _source_tables(expr) -> tuple[list[tuple[str, Any]], list[Any]]:
+    """``(name, backend)`` of each physical table an untagged expression reads, and its backends."""
+    tables: dict[tuple[str, int], tuple[str, Any]] = {}
+    owners: dict[int, Any] = {}
+    for node in expr.op().find(lambda n: type(n).__name__ in ("DatabaseTable", "Read")):
+        source = getattr(node, "source", None)
+        tables[(node.name, id(source))] = (node.name, source)
+        if source is not None:
+            owners[id(source)] = source
+    return [tables[key] for key in sorted(tables)], list(owners.values())
+
+
 def to_tagged(expr, aggregate_cache_storage=None):
     # Serialization sits above the expression layer; resolve at call time
     # (see _query_module).
@@ -273,6 +314,7 @@ class SemanticTable(ir.Table):
         time_grains: dict[str, str] | None = None,
         time_range: dict[str, str] | None = None,
         having: Sequence[dict] | None = None,
+        sample: float | None = None,
     ):
         """Run a declarative (JSON-style) query against this semantic table.
 
@@ -280,18 +322,20 @@ class SemanticTable(ir.Table):
         grouped/aggregated results). See ``boring_semantic_layer.query.query``
         for parameter semantics and worked examples.
         """
-        return _query_module().query(
-            semantic_table=self,
-            dimensions=dimensions,
-            measures=measures,
-            filters=filters,
-            order_by=order_by,
-            limit=limit,
-            time_grain=time_grain,
-            time_grains=time_grains,
-            time_range=time_range,
-            having=having,
-        )
+        with phase("normalize"):
+            return _query_module().query(
+                semantic_table=self,
+                dimensions=dimensions,
+                measures=measures,
+                filters=filters,
+                order_by=order_by,
+                limit=limit,
+                time_grain=time_grain,
+                time_grains=time_grains,
+                time_range=time_range,
+                having=having,
+                sample=sample,
+            )
 
     def compare_periods(
         self,
@@ -305,21 +349,36 @@ class SemanticTable(ir.Table):
         time_grains: dict[str, str] | None = None,
         order_by: Sequence[tuple[str, str] | str] | None = None,
         limit: int | None = None,
+        strategy: str = "auto",
     ):
-        """Compare measures across two time ranges (current/previous/delta)."""
-        return _query_module().compare_periods(
-            semantic_table=self,
-            dimensions=dimensions,
-            measures=measures,
-            current_time_range=current_time_range,
-            previous_time_range=previous_time_range,
-            filters=filters,
-            time_dimension=time_dimension,
-            time_grain=time_grain,
-            time_grains=time_grains,
-            order_by=order_by,
-            limit=limit,
-        )
+        """Compare measures across two time ranges (current/previous/delta).
+
+        ``strategy`` picks the execution plan: ``"single_scan"``,
+        ``"two_query"`` or ``"auto"`` (see ``query.compare_periods``).
+        """
+        with phase("normalize"):
+            return _query_module().compare_periods(
+                semantic_table=self,
+                dimensions=dimensions,
+                measures=measures,
+                current_time_range=current_time_range,
+                previous_time_range=previous_time_range,
+                filters=filters,
+                time_dimension=time_dimension,
+                time_grain=time_grain,
+                time_grains=time_grains,
+                order_by=order_by,
+                limit=limit,
+                strategy=strategy,
+            )
+
+    def query_batch(self, queries: Sequence[Mapping[str, Any]]) -> list:
+        """Run several ``query()`` specs, fusing those that share a scan.
+
+        See ``query.query_batch``: specs differing only in dimensions,
+        measures, ordering and limit are answered from one aggregation.
+        """
+        return _query_module().query_batch(semantic_table=self, queries=queries)
 
     def filter(self, predicate: Callable) -> SemanticFilter:
         return SemanticFilter(source=self.op(), predicate=predicate)
@@ -442,11 +501,67 @@ class SemanticTable(ir.Table):
     def to_tagged(self, aggregate_cache_storage=None):
         return to_tagged(self, aggregate_cache_storage=aggregate_cache_storage)
 
+    def fingerprint(self) -> str:
+        """Deterministic digest of this expression, stable across processes.
+
+        Two expressions share a fingerprint when their model definitions,
+        filters, grouping keys, aggregations and source tables match, which
+        makes it usable as a cache key shared between workers. Raises
+        ``SerializationError`` when part of the expression (e.g. a lambda
+        closing over an arbitrary object) has no stable description.
+        """
+        return self.op().fingerprint()
+
+    def _through_result_cache(self, kind: str, expr, kwargs: Mapping, compute: Callable):
+        """Serve ``compute()`` from the opt-in result cache when possible.
+
+        Calls with execution kwargs (limit, params, ...) and expressions
+        without a stable fingerprint always go to the backend.
+        """
+        if kwargs or not options.result_cache:
+            return compute()
+        try:
+            key = (kind, self.fingerprint())
+        except SerializationError as e:
+            logger.debug("result cache bypassed, expression has no fingerprint: %s", e)
+            return compute()
+        tables, owners = _source_tables(expr)
+        return result_cache.cached_result(key, tables, compute, owners)
+
     def execute(self, **kwargs):
         # Accept kwargs for ibis compatibility (params, limit, etc)
-        from .ops import _rebind_to_canonical_backend
+        expr = to_untagged(self)
+        return self._through_result_cache(
+            "pandas",
+            expr,
+            kwargs,
+            lambda: _execute_traced(expr, lambda e: e.execute(**kwargs)),
+        )
+
+    def row_count(self, **kwargs) -> int:
+        """Number of rows in the result, counted by the backend with ``COUNT(*)``."""
+        expr = to_untagged(self)
+        return int(
+            self._through_result_cache(
+                "count",
+                expr,
+                kwargs,
+                lambda: _execute_traced(expr, lambda e: e.count().execute(**kwargs)),
+            )
+        )
+
+    def profile(self, *, analyze: bool = True):
+        """Execute once and report where the time went, as a ``QueryProfile``.
+
+        Reports time per phase and compile step, the generated SQL's size,
+        joins and subqueries, rows and bytes returned and, where the backend
+        supports it, its ``EXPLAIN ANALYZE`` output (``analyze=False`` skips
+        that second run). See ``boring_semantic_layer.query_profile``.
+        """
+        import importlib
 
-        return _rebind_to_canonical_backend(to_untagged(self)).execute(**kwargs)
+        query_profile = importlib.import_module("boring_semantic_layer.query_profile")
+        return query_profile.profile_query(self, analyze=analyze)
 
     def compile(self, **kwargs):
         from .ops import _rebind_to_canonical_backend
@@ -459,16 +574,34 @@ class SemanticTable(ir.Table):
         return ibis.to_sql(_rebind_to_canonical_backend(to_untagged(self)), **kwargs)
 
     def to_pandas(self, **kwargs):
-        return self.to_untagged().to_pandas(**kwargs)
+        with phase("compile"):
+            expr = self.to_untagged()
+        return self._through_result_cache(
+            "pandas",
+            expr,
+            kwargs,
+            lambda: _execute_traced(expr, lambda e: e.to_pandas(**kwargs)),
+        )
 
     def to_pyarrow(self, **kwargs):
-        return self.to_untagged().to_pyarrow(**kwargs)
+        with phase("compile"):
+            expr = self.to_untagged()
+        return self._through_result_cache(
+            "arrow",
+            expr,
+            kwargs,
+            lambda: _execute_traced(expr, lambda e: e.to_pyarrow(**kwargs)),
+        )
 
     def to_pyarrow_batches(self, **kwargs):
-        return self.to_untagged().to_pyarrow_batches(**kwargs)
+        with phase("compile"):
+            expr = self.to_untagged()
+        return _execute_traced(expr, lambda e: e.to_pyarrow_batches(**kwargs))
 
     def to_polars(self, **kwargs):
-        return self.to_untagged().to_polars(**kwargs)
+        with phase("compile"):
+            expr = self.to_untagged()
+        return _execute_traced(expr, lambda e: e.to_polars(**kwargs))
 
     def to_csv(self, path, **kwargs):
         return self.to_untagged().to_csv(path, **kwargs)
@@ -891,10 +1024,12 @@ def _replace_metadata_preserving_filters(
         source = source.source
 
     source_join = _find_join_provenance(source)
+    rollups: tuple = ()
     if isinstance(source, SemanticTableOp):
         table = source.table
         name = source.name
         description = source.description
+        rollups = source.rollups
     else:
         table = source.to_untagged()
         name = getattr(source, "name", None)
@@ -908,6 +1043,7 @@ def _replace_metadata_preserving_filters(
         name=name,
         description=description,
         _source_join=source_join,
+        rollups=rollups,
     )
     for (
         predicate,
@@ -1008,6 +1144,9 @@ def _replace_metadata_preserving_filters(
         # string filters as well; it controls dimension-table shortcuts.
         if exact_filter_fields:
             bound_predicate.__bsl_filter_fields__ = exact_filter_fields
+        # Rollup routing re-applies the author-time predicate to a rollup
+        # table; it needs the unbound predicate and the scope it was bound to.
+        bound_predicate.__bsl_rebound_from__ = (predicate, predicate_dims)
         if deferred_resolution:
             bound_predicate.__bsl_deferred_resolution__ = True
         # The generic serializer cannot safely infer the semantics of this
@@ -1033,6 +1172,7 @@ class SemanticModel(SemanticTable):
         name: str | None = None,
         description: str | None = None,
         _source_join: Any | None = None,
+        rollups: Sequence[Any] = (),
     ) -> None:
         # Convert ibis → xorq once at the boundary; internal code paths can
         # then assume xorq-vendored tables when the backend is supported.
@@ -1064,6 +1204,7 @@ class SemanticModel(SemanticTable):
             name=derived_name,
             description=description,
             _source_join=_source_join,
+            rollups=rollups,
         )
 
         super().__init__(op)
@@ -1130,6 +1271,7 @@ class SemanticModel(SemanticTable):
             name=self.name,
             description=self.description,
             _source_join=self.op()._source_join,
+            rollups=self.op().rollups,
         )
 
     def with_measures(self, **meas) -> SemanticModel:
@@ -1154,6 +1296,73 @@ class SemanticModel(SemanticTable):
             name=self.name,
             description=self.description,
             _source_join=self.op()._source_join,
+            rollups=self.op().rollups,
+        )
+
+    def with_rollup(
+        self,
+        table: Any,
+        dimensions: Sequence[str],
+        measures: Sequence[str] | Mapping[str, str],
+        time_grains: Mapping[str, str] | None = None,
+        name: str | None = None,
+    ) -> SemanticModel:
+        """Register a materialized rollup that can answer coarser queries.
+
+        ``table`` holds this model pre-aggregated by ``dimensions``: one
+        column per dimension and per measure, named like them. Queries whose
+        grouping keys, JSON filters and measures it covers are compiled
+        against the smallest such rollup instead of the base table; all
+        others still scan the base table.
+
+        Args:
+            table: The pre-aggregated ibis table.
+            dimensions: Model dimensions the rollup is grouped by.
+            measures: Base measures stored in the rollup. A list infers how
+                each re-aggregates (sum and count re-sum, min/max keep their
+                function); a mapping ``{measure: "sum" | "min" | "max"}``
+                states it explicitly.
+            time_grains: Time dimensions stored bucketed, mapped to their
+                grain (``"month"`` or ``"TIME_GRAIN_MONTH"``). Queries at that
+                grain or a coarser derivable one route to the rollup.
+            name: Label used in logs.
+
+        Raises:
+            DefinitionError: If the rollup references unknown fields, lacks
+                columns, or stores a measure that cannot be re-aggregated.
+
+        Examples:
+            >>> flights.with_rollup(
+            ...     con.table("flights_by_carrier_month"),
+            ...     dimensions=["carrier", "arr_time"],
+            ...     measures=["flight_count", "total_distance"],
+            ...     time_grains={"arr_time": "month"},
+            ... )
+        """
+        from .ops import _ensure_xorq_table, make_rollup
+
+        query_module = _query_module()
+        units = {
+            dim: query_module.TIME_GRAIN_TRANSFORMATIONS[query_module._normalize_grain(grain)]
+            for dim, grain in (time_grains or {}).items()
+        }
+        rollup = make_rollup(
+            self.op(),
+            _ensure_xorq_table(table),
+            dimensions=tuple(dimensions),
+            measures=measures,
+            time_grains=units,
+            name=name,
+        )
+        return SemanticModel(
+            table=self.op().table,
+            dimensions=self.get_dimensions(),
+            measures=self.get_measures(),
+            calc_measures=self.get_calculated_measures(),
+            name=self.name,
+            description=self.description,
+            _source_join=self.op()._source_join,
+            rollups=(*self.op().rollups, rollup),
         )
 
     def join_one(
@@ -1245,6 +1454,7 @@ class SemanticModel(SemanticTable):
         selector: str | list[str] | Callable | None = None,
         by: str | None = None,
         sample: int | None = None,
+        strategy: IndexStrategy = "auto",
     ):
         processed_selector = selector
         if selector is not None and "ibis.selectors" in str(type(selector).__module__):
@@ -1260,6 +1470,7 @@ class SemanticModel(SemanticTable):
             selector=processed_selector,
             by=by,
             sample=sample,
+            strategy=strategy,
         )
 
     def to_untagged(self):
@@ -1356,6 +1567,7 @@ class SemanticJoin(SemanticTable):
         selector: str | list[str] | Callable | None = None,
         by: str | None = None,
         sample: int | None = None,
+        strategy: IndexStrategy = "auto",
     ):
         processed_selector = selector
         if selector is not None and "ibis.selectors" in str(type(selector).__module__):
@@ -1371,6 +1583,7 @@ class SemanticJoin(SemanticTable):
             selector=processed_selector,
             by=by,
             sample=sample,
+            strategy=strategy,
         )
 
     def to_untagged(self):
@@ -1962,6 +2175,171 @@ class SemanticAggregate(SemanticTable):
     def nested_columns(self):
         return self.op().nested_columns
 
+    def measure_algebra(self) -> dict[str, MeasureAlgebra]:
+        """How each aggregated measure merges across grains.
+
+        Maps result columns to their :class:`MeasureAlgebra`: additive
+        (sum/count), semi-additive (min/max), decomposable (mean, variance,
+        stddev) or holistic (count-distinct, median, calculated measures).
+        Columns that are not measure references are omitted.
+        """
+        return self.op().measure_algebra()
+
+    def to_states(self):
+        """Run-ready ibis table of group keys plus mergeable measure states.
+
+        Decomposable measures are emitted as their partial states (a mean
+        as ``<name>__sum``/``<name>__count``); additive and semi-additive
+        measures keep their own column. Materialize it once and derive
+        coarser grains with :meth:`reaggregate`. Raises ``QueryError`` if
+        any measure is holistic.
+        """
+        from .ops import _rebind_to_canonical_backend
+
+        table, _ = self.op().to_states()
+        return _rebind_to_canonical_backend(table)
+
+    def _reaggregation_algebras(self, by: Sequence[str]) -> dict[str, MeasureAlgebra]:
+        """Algebras for merging this aggregate to ``by``; ``QueryError`` if unsound."""
+        unknown = [key for key in by if key not in self.op().keys]
+        if unknown:
+            raise QueryError(
+                f"Cannot re-aggregate by {unknown}: not group keys of this aggregate "
+                f"{list(self.op().keys)}"
+            )
+        algebras = self.measure_algebra()
+        unmergeable = sorted(
+            name for name in self.op().aggs if name not in algebras or not algebras[name].mergeable
+        )
+        if unmergeable:
+            raise QueryError(f"Measures cannot be re-aggregated from finer rows: {unmergeable}")
+        dropped = [key for key in self.op().keys if key not in by]
+        if dropped and len(_find_all_root_models(self.op().source)) > 1:
+            # A one-side measure repeats in every group of a many-side key,
+            # so merging those groups would double count it. Only keys of
+            # the measure's own model are known to partition its rows.
+            fanned = sorted(
+                name
+                for name in algebras
+                if any(key.partition(".")[0] != name.partition(".")[0] for key in dropped)
+            )
+            if fanned:
+                raise QueryError(
+                    f"Cannot re-aggregate joined measures {fanned} over {dropped}: only "
+                    "group keys from a measure's own model can be merged away"
+                )
+        return algebras
+
+    def reaggregate(self, states, by: Sequence[str] = ()):
+        """Merge a :meth:`to_states` result to the coarser grain ``by``.
+
+        ``states`` may be the ibis table itself, or its materialized (and
+        possibly concatenated, e.g. per-partition) pandas or Arrow result;
+        the source is not queried again. Returns an ibis table with the
+        ``by`` columns and one finalized column per measure.
+        """
+        algebras = self._reaggregation_algebras(by)
+        if not isinstance(states, ir.Table | Table):
+            states = ibis.memtable(states)
+        return reaggregate(states, by, algebras)
+
+    def approximate(
+        self,
+        sample: float,
+        *,
+        seed: int | None = None,
+        confidence: float = 0.95,
+    ) -> SemanticModel:
+        """Estimate this aggregate from a ``sample`` fraction of its fact table.
+
+        The model that owns the measures is read through a row sample
+        (``TABLESAMPLE``); other tables of a join are read in full. Sums and
+        counts are rescaled by ``1 / sample`` to estimate the full totals,
+        other reductions are computed on the sample as-is. Sums, counts and
+        means gain ``<name>_ci_low``/``<name>_ci_high`` columns bounding the
+        estimate at ``confidence``. Pass ``seed`` for a repeatable sample
+        where the backend supports it.
+
+        Raises ``QueryError`` for distinct-count measures, which cannot be
+        scaled from a sample, and for measures from more than one model.
+        """
+        from .ops import _rebind_to_canonical_backend
+
+        table = self.op().to_sampled(sample, seed=seed, confidence=confidence)
+        return SemanticModel(
+            table=_rebind_to_canonical_backend(table),
+            dimensions={},
+            measures={},
+            calc_measures={},
+        )
+
+    def execute(self, *, sample: float | None = None, **kwargs):
+        """Execute the aggregate; ``sample`` runs :meth:`approximate` instead."""
+        if sample is not None:
+            return self.approximate(sample).execute(**kwargs)
+        return super().execute(**kwargs)
+
+    def with_subtotals(self, grouping_id: str = "grouping_id") -> SemanticModel:
+        """Detail rows plus ROLLUP subtotals and the grand total.
+
+        For group keys ``(k1, ..., kn)`` the result also holds the rows
+        grouped by ``(k1, ..., kn-1)``, ..., ``(k1)`` and ``()``, with the
+        rolled-up keys NULL. ``grouping_id`` tells them apart the way SQL's
+        ``GROUPING_ID(k1, ..., kn)`` does — one bit per rolled-up key, the
+        first key most significant — so detail rows are ``0``, the grand
+        total ``2**n - 1``, and a NULL dimension member is never mistaken
+        for a subtotal.
+
+        When every measure is mergeable the levels are merged from the
+        detail states in one aggregation, reading the source once.
+        Holistic measures, post-aggregation columns and joined measures
+        that would fan out fall back to one aggregate per level.
+        """
+        op = self.op()
+        if grouping_id in op.keys or grouping_id in op.aggs:
+            raise QueryError(f"grouping_id column {grouping_id!r} collides with a result column")
+        try:
+            algebras = self._reaggregation_algebras(())
+            table = rollup(self.to_states(), op.keys, algebras, grouping_id)
+        except QueryError as exc:
+            logger.debug("Subtotals computed per level: %s", exc)
+            table = self._subtotals_per_level(grouping_id)
+        return SemanticModel(table=table, dimensions={}, measures={}, calc_measures={})
+
+    def _subtotals_per_level(self, grouping_id: str):
+        from .ops import _rebind_to_canonical_backend
+
+        op = self.op()
+        keys = list(op.keys)
+        detail = _rebind_to_canonical_backend(op.to_untagged())
+        mod = get_ibis_module(detail)
+        levels = []
+        for rolled in range(len(keys) + 1):
+            kept = keys[: len(keys) - rolled]
+            level = (
+                detail
+                if not rolled
+                else _rebind_to_canonical_backend(
+                    SemanticAggregateOp(
+                        source=op.source,
+                        keys=tuple(kept),
+                        aggs=op.aggs,
+                        nested_columns=op.nested_columns,
+                    ).to_untagged()
+                )
+            )
+            levels.append(
+                level.select(
+                    *[
+                        level[key] if key in kept else mod.null().cast(detail[key].type()).name(key)
+                        for key in keys
+                    ],
+                    mod.literal((1 << rolled) - 1, type="int64").name(grouping_id),
+                    *[level[name] for name in detail.columns if name not in keys],
+                )
+            )
+        return mod.union(*levels)
+
     def mutate(self, **post) -> SemanticAggregate:
         """Add post-aggregation derived columns (ADR 0001 desugaring).
 
@@ -10,12 +10,20 @@ so the split never breaks an importer.
 from . import _core
 from ._compat import (
     _ensure_xorq_table,
+    _execute_on_thread_backend,
     _rebind_to_backend,
     _rebind_to_canonical_backend,
 )
+from ._compile_cache import (
+    CompileCacheInfo,
+    clear_compile_cache,
+    compile_cache_info,
+)
+from ._compile_rollup import make_rollup
 from ._core import (
     CalcMeasure,
     Dimension,
+    IndexStrategy,
     Measure,
     NestAggSpec,
     SemanticAggregateOp,
@@ -47,16 +55,37 @@ from ._normalize import (
     _normalize_join_predicate,
     _normalize_to_name,
 )
+from ._reductions import (
+    ADDITIVE,
+    DECOMPOSABLE,
+    HOLISTIC,
+    SEMI_ADDITIVE,
+    MeasureAlgebra,
+    classify_reduction,
+    grouping_level,
+    grouping_sets,
+    reaggregate,
+    rollup,
+)
 from ._tracking import (
     _extract_columns_from_callable,
     _extract_join_key_columns,
 )
+from ._values import Rollup
 
 __all__ = [
+    "ADDITIVE",
+    "DECOMPOSABLE",
+    "HOLISTIC",
+    "SEMI_ADDITIVE",
     "CalcMeasure",
+    "CompileCacheInfo",
     "Dimension",
+    "IndexStrategy",
     "Measure",
+    "MeasureAlgebra",
     "NestAggSpec",
+    "Rollup",
     "SemanticAggregateOp",
     "SemanticFilterOp",
     "SemanticGroupByOp",
@@ -73,6 +102,7 @@ __all__ = [
     "_detect_bare_name_lambda",
     "_ensure_xorq_table",
     "_exact_filter_fields",
+    "_execute_on_thread_backend",
     "_extract_columns_from_callable",
     "_extract_join_key_columns",
     "_find_all_root_models",
@@ -87,7 +117,15 @@ __all__ = [
     "_rebind_to_canonical_backend",
     "_resolve_expr",
     "_unwrap",
+    "classify_reduction",
+    "clear_compile_cache",
+    "compile_cache_info",
+    "grouping_level",
+    "grouping_sets",
     "make_bare_ref_lambda",
+    "make_rollup",
+    "reaggregate",
+    "rollup",
 ]
 
 
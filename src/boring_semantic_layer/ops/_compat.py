@@ -7,6 +7,9 @@ DatabaseTable backends so composed expressions share one connection.
 from __future__ import annotations
 
 import logging
+import threading
+from collections.abc import Callable
+from typing import Any
 
 logger = logging.getLogger(__name__)
 
@@ -162,3 +165,74 @@ def _rebind_to_canonical_backend(expr):
         return expr
 
     return _rebind_to_backend(expr, canonical)
+
+
+def _execute_on_thread_backend(expr, run: Callable[[Any], Any]):
+    """Return ``run(expr)``, executed on the calling thread's DuckDB cursor.
+
+    DuckDB connections are not safe for concurrent queries, yet models
+    loaded once (e.g. by the server) share one backend across request
+    threads. Outside the main thread, an expression reading from a single
+    DuckDB backend opened from a profile has its ``DatabaseTable`` ops
+    rebound, as in ``_rebind_to_backend``, to a cursor of that backend
+    handed out per thread by ``connection_registry.thread_backend``, so
+    threads execute in parallel on one embedded database.
+
+    A cursor sees the database and the temporary views replayed into it,
+    not connection-local state such as TEMP tables. On a catalog error the
+    cursor is reopened once (for views created since), then the query
+    runs on the shared connection, one worker thread at a time. Everything
+    else (the main thread, backends BSL did not open, expressions over
+    several backends, ``options.thread_cursors`` off) runs ``run(expr)``
+    unchanged.
+    """
+    from ..config import options
+    from ..connections import connection_registry
+
+    if not options.thread_cursors or threading.current_thread() is threading.main_thread():
+        return run(expr)
+    try:
+        sources = {
+            id(node.source): node.source
+            for node in expr.op().find(lambda node: type(node).__name__ == "DatabaseTable")
+        }
+    except Exception:
+        return run(expr)
+    if len(sources) != 1:
+        return run(expr)
+    (shared,) = sources.values()
+    if getattr(shared, "name", None) != "duckdb":
+        return run(expr)
+
+    def rebound(target):
+        def replacer(op, _kwargs):
+            kwargs = dict(zip(op.__argnames__, op.__args__, strict=False))
+            if _kwargs:
+                kwargs.update(_kwargs)
+            if type(op).__name__ == "DatabaseTable" and op.source is shared:
+                kwargs["source"] = target
+            elif not _kwargs:
+                return op
+            return op.__recreate__(kwargs)
+
+        return expr.op().replace(replacer).to_expr()
+
+    cursor = connection_registry.thread_backend(shared)
+    if cursor is shared:
+        return run(expr)
+    for refresh in (False, True):
+        if refresh:
+            # A temporary view created after this thread's cursor was
+            # opened: reopen it, replaying the shared connection's views.
+            cursor = connection_registry.thread_backend(shared, refresh=True)
+        try:
+            return run(rebound(cursor))
+        except Exception as exc:
+            if type(exc).__name__ != "CatalogException":
+                raise
+    # Connection-local state (a TEMP table, ...) no cursor can see.
+    lock = connection_registry.shared_lock(shared)
+    if lock is None:
+        return run(expr)
+    with lock:
+        return run(expr)
@@ -0,0 +1,282 @@
+"""Memoized lowering of semantic aggregates to untagged ibis plans.
+
+``SemanticAggregateOp.to_untagged`` re-runs root discovery, field merging,
+aggregation planning and pre-aggregation planning on every call. Queries
+built by ``query()`` are fresh op trees each time (new measure-reference
+lambdas, new filter closures), so node identity never repeats; the cache
+here keys compiled plans by a *structural* key of the op tree instead:
+two trees whose ops, callables (code, defaults, closure values and the
+globals they reference), ibis tables and literals match lower to the
+same plan.
+
+The key is in-process only. Objects it cannot describe structurally are
+keyed by identity; every such object is reachable from the op stored in
+the cache entry, so an identity can never be recycled while its entry
+lives. Backends compare equal by configuration (two DuckDB ``:memory:``
+connections are equal), so tables are also keyed by the identity of the
+backend holding them. Disable with ``options.compile_cache = False``.
+"""
+
+from __future__ import annotations
+
+import threading
+import types
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from typing import Any
+
+import attrs
+from attrs import frozen
+from ibis.expr.operations.core import Node as IbisNode
+from ibis.expr.types import Expr as IbisExpr
+
+from .._xorq import Expr as XorqExpr
+from .._xorq import Node as XorqNode
+from ..config import options
+from ._values import _is_deferred
+
+_ATOMS = (str, bytes, int, float, complex, bool, type(None), type(Ellipsis))
+_NODE_TYPES = (IbisNode, XorqNode)
+_EXPR_TYPES = (IbisExpr, XorqExpr)
+_EMPTY_CELL = ("<empty cell>",)
+
+
+def _is_semantic_op(obj: Any) -> bool:
+    return isinstance(obj, _NODE_TYPES) and type(obj).__module__.startswith("boring_semantic_layer")
+
+
+def _referenced_names(code: types.CodeType) -> set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _referenced_names(const)
+    return names
+
+
+def _has_source(node: Any) -> bool:
+    return getattr(node, "source", None) is not None
+
+
+class IdentityMemo:
+    """Values memoized per object, by identity, for as long as it lives.
+
+    ``WeakKeyDictionary`` finds keys by equality, and semantic ops compare
+    structurally: ops over equal tables of different connections are equal,
+    and comparing ops holding ``Deferred`` expressions raises. Entries here
+    are keyed by ``id`` and dropped when their object is collected.
+    """
+
+    def __init__(self):
+        self._values: dict[int, tuple[weakref.ref, Any]] = {}
+
+    def get(self, obj: Any) -> Any:
+        entry = self._values.get(id(obj))
+        if entry is None or entry[0]() is not obj:
+            return None
+        return entry[1]
+
+    def __setitem__(self, obj: Any, value: Any) -> None:
+        key = id(obj)
+        values = self._values
+
+        def drop(ref: weakref.ref) -> None:
+            # No lock: this may run from garbage collection at any point.
+            if values.get(key, (None,))[0] is ref:
+                values.pop(key, None)
+
+        values[key] = (weakref.ref(obj, drop), value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class _KeyBuilder:
+    """Single-use walker producing a hashable structural key."""
+
+    def __init__(self, memo: IdentityMemo):
+        self._memo = memo
+        self._active: set[int] = set()
+
+    def key(self, obj: Any) -> Any:
+        if isinstance(obj, _ATOMS):
+            return (type(obj), obj)
+        if isinstance(obj, type | types.ModuleType | types.BuiltinFunctionType):
+            return obj
+        if id(obj) in self._active:
+            return ("cycle", id(obj))
+        self._active.add(id(obj))
+        try:
+            return self._key(obj)
+        finally:
+            self._active.discard(id(obj))
+
+    def _key(self, obj: Any) -> Any:
+        if _is_semantic_op(obj):
+            return self._op_key(obj)
+        if isinstance(obj, _NODE_TYPES):
+            # Plain ibis nodes are immutable with structural equality, and
+            # carry no user callables; their tables' backends are keyed by
+            # identity (the op kept with the entry holds them alive).
+            return (obj, tuple(id(node.source) for node in obj.find(_has_source)))
+        if isinstance(obj, _EXPR_TYPES):
+            return ("expr", self.key(obj.op()))
+        if _is_deferred(obj):
+            return ("deferred", object.__getattribute__(obj, "_resolver"))
+        if isinstance(obj, types.FunctionType):
+            return self._function_key(obj)
+        if isinstance(obj, types.MethodType):
+            return ("method", self.key(obj.__self__), self.key(obj.__func__))
+        if attrs.has(type(obj)):
+            return (
+                type(obj),
+                tuple(self.key(getattr(obj, a.name)) for a in attrs.fields(type(obj)) if a.eq),
+            )
+        if isinstance(obj, Mapping):
+            return (
+                "map",
+                tuple((self.key(k), self.key(v)) for k, v in obj.items()),
+            )
+        if isinstance(obj, tuple | list):
+            return (type(obj), tuple(self.key(v) for v in obj))
+        if isinstance(obj, set | frozenset):
+            return ("set", frozenset(self.key(v) for v in obj))
+        return ("id", type(obj), id(obj))
+
+    def _op_key(self, op: Any) -> Any:
+        memoize = op.__class__.__name__ in ("SemanticTableOp", "SemanticJoinOp")
+        if memoize:
+            cached = self._memo.get(op)
+            if cached is not None:
+                return cached
+        key = (type(op), tuple(self.key(arg) for arg in op.__args__))
+        if memoize:
+            self._memo[op] = key
+        return key
+
+    def _function_key(self, fn: types.FunctionType) -> Any:
+        code = fn.__code__
+        closure = tuple(
+            self.key(cell.cell_contents) if _cell_is_set(cell) else _EMPTY_CELL
+            for cell in fn.__closure__ or ()
+        )
+        fn_globals = fn.__globals__
+        # Globals are read when the function runs, so their current values
+        # (containers by content, rebound helpers by their own key) belong
+        # in the key like closure cells do.
+        referenced_globals = tuple(
+            (name, self.key(fn_globals[name]))
+            for name in sorted(_referenced_names(code))
+            if name in fn_globals
+        )
+        return (
+            "fn",
+            code,
+            self.key(fn.__defaults__),
+            self.key(fn.__kwdefaults__),
+            closure,
+            id(fn_globals),
+            referenced_globals,
+            self.key(dict(sorted(vars(fn).items()))),
+        )
+
+
+def _cell_is_set(cell) -> bool:
+    try:
+        cell.cell_contents  # noqa: B018
+    except ValueError:
+        return False
+    return True
+
+
+@frozen
+class CompileCacheInfo:
+    """Counters for the compiled-plan cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    currsize: int
+    maxsize: int
+
+
+class _CompileCache:
+    """Thread-safe LRU of compiled plans keyed by structural op keys."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Any, tuple[Any, Any]] = OrderedDict()
+        self._root_keys = IdentityMemo()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def structural_key(self, op: Any) -> Any:
+        with self._lock:
+            return _KeyBuilder(self._root_keys).key(op)
+
+    def get_or_compile(self, op: Any, compile_fn: Callable[[Any], Any]) -> Any:
+        if not options.compile_cache or options.compile_cache_size <= 0:
+            return compile_fn(op)
+        try:
+            key = self.structural_key(op)
+            hash(key)
+        except Exception:
+            # A key that cannot be built or hashed only costs the cache hit.
+            return compile_fn(op)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+
+        compiled = compile_fn(op)
+
+        with self._lock:
+            # Keep ``op`` alive with the plan: identity-keyed parts of the
+            # key stay valid exactly as long as the entry does.
+            self._entries[key] = (op, compiled)
+            self._entries.move_to_end(key)
+            while len(self._entries) > options.compile_cache_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return compiled
+
+    def info(self) -> CompileCacheInfo:
+        with self._lock:
+            return CompileCacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                currsize=len(self._entries),
+                maxsize=options.compile_cache_size,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._root_keys.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+_COMPILE_CACHE = _CompileCache()
+
+
+def compile_cache_info() -> CompileCacheInfo:
+    """Return hit/miss/eviction counters of the compiled-plan cache."""
+    return _COMPILE_CACHE.info()
+
+
+def clear_compile_cache() -> None:
+    """Drop every cached plan and reset the counters."""
+    _COMPILE_CACHE.clear()
+
+
+def _cached_compile(op: Any, compile_fn: Callable[[Any], Any]) -> Any:
+    return _COMPILE_CACHE.get_or_compile(op, compile_fn)
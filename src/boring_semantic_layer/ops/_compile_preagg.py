@@ -16,6 +16,7 @@ from ..calc_compiler import _to_op, apply_calc_measures
 from ..graph_utils import walk_nodes
 from ..measure_scope import MeasureScope
 from ..nested_access import NestedAccessMarker
+from ..tracing import laps
 from ._core import (
     Measure,
     SemanticJoinOp,
@@ -60,11 +61,13 @@ from ._normalize import _RenamedResolver
 from ._reductions import (
     _build_reagg,
     _fill_missing_count_identities,
+    _is_approx_count_distinct_expr,
     _is_count_distinct_expr,
     _is_count_expr,
     _is_mean_expr,
     _reagg_op_for_expr,
 )
+from ._sketch import _sketch_grain_preagg, _sketch_total
 
 
 @dataclass
@@ -663,7 +666,7 @@ def _preaggregate_sources(
                     agg_exprs[sum_col] = base_col.sum(where=mean_where)
                     agg_exprs[count_col] = base_col.count(where=mean_where)
                     _decomposed_means[mname] = (sum_col, count_col)
-                elif _is_count_distinct_expr(expr):
+                elif _is_count_distinct_expr(expr) or _is_approx_count_distinct_expr(expr):
                     # COUNT DISTINCT is immune to fan-out — defer past pre-agg
                     _deferred_count_distincts[mname] = (
                         table_name,
@@ -1104,6 +1107,7 @@ def _attach_deferred_count_distincts(scope: _PreaggScope, acc: _PreaggAccumulato
     # there. Re-evaluating it directly on the flattened join loses source
     # provenance when physical column names collide (e.g. both sides have
     # ``id``), and can count an unmatched left key as a right-side value.
+    # ``approx_nunique`` measures take the sketch path (see ``_sketch``).
     if _deferred_count_distincts:
         cd_parts: list = []
         join_column_lineage, _joined_columns = _build_join_column_lineage(join_op)
@@ -1114,8 +1118,13 @@ def _attach_deferred_count_distincts(scope: _PreaggScope, acc: _PreaggAccumulato
             src_fn,
             local_group_keys,
         ) in _deferred_count_distincts.items():
+            approximate = _is_approx_count_distinct_expr(src_fn(src_raw))
             if not group_by_cols:
-                cd_parts.append(src_raw.aggregate(**{mname: src_fn(src_raw)}))
+                cd_parts.append(
+                    _sketch_total(src_raw, mname, src_fn)
+                    if approximate
+                    else src_raw.aggregate(**{mname: src_fn(src_raw)})
+                )
                 continue
 
             if tbl is None:
@@ -1137,15 +1146,29 @@ def _attach_deferred_count_distincts(scope: _PreaggScope, acc: _PreaggAccumulato
                     "the requested group grain without a shared join key."
                 )
 
-            cd_exact = _exact_grain_preagg(
-                src_raw,
-                tbl,
-                group_by_cols,
-                available_jk,
-                {mname: src_fn},
-                joined_key_names=source_key_names,
-                local_group_keys=local_group_keys,
-            )
+            if approximate:
+                # Approximate: merge per-source HLL sketches through the
+                # bridge instead of joining every raw row to it.
+                cd_exact = _sketch_grain_preagg(
+                    src_raw,
+                    tbl,
+                    group_by_cols,
+                    available_jk,
+                    mname,
+                    src_fn,
+                    joined_key_names=source_key_names,
+                    local_group_keys=local_group_keys,
+                )
+            else:
+                cd_exact = _exact_grain_preagg(
+                    src_raw,
+                    tbl,
+                    group_by_cols,
+                    available_jk,
+                    {mname: src_fn},
+                    joined_key_names=source_key_names,
+                    local_group_keys=local_group_keys,
+                )
             # The exact source aggregate has no row for an unmatched
             # outer-join group. Attach it to the joined group domain and
             # restore COUNT DISTINCT's empty-set identity before calc
@@ -1447,13 +1470,16 @@ def to_untagged_with_preagg(
 
     This prevents fan-out inflation when ``join_many`` is used.
     """
+    lap = laps("compile.preagg")
     scope = _build_scope(op, all_roots, join_op, join_tree_info, filters)
     raw_tables, filter_owners = _resolve_filter_ownership(scope)
     filter_legs = _split_cross_table_legs(scope, raw_tables, filter_owners)
     plan = _build_plan(scope)
     partitioned = _partition_by_source(scope, plan)
+    lap("plan")
 
     acc = _preaggregate_sources(scope, plan, partitioned, raw_tables, filter_owners, filter_legs)
+    lap("preaggregate")
 
     # Freeze mutable accumulators
     preagg_results = tuple(acc.preagg_results)
@@ -1462,11 +1488,16 @@ def to_untagged_with_preagg(
     empty_count_measures = tuple(acc.empty_count_measures)
 
     if not preagg_results and not acc.deferred_count_distincts:
-        return _aggregate_joined_fallback(scope, plan)
+        result = _aggregate_joined_fallback(scope, plan)
+        lap("fallback")
+        return result
 
     result = _combine_preaggregates(
         scope, plan, preagg_results, decomposed_means, reagg_ops, empty_count_measures
     )
     result = _attach_deferred_count_distincts(scope, acc, result)
+    lap("combine")
     result = _apply_calc_phase(scope, plan, acc, result)
-    return _project_requested(plan, result)
+    result = _project_requested(plan, result)
+    lap("calc")
+    return result
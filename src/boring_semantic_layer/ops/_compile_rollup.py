@@ -0,0 +1,257 @@
+"""Compile strategy: answer an aggregate from a registered rollup.
+
+An aggregate over a single model that has rollups registered (see
+``SemanticModel.with_rollup``) is rewritten onto the smallest rollup that
+covers it, and the rewritten aggregate is compiled the ordinary way. The
+rewrite is conservative; anything it cannot prove equivalent compiles
+against the base table:
+
+* the source chain is ``SemanticTableOp → SemanticFilterOp* →
+  SemanticGroupByOp`` — no joins, projections or unnests;
+* every aggregation is a by-name reference to a base measure whose
+  rollup column can be re-aggregated (``Rollup.merges``) and whose
+  definition is unchanged since the rollup was registered;
+* every grouping key is a rollup dimension with an unchanged definition,
+  or a ``query(time_grain=...)`` bucketing of one that can be derived from
+  the rollup's stored bucket (month → quarter/year, day → week, ...);
+* every filter is a JSON filter (exact field names known) over unchanged,
+  un-bucketed rollup dimensions.
+
+"Unchanged" is object identity: ``with_dimensions``/``with_measures`` keep
+the definitions they do not replace, and identity sidesteps ``Deferred``
+equality, which builds an expression instead of comparing.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from ibis.common.collections import FrozenDict
+
+from ._core import (
+    SemanticAggregateOp,
+    SemanticFilterOp,
+    SemanticGroupByOp,
+    SemanticJoinOp,
+    SemanticTableOp,
+    _exact_filter_fields,
+    _unwrap,
+)
+from ._reductions import classify_reduction
+from ._values import Dimension, Measure, Rollup
+
+logger = logging.getLogger(__name__)
+
+# ibis truncate units, finest to coarsest.
+_UNIT_ORDER = ("s", "m", "h", "D", "W", "M", "Q", "Y")
+
+
+def infer_rollup_merge(measure: Measure, table: Any) -> str | None:
+    """Return how ``measure`` re-aggregates across rollup rows, if it can.
+
+    A rollup stores one column per measure, so only single-state
+    (additive or semi-additive) measures qualify.
+    """
+    try:
+        expr = measure(table)
+    except Exception:  # noqa: BLE001 - an unevaluable measure is not mergeable
+        return None
+    return classify_reduction(expr).merges.get("value")
+
+
+def _grain_derivable(stored: str, requested: str) -> bool:
+    """Whether buckets of unit ``requested`` are unions of ``stored`` buckets."""
+    if stored == requested:
+        return True
+    if _UNIT_ORDER.index(requested) < _UNIT_ORDER.index(stored):
+        return False
+    # Weeks straddle month/quarter/year boundaries and vice versa.
+    if requested == "W":
+        return _UNIT_ORDER.index(stored) <= _UNIT_ORDER.index("D")
+    return stored != "W"
+
+
+def _author_scope(filter_op: SemanticFilterOp):
+    """Innermost predicate of a filter and the dimensions it was written against."""
+    predicate = _unwrap(filter_op.predicate)
+    dims = filter_op.source.get_dimensions()
+    while True:
+        try:
+            predicate, dims = object.__getattribute__(predicate, "__bsl_rebound_from__")
+        except (AttributeError, TypeError):
+            return predicate, dims
+
+
+def _key_dimension(rollup: Rollup, name: str, dim: Dimension) -> Dimension | None:
+    """Dimension answering key ``name`` from the rollup, or None if it cannot."""
+    declared = rollup.dimensions.get(name)
+    if declared is None:
+        return None
+    stored_unit = rollup.time_grains.get(name)
+    if dim is declared:
+        if stored_unit is not None:
+            return None  # raw timestamps were bucketed away
+        return _column_dimension(name, declared)
+    try:
+        base, unit = object.__getattribute__(dim.expr, "__bsl_time_grain__")
+    except (AttributeError, TypeError):
+        return None
+    if base is not declared:
+        return None
+    if stored_unit is not None and not _grain_derivable(stored_unit, unit):
+        return None
+    return Dimension(
+        expr=lambda t, c=name, u=unit: t[c].truncate(u),
+        description=dim.description,
+        is_time_dimension=True,
+        smallest_time_grain=dim.smallest_time_grain,
+    )
+
+
+def _column_dimension(name: str, declared: Dimension) -> Dimension:
+    return Dimension(
+        expr=lambda t, c=name: t[c],
+        description=declared.description,
+        is_entity=declared.is_entity,
+        is_time_dimension=declared.is_time_dimension,
+        is_event_timestamp=declared.is_event_timestamp,
+        smallest_time_grain=declared.smallest_time_grain,
+    )
+
+
+def _rewrite(op: SemanticAggregateOp, root, filters, group_by, rollup: Rollup):
+    """Return ``op`` rebuilt over ``rollup``, or None if the rollup cannot serve it."""
+    root_dims = root.get_dimensions()
+    root_measures = root.get_measures()
+
+    dimensions: dict[str, Dimension] = {}
+    for key in op.keys:
+        dim = root_dims.get(key)
+        served = _key_dimension(rollup, key, dim) if dim is not None else None
+        if served is None:
+            return None
+        dimensions[key] = served
+
+    measures: dict[str, Measure] = {}
+    for fn in op.aggs.values():
+        ref = getattr(_unwrap(fn), "_bsl_bare_ref", None)
+        merge = rollup.merges.get(ref) if isinstance(ref, str) else None
+        if merge is None or root_measures.get(ref) is not rollup.measures[ref]:
+            return None
+        measures[ref] = Measure(expr=lambda t, c=ref, m=merge: getattr(t[c], m)())
+
+    predicates = []
+    for filter_op in filters:
+        predicate, author_dims = _author_scope(filter_op)
+        fields = _exact_filter_fields(predicate)
+        if not fields:
+            return None
+        for field in fields:
+            declared = rollup.dimensions.get(field)
+            if (
+                declared is None
+                or field in rollup.time_grains
+                or author_dims.get(field) is not declared
+            ):
+                return None
+            dimensions.setdefault(field, _column_dimension(field, declared))
+        predicates.append(predicate)
+
+    source = SemanticTableOp(
+        table=rollup.table,
+        dimensions=dimensions,
+        measures=measures,
+        calc_measures={},
+        name=root.name,
+        description=root.description,
+        _source_join=None,
+    )
+    for predicate in reversed(predicates):
+        source = SemanticFilterOp(source=source, predicate=predicate)
+    source = SemanticGroupByOp(source=source, keys=group_by.keys)
+    return SemanticAggregateOp(
+        source=source,
+        keys=op.keys,
+        aggs=dict(op.aggs),
+        nested_columns=op.nested_columns,
+    )
+
+
+def route_to_rollup(op: SemanticAggregateOp):
+    """Compile ``op`` against the smallest covering rollup, or return None."""
+    group_by = op.source
+    if not isinstance(group_by, SemanticGroupByOp) or op.nested_columns:
+        return None
+    filters = []
+    node = group_by.source
+    while isinstance(node, SemanticFilterOp):
+        filters.append(node)
+        node = node.source
+    if not isinstance(node, SemanticTableOp) or not node.rollups:
+        return None
+    if isinstance(node._source_join, SemanticJoinOp):
+        return None
+
+    # Fewest dimensions first: the coarsest rollup has the fewest rows.
+    for rollup in sorted(node.rollups, key=lambda r: len(r.dimensions)):
+        rewritten = _rewrite(op, node, filters, group_by, rollup)
+        if rewritten is not None:
+            logger.debug("aggregate answered from rollup %r", rollup.name)
+            return rewritten._compile_untagged()
+    return None
+
+
+def make_rollup(
+    model: SemanticTableOp,
+    table: Any,
+    dimensions,
+    measures,
+    time_grains=None,
+    name: str | None = None,
+) -> Rollup:
+    """Validate a rollup declaration against ``model`` and build it."""
+    from ..errors import DefinitionError
+
+    model_dims = model.get_dimensions()
+    model_measures = model.get_measures()
+    columns = set(table.columns)
+
+    unknown_dims = [d for d in dimensions if d not in model_dims]
+    if unknown_dims:
+        raise DefinitionError(f"Rollup dimensions not defined on the model: {unknown_dims}")
+
+    merge_spec = dict(measures) if isinstance(measures, dict) else dict.fromkeys(measures)
+    merges: dict[str, str] = {}
+    for measure_name, merge in merge_spec.items():
+        measure = model_measures.get(measure_name)
+        if measure is None:
+            raise DefinitionError(
+                f"Rollup measure '{measure_name}' is not a base measure of the model"
+            )
+        merge = merge or infer_rollup_merge(measure, model.table)
+        if merge not in ("sum", "min", "max"):
+            raise DefinitionError(
+                f"Rollup measure '{measure_name}' cannot be re-aggregated across rollup "
+                "rows; only sum/count/min/max measures are mergeable "
+                f"(declare the merge explicitly if it is one of those), got {merge!r}"
+            )
+        merges[measure_name] = merge
+
+    missing = [c for c in (*dimensions, *merges) if c not in columns]
+    if missing:
+        raise DefinitionError(f"Rollup table has no columns for: {missing}")
+
+    grains = dict(time_grains or {})
+    non_time = [d for d in grains if d not in dimensions or not model_dims[d].is_time_dimension]
+    if non_time:
+        raise DefinitionError(f"Rollup time_grains must name rollup time dimensions: {non_time}")
+
+    return Rollup(
+        table=table,
+        dimensions=FrozenDict({d: model_dims[d] for d in dimensions}),
+        measures=FrozenDict({m: model_measures[m] for m in merges}),
+        merges=FrozenDict(merges),
+        time_grains=FrozenDict(grains),
+        name=name,
+    )
@@ -0,0 +1,186 @@
+"""Compile strategy: estimate an aggregate from a sample of its fact table.
+
+``SemanticAggregateOp.to_sampled()`` replaces the root model that owns the
+requested measures with one whose table is a Bernoulli row sample
+(``TABLESAMPLE``) at rate ``p``. Additive measures (sums and counts) are
+rescaled by ``1 / p`` so they estimate the full total; means, min/max and
+other reductions are reported as computed on the sample. Calculated
+measures see the rescaled base measures, so ratios and differences stay
+consistent. Distinct counts cannot be scaled from a sample and are
+rejected.
+
+Sums, counts and means also get a normal-approximation confidence
+interval, computed from extra moment measures (sum, sum of squares,
+count) evaluated on the same sample:
+
+* a total ``T = S / p`` has variance ``(1 - p) / p**2 * Σy²``;
+* a mean has variance ``(1 - p) * s² / n``.
+
+Other dimension tables of a join are left unsampled, so every sampled
+fact row still finds its dimension rows.
+"""
+
+from __future__ import annotations
+
+from statistics import NormalDist
+from typing import Any
+
+from ..errors import QueryError
+from ._core import (
+    Measure,
+    SemanticAggregateOp,
+    SemanticTableOp,
+    _detect_bare_name_lambda,
+    _find_all_root_models,
+    _get_merged_fields,
+    _measure_algebras,
+    _resolve_short_name,
+    _unwrap,
+    make_bare_ref_lambda,
+)
+from ._reductions import ADDITIVE, classify_reduction, sample_moments
+
+_DISTINCT = frozenset({"countdistinct", "approxcountdistinct"})
+
+
+def ci_columns(name: str) -> tuple[str, str]:
+    """Lower and upper confidence-bound columns of measure ``name``."""
+    return f"{name}_ci_low", f"{name}_ci_high"
+
+
+def _moment_column(name: str, moment: str) -> str:
+    return f"{name}__sample_{moment}"
+
+
+def _rescaled(measure: Measure, scale: float) -> Measure:
+    def expr(t, m=measure):
+        value = m(t)
+        return value * scale if classify_reduction(value).kind == ADDITIVE else value
+
+    return Measure(
+        expr=expr,
+        description=measure.description,
+        requires_unnest=measure.requires_unnest,
+        original_expr=measure.original_expr,
+        metadata=measure.metadata,
+    )
+
+
+def _moment_measure(measure: Measure, moment: str) -> Measure:
+    return Measure(
+        expr=lambda t, m=measure, k=moment: sample_moments(m(t))[k],
+        requires_unnest=measure.requires_unnest,
+    )
+
+
+def _owning_root(roots, resolved: str) -> tuple[SemanticTableOp, str]:
+    """Root model declaring ``resolved`` (measure or calc) and its local name."""
+    if len(roots) == 1:
+        return roots[0], resolved
+    prefix, _, local = resolved.partition(".")
+    for root in roots:
+        if root.name == prefix and (
+            local in root.get_measures() or local in root.get_calculated_measures()
+        ):
+            return root, local
+    raise QueryError(
+        f"Cannot tell which model to sample for '{resolved}': sampled queries need "
+        "measures declared on one model of the join"
+    )
+
+
+def compile_sample(
+    op: SemanticAggregateOp,
+    fraction: float,
+    seed: int | None = None,
+    confidence: float = 0.95,
+) -> Any:
+    """Lower ``op`` to estimates from a ``fraction`` row sample of its fact table."""
+    if isinstance(fraction, bool) or not 0 < fraction <= 1:
+        raise QueryError(f"sample must be a fraction in (0, 1], got {fraction!r}")
+    if not 0 < confidence < 1:
+        raise QueryError(f"confidence must be in (0, 1), got {confidence!r}")
+
+    algebras = _measure_algebras(op)
+    roots = _find_all_root_models(op.source)
+    merged_base = _get_merged_fields(roots, "measures")
+    merged_calc = _get_merged_fields(roots, "calc_measures")
+
+    owners: dict[SemanticTableOp, None] = {}
+    with_ci: dict[str, tuple[str, str, str]] = {}
+    for name, fn in op.aggs.items():
+        ref = _detect_bare_name_lambda(_unwrap(fn)) or name
+        resolved = _resolve_short_name(ref, merged_base, merged_calc)
+        if resolved is None:
+            continue
+        root, local = _owning_root(roots, resolved)
+        owners[root] = None
+        algebra = algebras.get(name)
+        if algebra is None:
+            continue
+        if algebra.reduction in _DISTINCT:
+            raise QueryError(f"Distinct-count measure '{name}' cannot be estimated from a sample")
+        if algebra.kind == ADDITIVE or algebra.reduction == "mean":
+            with_ci[name] = (algebra.reduction, resolved[: len(resolved) - len(local)], local)
+    if not owners and len(roots) == 1:
+        owners[roots[0]] = None
+    if len(owners) != 1:
+        raise QueryError(
+            "Sampled queries need all measures from a single model; got measures of "
+            f"{sorted(str(root.name) for root in owners)}"
+        )
+    (target,) = owners
+
+    scale = 1.0 / fraction
+    measures = {local: _rescaled(m, scale) for local, m in target.get_measures().items()}
+    aggs = dict(op.aggs)
+    for name, (reduction, prefix, local) in with_ci.items():
+        moments = ("sumsq",) if reduction != "mean" else ("sum", "sumsq", "count")
+        for moment in moments:
+            measures[_moment_column(local, moment)] = _moment_measure(
+                target.get_measures()[local], moment
+            )
+            aggs[_moment_column(name, moment)] = make_bare_ref_lambda(
+                prefix + _moment_column(local, moment)
+            )
+
+    table = target.table.to_expr() if hasattr(target.table, "to_expr") else target.table
+    sampled = SemanticTableOp(
+        table=table.sample(fraction, method="row", seed=seed),
+        dimensions=target.get_dimensions(),
+        measures=measures,
+        calc_measures=target.get_calculated_measures(),
+        name=target.name,
+        description=target.description,
+        _source_join=target._source_join,
+        # A rollup would answer from pre-aggregated rows, bypassing the sample.
+        rollups=(),
+    )
+    estimates = SemanticAggregateOp(
+        source=op.source.replace({target: sampled}),
+        keys=op.keys,
+        aggs=aggs,
+        nested_columns=op.nested_columns,
+    ).to_untagged()
+    return _with_intervals(estimates, op, with_ci, fraction, confidence)
+
+
+def _with_intervals(table, op, with_ci, fraction: float, confidence: float):
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    columns: list = [table[key] for key in op.keys]
+    for name in op.aggs:
+        columns.append(table[name])
+        if name not in with_ci:
+            continue
+        reduction = with_ci[name][0]
+        sumsq = table[_moment_column(name, "sumsq")]
+        if reduction == "mean":
+            n = table[_moment_column(name, "count")]
+            total = table[_moment_column(name, "sum")]
+            variance = (sumsq - total * total / n.nullif(0)) / (n - 1).nullif(0)
+            half = z * ((1 - fraction) * variance / n.nullif(0)).sqrt()
+        else:
+            half = z * ((1 - fraction) / fraction**2 * sumsq).sqrt()
+        low, high = ci_columns(name)
+        columns.extend([(table[name] - half).name(low), (table[name] + half).name(high)])
+    return table.select(*columns)
@@ -0,0 +1,107 @@
+"""Compile strategy: an aggregate's mergeable partial states.
+
+``SemanticAggregateOp.to_states()`` lowers an aggregate to its group keys
+plus the partial states of every measure (see
+:class:`~._reductions.MeasureAlgebra`) instead of finalized values, so the
+result can later be merged to any coarser grain with
+:func:`~._reductions.reaggregate` without touching the source again.
+
+State reductions are registered as extra base measures on the owning root
+model and requested by name, so they compile through the ordinary
+aggregate path — including fan-out-safe pre-aggregation over joins.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from ..errors import QueryError
+from ._core import (
+    Measure,
+    SemanticAggregateOp,
+    SemanticTableOp,
+    _detect_bare_name_lambda,
+    _find_all_root_models,
+    _get_merged_fields,
+    _measure_algebras,
+    _resolve_short_name,
+    _unwrap,
+    make_bare_ref_lambda,
+)
+from ._reductions import MeasureAlgebra, measure_states, state_column
+
+
+def _state_measure(measure: Measure, state: str) -> Measure:
+    return Measure(
+        expr=lambda t, m=measure, s=state: measure_states(m(t))[s],
+        description=measure.description,
+        requires_unnest=measure.requires_unnest,
+    )
+
+
+def _owner(roots, resolved: str) -> tuple[SemanticTableOp, str]:
+    """Root model declaring measure ``resolved`` and its local name there."""
+    if len(roots) == 1:
+        return roots[0], resolved
+    prefix, _, local = resolved.partition(".")
+    for root in roots:
+        if root.name == prefix and local in root.measures:
+            return root, local
+    raise QueryError(f"Cannot locate the model that defines measure '{resolved}'")
+
+
+def compile_states(op: SemanticAggregateOp) -> tuple[Any, dict[str, MeasureAlgebra]]:
+    """Lower ``op`` to keys plus measure states; return it with the algebras."""
+    algebras = _measure_algebras(op)
+    unmergeable = sorted(
+        name for name in op.aggs if name not in algebras or not algebras[name].mergeable
+    )
+    if unmergeable:
+        raise QueryError(
+            "Measures cannot be re-aggregated from finer rows (holistic or not a "
+            f"measure reference): {unmergeable}"
+        )
+
+    roots = _find_all_root_models(op.source)
+    merged_base = _get_merged_fields(roots, "measures")
+    merged_calc = _get_merged_fields(roots, "calc_measures")
+
+    added: dict[SemanticTableOp, dict[str, Measure]] = {}
+    aggs: dict[str, Any] = {}
+    for name, fn in op.aggs.items():
+        algebra = algebras[name]
+        if "value" in algebra.merges:
+            aggs[name] = fn
+            continue
+        ref = _detect_bare_name_lambda(_unwrap(fn)) or name
+        resolved = _resolve_short_name(ref, merged_base, merged_calc)
+        root, local = _owner(roots, resolved)
+        prefix = resolved[: len(resolved) - len(local)]
+        for state in algebra.merges:
+            measure_name = state_column(local, state)
+            added.setdefault(root, {})[measure_name] = _state_measure(
+                root.get_measures()[local], state
+            )
+            aggs[state_column(name, state)] = make_bare_ref_lambda(prefix + measure_name)
+
+    replacements = {
+        root: SemanticTableOp(
+            table=root.table,
+            dimensions=root.get_dimensions(),
+            measures={**root.get_measures(), **measures},
+            calc_measures=root.get_calculated_measures(),
+            name=root.name,
+            description=root.description,
+            _source_join=root._source_join,
+            rollups=root.rollups,
+        )
+        for root, measures in added.items()
+    }
+    source = op.source.replace(replacements) if replacements else op.source
+    states = SemanticAggregateOp(
+        source=source,
+        keys=op.keys,
+        aggs=aggs,
+        nested_columns=op.nested_columns,
+    )
+    return states.to_untagged(), {name: algebras[name] for name in op.aggs}
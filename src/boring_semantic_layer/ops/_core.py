@@ -6,7 +6,7 @@ import re
 from collections.abc import Callable, Iterable, Mapping, Sequence
 from difflib import get_close_matches
 from functools import reduce
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Literal
 
 import ibis
 from attrs import field, frozen
@@ -66,7 +66,13 @@ from ..measure_scope import (
     MeasureScope,
 )
 from ..nested_access import NestedAccessMarker
-from ._compat import _rebind_to_backend, _rebind_to_canonical_backend
+from ..tracing import laps
+from ._compat import (
+    _execute_on_thread_backend,
+    _rebind_to_backend,
+    _rebind_to_canonical_backend,
+)
+from ._compile_cache import IdentityMemo, _cached_compile
 from ._normalize import (
     _JOIN_REMOVED_MESSAGE,
     _allocate_right_collision_names,
@@ -74,8 +80,10 @@ from ._normalize import (
     _RenamedResolver,
 )
 from ._reductions import (
-    _is_mean_expr,
-    _reagg_op_for_expr,
+    ADDITIVE,
+    HOLISTIC,
+    MeasureAlgebra,
+    classify_reduction,
 )
 from ._tracking import (
     _extract_columns_from_callable,
@@ -96,6 +104,15 @@ logger = logging.getLogger(__name__)
 _SchemaClass = XorqSchema
 _FrozenOrderedDict = FrozenOrderedDict
 
+# ``SemanticTableOp.values`` runs every dimension, measure and calc-measure
+# lambda; ops are immutable, so the result is computed once per op and kept
+# for as long as the op is alive. Keyed by identity: op equality compares
+# ``Deferred`` dimensions, which raises.
+_TABLE_VALUES_CACHE = IdentityMemo()
+_TABLE_SCHEMA_CACHE = IdentityMemo()
+
+IndexStrategy = Literal["auto", "unpivot", "union"]
+
 
 if TYPE_CHECKING:
     from ..expr import (
@@ -141,6 +158,27 @@ def _query_module():
     return importlib.import_module("boring_semantic_layer.query")
 
 
+def _serialization_module():
+    """Call-time accessor for the serialization layer (see ``_expr_module``)."""
+    import importlib
+
+    return importlib.import_module("boring_semantic_layer.serialization")
+
+
+class _FingerprintMixin:
+    """Mixin giving every semantic op a deterministic ``fingerprint()``."""
+
+    __slots__ = ()
+
+    def fingerprint(self) -> str:
+        """Stable, cross-process digest of this op tree.
+
+        Covers the model definition, filters, grouping keys, aggregations
+        and source table identity; see ``serialization.fingerprint``.
+        """
+        return _serialization_module().fingerprint(self)
+
+
 def _semantic_table(*args, **kwargs) -> SemanticTable:
     return _expr_module().SemanticModel(*args, **kwargs)
 
@@ -944,7 +982,7 @@ def _build_json_definition(
     return result
 
 
-class SemanticTableOp(Relation):
+class SemanticTableOp(_FingerprintMixin, Relation):
     """Relation with semantic metadata (dimensions and measures).
 
     Stores ir.Table expression directly to avoid .op() → .to_expr() conversions.
@@ -962,6 +1000,7 @@ class SemanticTableOp(Relation):
     _source_join: Any = field(
         default=None, repr=False
     )  # Track if this wraps a join (SemanticJoinOp) for optimization
+    rollups: tuple[Any, ...] = ()  # Registered Rollup pre-aggregations
 
     def __init__(
         self,
@@ -972,6 +1011,7 @@ class SemanticTableOp(Relation):
         name: str | None = None,
         description: str | None = None,
         _source_join: Any = None,
+        rollups: Iterable[Any] = (),
     ) -> None:
         # Accept both regular ibis and xorq tables without conversion
         # This allows using regular ibis by default, xorq only when provided
@@ -987,6 +1027,7 @@ class SemanticTableOp(Relation):
             name=name,
             description=description,
             _source_join=_source_join,
+            rollups=tuple(rollups),
         )
 
     def __repr__(self) -> str:
@@ -994,6 +1035,12 @@ class SemanticTableOp(Relation):
 
     @property
     def values(self) -> FrozenOrderedDict[str, Any]:
+        cached = _TABLE_VALUES_CACHE.get(self)
+        if cached is None:
+            cached = _TABLE_VALUES_CACHE[self] = self._compute_values()
+        return cached
+
+    def _compute_values(self) -> FrozenOrderedDict[str, Any]:
         dims = self.get_dimensions()
         measures = self.get_measures()
         calc_measures = self.get_calculated_measures()
@@ -1025,8 +1072,11 @@ class SemanticTableOp(Relation):
 
     @property
     def schema(self):
-        fields_dict = {name: str(v.dtype) for name, v in self.values.items()}
-        return _make_schema(fields_dict)
+        cached = _TABLE_SCHEMA_CACHE.get(self)
+        if cached is None:
+            fields_dict = {name: str(v.dtype) for name, v in self.values.items()}
+            cached = _TABLE_SCHEMA_CACHE[self] = _make_schema(fields_dict)
+        return cached
 
     @property
     def json_definition(self) -> Mapping[str, Any]:
@@ -1131,7 +1181,7 @@ class _SourcePassThroughOp:
         return self.source.get_calculated_measures()
 
 
-class SemanticFilterOp(_SourcePassThroughOp, Relation):
+class SemanticFilterOp(_FingerprintMixin, _SourcePassThroughOp, Relation):
     source: Relation
     predicate: Callable
 
@@ -1267,7 +1317,7 @@ def _build_select_or_aggregate(
     return tbl
 
 
-class SemanticProjectOp(_SourcePassThroughOp, Relation):
+class SemanticProjectOp(_FingerprintMixin, _SourcePassThroughOp, Relation):
     source: Relation
     fields: tuple[str, ...]
 
@@ -1320,7 +1370,7 @@ class SemanticProjectOp(_SourcePassThroughOp, Relation):
         return _build_select_or_aggregate(active_tbl, dim_exprs, meas_exprs, raw_exprs)
 
 
-class SemanticGroupByOp(_SourcePassThroughOp, Relation):
+class SemanticGroupByOp(_FingerprintMixin, _SourcePassThroughOp, Relation):
     source: Relation
     keys: tuple[str, ...]
 
@@ -1573,6 +1623,7 @@ def _compile_aggregation(
     aggregations surface as :class:`NestedAccessMarker` values and are
     routed through :func:`_compile_aggregation_with_nested`.
     """
+    lap = laps("compile.aggregation")
     # --- Pre-process calc specs ---------------------------------------
     # Run the analyzer once per calc, then route inline reductions
     # through the lift pass. ``lifted_calc_specs[name]`` carries the
@@ -1701,6 +1752,8 @@ def _compile_aggregation(
         else:
             regular_specs[name] = fn
 
+    lap("analyze")
+
     # --- Attach windowed totals to base ------------------------------
     # When any calc references ``t.all(measure_ref)``, compute that
     # measure's formula as a window function over the entire base
@@ -1769,6 +1822,8 @@ def _compile_aggregation(
             base_tbl, by_cols, regular_specs, nested_marker_specs
         )
 
+    lap("aggregate")
+
     # --- Apply dimension-grain specs ---------------------------------
     # Evaluated against the current base table (after any windowed-totals
     # mutation) and added to the result via mutate; ibis dereferences
@@ -1918,6 +1973,7 @@ def _compile_aggregation(
         if select_cols:
             real_agg_tbl = real_agg_tbl.select([real_agg_tbl[c] for c in select_cols])
 
+    lap("derive")
     return real_agg_tbl
 
 
@@ -3058,7 +3114,7 @@ def _infer_join_wrapper_dimension_owners(
     return owners, errors
 
 
-class SemanticAggregateOp(Relation):
+class SemanticAggregateOp(_FingerprintMixin, Relation):
     source: Relation
     keys: tuple[str, ...]
     aggs: dict[
@@ -3161,6 +3217,39 @@ class SemanticAggregateOp(Relation):
         return combined.to_dict()
 
     def to_untagged(self):
+        """Lower this aggregate to an untagged ibis table.
+
+        Plans are memoized by the structural shape of the op tree (see
+        ``_compile_cache``), so re-running an identical query skips root
+        discovery and aggregation planning. Opt out with
+        ``options.compile_cache = False``.
+        """
+        return _cached_compile(self, SemanticAggregateOp._compile_untagged)
+
+    def measure_algebra(self) -> dict[str, MeasureAlgebra]:
+        """How each aggregated measure merges across grains (see ``_reductions``)."""
+        return _measure_algebras(self)
+
+    def to_states(self):
+        """Lower to group keys plus each measure's mergeable partial states.
+
+        Returns the untagged table and the ``MeasureAlgebra`` of every result
+        column; ``reaggregate`` merges such a table to a coarser grain.
+        Raises ``QueryError`` if any measure is holistic.
+        """
+        return _compile_module("_compile_states").compile_states(self)
+
+    def to_sampled(self, fraction: float, seed: int | None = None, confidence: float = 0.95):
+        """Lower to estimates from a ``fraction`` row sample of the fact table.
+
+        Additive measures are rescaled and sums, counts and means get
+        ``<name>_ci_low``/``<name>_ci_high`` bounds (see ``_compile_sample``).
+        """
+        return _compile_module("_compile_sample").compile_sample(
+            self, fraction, seed=seed, confidence=confidence
+        )
+
+    def _compile_untagged(self):
         nest_specs = {
             name: _unwrap(fn)
             for name, fn in self.aggs.items()
@@ -3169,6 +3258,10 @@ class SemanticAggregateOp(Relation):
         if nest_specs:
             return self._to_untagged_with_nest(nest_specs)
 
+        routed = _compile_module("_compile_rollup").route_to_rollup(self)
+        if routed is not None:
+            return routed
+
         all_roots = _find_all_root_models(self.source)
 
         def find_join_in_tree(node):
@@ -3435,7 +3528,7 @@ class SemanticAggregateOp(Relation):
         )
 
 
-class SemanticUnnestOp(_SourcePassThroughOp, Relation):
+class SemanticUnnestOp(_FingerprintMixin, _SourcePassThroughOp, Relation):
     """Unnest an array column, expanding rows (like Malloy's nested data pattern)."""
 
     source: Relation
@@ -3493,7 +3586,7 @@ class SemanticUnnestOp(_SourcePassThroughOp, Relation):
         return unpack_struct_if_needed(unnested, self.column)
 
 
-class SemanticJoinOp(Relation):
+class SemanticJoinOp(_FingerprintMixin, Relation):
     left: Relation
     right: Relation
     how: str
@@ -3735,6 +3828,7 @@ class SemanticJoinOp(Relation):
         selector: str | list[str] | Callable | None = None,
         by: str | None = None,
         sample: int | None = None,
+        strategy: IndexStrategy = "auto",
     ) -> SemanticIndexOp:
         """Create an index for search/discovery.
 
@@ -3755,7 +3849,13 @@ class SemanticJoinOp(Relation):
             else:
                 processed_selector = selector
 
-        return SemanticIndexOp(source=self, selector=processed_selector, by=by, sample=sample)
+        return SemanticIndexOp(
+            source=self,
+            selector=processed_selector,
+            by=by,
+            sample=sample,
+            strategy=strategy,
+        )
 
     def _collect_leaf_table_names(self) -> set[str]:
         """Collect names of all leaf (base) tables in this join tree."""
@@ -4332,7 +4432,9 @@ class SemanticJoinOp(Relation):
         )
 
     def execute(self):
-        return _rebind_to_canonical_backend(self.to_untagged()).execute()
+        return _execute_on_thread_backend(
+            _rebind_to_canonical_backend(self.to_untagged()), lambda e: e.execute()
+        )
 
     def compile(self, **kwargs):
         return _rebind_to_canonical_backend(self.to_untagged()).compile(**kwargs)
@@ -4370,7 +4472,7 @@ class SemanticJoinOp(Relation):
         )
 
 
-class SemanticOrderByOp(_SourcePassThroughOp, Relation):
+class SemanticOrderByOp(_FingerprintMixin, _SourcePassThroughOp, Relation):
     source: Relation
     keys: tuple[
         str | ir.Value | Callable,
@@ -4403,7 +4505,7 @@ class SemanticOrderByOp(_SourcePassThroughOp, Relation):
         return tbl.order_by([resolve_order_key(key) for key in self.keys])
 
 
-class SemanticLimitOp(_SourcePassThroughOp, Relation):
+class SemanticLimitOp(_FingerprintMixin, _SourcePassThroughOp, Relation):
     source: Relation
     n: int
     offset: int
@@ -4501,6 +4603,112 @@ def _build_numeric_index_fragment(
     )
 
 
+def _build_unpivot_index(
+    base_tbl: Any,
+    fields: Sequence[tuple[str, Any]],
+    weight_fn: Callable[[Any], Any],
+) -> Any:
+    """Index every ``(name, expr)`` field in one scan of ``base_tbl``.
+
+    Each row is unnested into one cell per field carrying the field's name,
+    type and value, and all cells are aggregated together. String-like
+    fields group by their value; numeric fields group into one cell whose
+    value is the ``min to max`` range of the non-null values, so the result
+    matches the per-field fragments of the ``"union"`` strategy.
+    """
+    from .._xorq import api as xo
+
+    cells = []
+    for field_name, field_expr in fields:
+        field_type = field_expr.type()
+        type_str = _get_field_type_str(field_type)
+        numeric = field_type.is_numeric()
+        text = field_expr.cast("string")
+        cells.append(
+            xo.struct(
+                {
+                    "name": xo.literal(field_name.split(".")[-1]),
+                    "path": xo.literal(field_name),
+                    "type": xo.literal(type_str),
+                    "key": xo.null().cast("string") if numeric else text,
+                    "text": text,
+                    # Orders the range ends; argmin/argmax then return the
+                    # value as the "union" strategy would render it.
+                    "number": (field_expr if numeric else xo.null()).cast("float64"),
+                }
+            )
+        )
+
+    long_tbl = base_tbl.mutate(_bsl_cell=xo.array(cells).unnest())
+    long_tbl = long_tbl.mutate(
+        _bsl_name=long_tbl._bsl_cell["name"],
+        _bsl_path=long_tbl._bsl_cell["path"],
+        _bsl_type=long_tbl._bsl_cell["type"],
+        _bsl_key=long_tbl._bsl_cell["key"],
+        _bsl_text=long_tbl._bsl_cell["text"],
+        _bsl_number=long_tbl._bsl_cell["number"],
+    ).filter((xo._["_bsl_type"] != "number") | xo._["_bsl_number"].notnull())
+
+    return (
+        long_tbl.group_by(["_bsl_name", "_bsl_path", "_bsl_type", "_bsl_key"])
+        .aggregate(
+            weight=weight_fn(long_tbl),
+            _bsl_low=xo._["_bsl_text"].argmin(xo._["_bsl_number"]),
+            _bsl_high=xo._["_bsl_text"].argmax(xo._["_bsl_number"]),
+        )
+        .select(
+            fieldName=xo._["_bsl_name"],
+            fieldPath=xo._["_bsl_path"],
+            fieldType=xo._["_bsl_type"],
+            fieldValue=(xo._["_bsl_type"] == "number").ifelse(
+                xo._["_bsl_low"] + " to " + xo._["_bsl_high"],
+                xo._["_bsl_key"],
+            ),
+            weight=xo._["weight"],
+        )
+    )
+
+
+# Hash buckets of the index sample filter, and how many times ``n`` rows it
+# keeps on average so that ``limit(n)`` is rarely left short.
+_SAMPLE_BUCKETS = 1024
+_SAMPLE_KEPT_BUCKETS = 256
+
+
+def _hash_sample(tbl: Any, n: int, keys: Sequence[Any] = ()) -> Any:
+    """Up to ``n`` rows of ``tbl`` picked by a hash of ``keys``.
+
+    ``limit(n)`` keeps whatever rows the backend reads first, which is
+    usually the oldest or one partition. Instead, rows are kept when the
+    hash of ``keys`` falls in a fixed ``_SAMPLE_KEPT_BUCKETS /
+    _SAMPLE_BUCKETS`` share of the hash buckets, so the ``n`` rows spread
+    over about ``4 * n`` rows read. That is a filter on one pass, with no
+    sort and no count, and it returns the same rows on every run, so
+    fingerprints and cached results stay valid. Without ``keys`` the
+    first ``n`` rows are kept.
+    """
+    if not keys:
+        return tbl.limit(n)
+    hashes = [key.hash() for key in keys]
+    bucket = (reduce(lambda acc, h: acc ^ h, hashes[1:], hashes[0]) % _SAMPLE_BUCKETS).abs()
+    return tbl.filter(bucket < _SAMPLE_KEPT_BUCKETS).limit(n)
+
+
+def _sample_keys(tbl: Any, dimensions: Mapping[str, Any]) -> list[Any]:
+    """Columns of ``tbl`` to hash for a sample: its entity dimensions, else its dimensions."""
+    entities = []
+    columns = []
+    for dim in dimensions.values():
+        try:
+            expr = dim(tbl)
+        except Exception:
+            # Not a column of this table (e.g. a joined model's dimension).
+            continue
+        if isinstance(expr.op(), ibis_ops.Field) and expr.op().rel == tbl.op():
+            (entities if getattr(dim, "is_entity", False) else columns).append(expr)
+    return entities or columns
+
+
 def _resolve_selector(
     selector: str | list[str] | Callable | None,
     base_tbl: ir.Table,
@@ -4550,11 +4758,24 @@ def _get_fields_to_index(
     return result
 
 
-class SemanticIndexOp(Relation):
+class SemanticIndexOp(_FingerprintMixin, Relation):
+    """Search index of the distinct values of a model's fields.
+
+    ``strategy`` picks the plan. ``"union"`` aggregates each field on its
+    own and unions the fragments, reading the source once per field.
+    ``"unpivot"`` unnests every selected field into (field, value) cells
+    and aggregates them in a single pass. ``"auto"`` (the default) uses
+    ``"unpivot"`` whenever more than one field is indexed.
+
+    ``sample`` indexes a deterministic, hash-picked subset of at most that
+    many rows rather than the first rows the backend returns.
+    """
+
     source: Relation
     selector: str | list[str] | tuple[str, ...] | Callable | None
     by: str | None = None
     sample: int | None = None
+    strategy: str = "auto"
 
     def __init__(
         self,
@@ -4562,10 +4783,13 @@ class SemanticIndexOp(Relation):
         selector: str | list[str] | tuple[str, ...] | Callable | None = None,
         by: str | None = None,
         sample: int | None = None,
+        strategy: IndexStrategy = "auto",
     ) -> None:
         # Validate sample parameter
         if sample is not None and sample <= 0:
             raise ValueError(f"sample must be positive, got {sample}")
+        if strategy not in ("auto", "unpivot", "union"):
+            raise ValueError(f"strategy must be 'auto', 'unpivot' or 'union', got {strategy!r}")
 
         # Validate 'by' measure exists if provided
         if by is not None:
@@ -4587,6 +4811,7 @@ class SemanticIndexOp(Relation):
             selector=hashable_selector,
             by=by,
             sample=sample,
+            strategy=strategy,
         )
 
     def __repr__(self) -> str:
@@ -4628,13 +4853,13 @@ class SemanticIndexOp(Relation):
 
     def to_untagged(self):
         all_roots = _find_all_root_models(self.source)
-        base_tbl = (
-            _to_untagged(self.source).limit(self.sample)
-            if self.sample
-            else _to_untagged(self.source)
-        )
-
         merged_dimensions = _get_merged_fields(all_roots, "dimensions", source=self.source)
+        base_tbl = _to_untagged(self.source)
+        if self.sample:
+            base_tbl = _hash_sample(
+                base_tbl, self.sample, _sample_keys(base_tbl, merged_dimensions)
+            )
+
         fields_to_index = _get_fields_to_index(
             self.selector,
             merged_dimensions,
@@ -4654,12 +4879,23 @@ class SemanticIndexOp(Relation):
                 },
             )
 
-        def build_fragment(field_name: str) -> Any:
-            field_expr = (
+        def resolve_field(field_name: str) -> Any:
+            return (
                 merged_dimensions[field_name](base_tbl)
                 if field_name in merged_dimensions
                 else base_tbl[field_name]
             )
+
+        if self.strategy == "unpivot" or (self.strategy == "auto" and len(fields_to_index) > 1):
+            fields = [(name, resolve_field(name)) for name in dict.fromkeys(fields_to_index)]
+            return _build_unpivot_index(
+                base_tbl,
+                fields,
+                lambda tbl: _get_weight_expr(tbl, self.by, all_roots, True),
+            )
+
+        def build_fragment(field_name: str) -> Any:
+            field_expr = resolve_field(field_name)
             field_type = field_expr.type()
             type_str = _get_field_type_str(field_type)
             weight_expr = _get_weight_expr(
@@ -4702,7 +4938,9 @@ class SemanticIndexOp(Relation):
         return _expr_module().SemanticLimit(source=self, n=n, offset=offset)
 
     def execute(self):
-        return _rebind_to_canonical_backend(self.to_untagged()).execute()
+        return _execute_on_thread_backend(
+            _rebind_to_canonical_backend(self.to_untagged()), lambda e: e.execute()
+        )
 
     def as_expr(self):
         """Return self as expression."""
@@ -4748,19 +4986,15 @@ def _find_all_root_models(node: Any) -> tuple[SemanticTableOp, ...]:
     return roots
 
 
-def _non_additive_result_columns(node: Any) -> frozenset[str]:
-    """Result columns of a prior aggregate that must not be summed to get a total.
-
-    A post-aggregation ``.mutate()`` only sees the aggregated rows, so its
-    ``t.all(x)`` can only be a window sum over those rows. That equals the
-    true overall value for SUM/COUNT measures and nothing else: summing
-    per-group means, medians, min/max or distinct counts gives a number with
-    no meaning, which is what ``t.all()`` used to return silently.
+def _measure_algebras(node: Any) -> dict[str, MeasureAlgebra]:
+    """Merge algebra of each result column of the aggregate beneath ``node``.
 
-    Classification resolves each measure against its root's raw table, which
-    builds an expression but compiles nothing. Measures that cannot be
-    classified are omitted rather than assumed non-additive — callers keep
-    their historical behaviour for those instead of failing on a guess.
+    Aggregations are matched to measures by their bare reference (or their
+    result name); each base measure is resolved against its root's raw
+    table, which builds an expression but compiles nothing, and classified
+    with :func:`classify_reduction`. Calculated measures are holistic: a
+    ratio or window over aggregated rows cannot be merged. Columns that
+    cannot be classified are omitted.
     """
     current = node
     agg_op = None
@@ -4770,12 +5004,12 @@ def _non_additive_result_columns(node: Any) -> frozenset[str]:
             break
         current = getattr(current, "source", None)
     if agg_op is None:
-        return frozenset()
+        return {}
 
     try:
         roots = _find_all_root_models(agg_op.source)
         if not roots:
-            return frozenset()
+            return {}
         merged_base = _get_merged_fields(roots, "measures")
         merged_calc = _get_merged_fields(roots, "calc_measures")
         probes = []
@@ -4785,38 +5019,45 @@ def _non_additive_result_columns(node: Any) -> frozenset[str]:
                 continue
             probes.append(raw.to_expr() if hasattr(raw, "to_expr") else raw)
     except Exception as exc:
-        logger.debug("additivity classification unavailable: %s", exc)
-        return frozenset()
+        logger.debug("measure classification unavailable: %s", exc)
+        return {}
 
-    non_additive: set[str] = set()
-    for name in agg_op.aggs:
-        resolved = _resolve_short_name(name, merged_base, merged_calc)
+    algebras: dict[str, MeasureAlgebra] = {}
+    for name, fn in agg_op.aggs.items():
+        ref = _detect_bare_name_lambda(_unwrap(fn)) or name
+        resolved = _resolve_short_name(ref, merged_base, merged_calc)
         if resolved is None:
             continue
         if resolved in merged_calc:
-            # A calculated measure is a ratio/window expression; summing it
-            # across groups is never the overall value.
-            non_additive.add(name)
+            algebras[name] = MeasureAlgebra(HOLISTIC, "calc")
             continue
         measure = merged_base.get(resolved)
-        expr = None
         for probe in probes:
             try:
                 expr = _resolve_expr(getattr(measure, "expr", measure), probe)
-                break
             except Exception:
                 continue
-        if expr is None:
-            continue
-        try:
-            if _is_mean_expr(expr) or _reagg_op_for_expr(expr) != "sum":
-                non_additive.add(name)
-        except Exception as exc:
-            # _reagg_op_for_expr raises "this is a bug" for undecomposed
-            # mean / undeferred count-distinct: both are non-additive.
-            logger.debug("treating %r as non-additive: %s", name, exc)
-            non_additive.add(name)
-    return frozenset(non_additive)
+            algebras[name] = classify_reduction(expr)
+            break
+    return algebras
+
+
+def _non_additive_result_columns(node: Any) -> frozenset[str]:
+    """Result columns of a prior aggregate that must not be summed to get a total.
+
+    A post-aggregation ``.mutate()`` only sees the aggregated rows, so its
+    ``t.all(x)`` can only be a window sum over those rows. That equals the
+    true overall value for SUM/COUNT measures and nothing else: summing
+    per-group means, medians, min/max or distinct counts gives a number with
+    no meaning, which is what ``t.all()`` used to return silently.
+
+    Measures that cannot be classified are omitted rather than assumed
+    non-additive — callers keep their historical behaviour for those
+    instead of failing on a guess.
+    """
+    return frozenset(
+        name for name, algebra in _measure_algebras(node).items() if algebra.kind != ADDITIVE
+    )
 
 
 def _has_prior_aggregate(node: Any) -> bool:
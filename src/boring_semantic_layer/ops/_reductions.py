@@ -8,11 +8,26 @@ else must be computed at exact grain.
 
 from __future__ import annotations
 
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+from attrs import frozen
+from ibis.common.collections import FrozenDict
 from ibis.expr import operations as ibis_ops
 from returns.result import safe
 
+from .._xorq import get_ibis_module
 from .._xorq import operations as xorq_ops
 
+#: Re-sums across groups: SUM, COUNT.
+ADDITIVE = "additive"
+#: Re-aggregates with itself but is not a sum: MIN, MAX.
+SEMI_ADDITIVE = "semi_additive"
+#: Finalized from additive partial states: MEAN, VARIANCE, STDDEV.
+DECOMPOSABLE = "decomposable"
+#: Needs the raw rows: COUNT DISTINCT, MEDIAN, quantiles, calc measures, ...
+HOLISTIC = "holistic"
+
 
 def _reductions_for_expr(expr):
     """Return the ``reductions`` ops module matching *expr*'s ibis flavor.
@@ -42,6 +57,13 @@ def _is_count_distinct_expr(expr):
     )
 
 
+def _is_approx_count_distinct_expr(expr):
+    """Check if an ibis expression is an ApproxCountDistinct reduction."""
+    return safe(
+        lambda: isinstance(expr.op(), _reductions_for_expr(expr).ApproxCountDistinct)
+    )().value_or(False)
+
+
 def _is_count_expr(expr):
     """Check if an expression is COUNT(column) or COUNT(*)."""
     try:
@@ -96,3 +118,230 @@ def _reagg_op_for_expr(expr):
 def _build_reagg(col_ref, op_name):
     """Apply the correct re-aggregation to a column reference."""
     return getattr(col_ref, op_name)()
+
+
+@frozen
+class MeasureAlgebra:
+    """How a measure's value at a coarse grain is rebuilt from finer rows.
+
+    A mergeable measure is carried between grains as named partial
+    *states*, each re-aggregated with its ``merges`` reduction and then
+    combined by :meth:`finalize`. Additive and semi-additive measures have
+    the single state ``"value"`` (the measure itself); a mean carries
+    ``sum``/``count``, a variance or standard deviation
+    ``sum``/``sumsq``/``count``. Holistic measures have no states.
+    """
+
+    kind: str
+    reduction: str
+    merges: FrozenDict[str, str] = FrozenDict()
+    how: str | None = None
+
+    @property
+    def mergeable(self) -> bool:
+        return self.kind != HOLISTIC
+
+    def finalize(self, states: Mapping[str, Any]):
+        """Combine merged state columns into the measure value."""
+        if self.kind in (ADDITIVE, SEMI_ADDITIVE):
+            return states["value"]
+        if self.reduction == "mean":
+            return states["sum"] / states["count"].nullif(0)
+        if self.reduction in ("var", "std"):
+            n = states["count"]
+            total = states["sum"]
+            # Textbook one-pass formula: fine for reporting-scale values,
+            # loses precision when the variance is tiny relative to the mean.
+            centered = states["sumsq"] - total * total / n.nullif(0)
+            dof = n - 1 if self.how == "sample" else n
+            variance = centered / dof.nullif(0)
+            return variance.sqrt() if self.reduction == "std" else variance
+        raise ValueError(f"{self.reduction!r} measures cannot be finalized from states")
+
+
+_HOLISTIC_UNKNOWN = MeasureAlgebra(kind=HOLISTIC, reduction="unknown")
+
+
+def classify_reduction(expr) -> MeasureAlgebra:
+    """Classify a measure expression by how it merges across grains.
+
+    Only a bare top-level reduction is mergeable; compound expressions
+    (``sum() / count()``) and anything that is not a reduction at all are
+    holistic, like count-distinct and median.
+
+    ``approx_nunique()`` is holistic here too. Its mergeable state is a
+    HyperLogLog register table rather than a column, so only the join
+    pre-aggregation (``_sketch``) merges it, and ``to_states`` refuses it
+    like the other holistic measures.
+    """
+    try:
+        op = expr.op()
+        reductions = _reductions_for_expr(expr)
+    except Exception:
+        return _HOLISTIC_UNKNOWN
+    if isinstance(op, reductions.Sum):
+        return MeasureAlgebra(ADDITIVE, "sum", FrozenDict(value="sum"))
+    if isinstance(op, (reductions.Count, reductions.CountStar)):
+        return MeasureAlgebra(ADDITIVE, "count", FrozenDict(value="sum"))
+    if isinstance(op, reductions.Min):
+        return MeasureAlgebra(SEMI_ADDITIVE, "min", FrozenDict(value="min"))
+    if isinstance(op, reductions.Max):
+        return MeasureAlgebra(SEMI_ADDITIVE, "max", FrozenDict(value="max"))
+    if isinstance(op, reductions.Mean):
+        return MeasureAlgebra(DECOMPOSABLE, "mean", FrozenDict(sum="sum", count="sum"))
+    if isinstance(op, (reductions.Variance, reductions.StandardDev)):
+        reduction = "var" if isinstance(op, reductions.Variance) else "std"
+        return MeasureAlgebra(
+            DECOMPOSABLE,
+            reduction,
+            FrozenDict(sum="sum", sumsq="sum", count="sum"),
+            how=op.how,
+        )
+    return MeasureAlgebra(HOLISTIC, type(op).__name__.lower())
+
+
+def measure_states(expr) -> dict[str, Any]:
+    """Partial-state reductions of a mergeable measure expression."""
+    algebra = classify_reduction(expr)
+    if algebra.kind in (ADDITIVE, SEMI_ADDITIVE):
+        return {"value": expr}
+    if not algebra.mergeable:
+        raise ValueError(f"{algebra.reduction!r} measures have no mergeable states")
+    op = expr.op()
+    arg = op.arg.to_expr()
+    where = op.where.to_expr() if op.where is not None else None
+    if algebra.reduction == "mean":
+        return {"sum": arg.sum(where=where), "count": arg.count(where=where)}
+    arg = arg.cast("float64")
+    return {
+        "sum": arg.sum(where=where),
+        "sumsq": (arg * arg).sum(where=where),
+        "count": arg.count(where=where),
+    }
+
+
+def sample_moments(expr) -> dict[str, Any]:
+    """Per-row moments of a sum, count or mean: ``sum``, ``sumsq`` and ``count``.
+
+    Treats the reduction as a sum of per-row contributions (the value for a
+    sum or mean, 1 for a counted row), which is what sampling variance
+    estimates are built from.
+    """
+    op = expr.op()
+    reduction = classify_reduction(expr).reduction
+    where = op.where.to_expr() if op.where is not None else None
+    if reduction == "count":
+        return {"sum": expr, "sumsq": expr, "count": expr}
+    if reduction not in ("sum", "mean"):
+        raise ValueError(f"{reduction!r} measures have no sample moments")
+    arg = op.arg.to_expr().cast("float64")
+    return {
+        "sum": arg.sum(where=where),
+        "sumsq": (arg * arg).sum(where=where),
+        "count": arg.count(where=where),
+    }
+
+
+def state_column(name: str, state: str) -> str:
+    """Result column holding ``state`` of measure ``name``.
+
+    Single-state measures keep their own name, so the state table of an
+    all-additive aggregate is its ordinary result.
+    """
+    return name if state == "value" else f"{name}__{state}"
+
+
+def reaggregate(states, by: Iterable[str], algebras: Mapping[str, MeasureAlgebra]):
+    """Merge a finer-grain state table to the grain ``by`` and finalize it.
+
+    ``states`` holds the group keys plus :func:`state_column` columns for
+    every measure in ``algebras`` — one aggregate's state output, or the
+    union of several (per partition, per time slice). The result has the
+    ``by`` columns followed by one column per measure.
+    """
+    by = list(by)
+    holistic = [name for name, algebra in algebras.items() if not algebra.mergeable]
+    if holistic:
+        raise ValueError(f"Measures cannot be re-aggregated from finer rows: {holistic}")
+    merged_states = {
+        state_column(name, state): getattr(states[state_column(name, state)], merge)()
+        for name, algebra in algebras.items()
+        for state, merge in algebra.merges.items()
+    }
+    merged = (
+        states.group_by(by).aggregate(**merged_states) if by else states.aggregate(**merged_states)
+    )
+    return merged.select(
+        *by,
+        **{
+            name: algebra.finalize(
+                {state: merged[state_column(name, state)] for state in algebra.merges}
+            ).name(name)
+            for name, algebra in algebras.items()
+        },
+    )
+
+
+def grouping_level(keys: Sequence[str], kept: Iterable[str]) -> int:
+    """``GROUPING_ID(k1, ..., kn)`` of the grain ``kept``.
+
+    One bit per key of ``keys`` missing from ``kept``, the first key most
+    significant: the full grain is ``0``, the grand total ``2**n - 1``.
+    """
+    kept = set(kept)
+    n = len(keys)
+    return sum(1 << (n - 1 - i) for i, key in enumerate(keys) if key not in kept)
+
+
+def grouping_sets(
+    states,
+    keys: Iterable[str],
+    sets: Iterable[Iterable[str]],
+    algebras: Mapping[str, MeasureAlgebra],
+    grouping_id: str = "grouping_id",
+):
+    """GROUPING SETS of a state table: ``reaggregate`` at every grain in ``sets``.
+
+    Each set is a subset of ``keys``. Rows of every grain come back in one
+    table, keys outside their grain set to NULL and ``grouping_id`` holding
+    :func:`grouping_level` of the grain. Each state row is replicated once
+    per grain (an unnested literal array) and masked before a single merge,
+    so ``states`` is read once even on backends without GROUPING SETS.
+    """
+    keys = list(keys)
+    levels: dict[int, set[str]] = {}
+    for kept in sets:
+        kept = set(kept)
+        levels.setdefault(grouping_level(keys, kept), kept)
+    mod = get_ibis_module(states)
+    replicated = states.mutate(
+        **{grouping_id: mod.literal(list(levels), type="array<int64>").unnest()}
+    )
+    gid = replicated[grouping_id]
+    masked = replicated.mutate(
+        **{
+            key: gid.isin([level for level, kept in levels.items() if key in kept]).ifelse(
+                replicated[key], mod.null()
+            )
+            for key in keys
+        }
+    )
+    return reaggregate(masked, [*keys, grouping_id], algebras)
+
+
+def rollup(
+    states,
+    keys: Iterable[str],
+    algebras: Mapping[str, MeasureAlgebra],
+    grouping_id: str = "grouping_id",
+):
+    """ROLLUP of a state table over ``keys``, in one aggregation.
+
+    Produces the rows of ``reaggregate`` at every prefix of ``keys`` — the
+    full grain, each subtotal level and the grand total — with rolled-up
+    keys set to NULL and ``grouping_id`` numbered like SQL's
+    ``GROUPING_ID(k1, ..., kn)`` (see :func:`grouping_sets`).
+    """
+    keys = list(keys)
+    prefixes = [keys[: len(keys) - rolled] for rolled in range(len(keys) + 1)]
+    return grouping_sets(states, keys, prefixes, algebras, grouping_id)
@@ -289,3 +289,28 @@ class CalcMeasure:
 
     def __hash__(self) -> int:
         return hash((self.description, self.requires_unnest, self.depends_on, self.prefer_known))
+
+
+@frozen(kw_only=True, slots=True)
+class Rollup:
+    """A materialized pre-aggregation registered on a semantic model.
+
+    ``table`` holds one row per combination of ``dimensions``, with one
+    column per dimension and per measure, named like the dimension or
+    measure it materializes. ``dimensions`` and ``measures`` keep the model
+    definitions the rollup was built from, so a model whose definitions
+    later change stops routing to it instead of serving stale semantics.
+    ``merges`` names the aggregation that re-combines each measure column
+    across rollup rows (``sum``, ``min`` or ``max``), and ``time_grains``
+    records the truncate unit of time dimensions stored bucketed.
+    """
+
+    table: Any
+    dimensions: Mapping[str, Dimension]
+    measures: Mapping[str, Measure]
+    merges: Mapping[str, str]
+    time_grains: Mapping[str, str] = field(factory=dict)
+    name: str | None = None
+
+    def __hash__(self) -> int:
+        return hash((self.name, tuple(self.dimensions), tuple(self.measures)))
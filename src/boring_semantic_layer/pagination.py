@@ -0,0 +1,318 @@
+"""Keyset pagination of query results with opaque continuation cursors.
+
+A page is the next ``page_size`` rows of a query result ordered by the
+requested ``order_by`` followed by every other result column, ascending, as
+a deterministic tiebreaker (the dimensions of an aggregate are unique per
+row). NULLs sort last. The cursor handed out with a page records the sort
+key of its last row, so the next page is ``WHERE (sort key) > (last key)``
+on the backend: deep pages cost what the first one does, and a cursor
+stays valid across processes and restarts.
+
+``ResultPager`` additionally keeps results of at most
+``options.page_cache_rows`` rows in memory once their first page was
+requested, so paging through them slices the executed result instead of
+re-running the aggregation. Cached results are dropped after
+``options.page_cache_max_age`` seconds or when a source table's data
+version changes.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import date, datetime
+from decimal import Decimal
+from functools import reduce
+from typing import Any
+
+from attrs import define, frozen
+
+from .config import options
+from .errors import QueryError, SerializationError
+from .expr import _execute_traced, _source_tables, to_untagged
+from .result_cache import data_versions
+from .single_flight import request_key
+
+
+@frozen
+class Page:
+    """One page of a query result.
+
+    Attributes:
+        rows: The page's rows, as a pandas DataFrame.
+        next_cursor: Cursor of the following page; ``None`` on the last page.
+        total_rows: Rows of the whole result, when it is known without
+            counting (the result is cached).
+    """
+
+    rows: Any
+    next_cursor: str | None
+    total_rows: int | None = None
+
+
+def _encode_value(value: Any) -> Any:
+    """JSON form of a sort key value; NULL, NaN and NaT all become ``None``."""
+    if value is None or (isinstance(value, float | datetime) and value != value):
+        return None  # NULL, NaN or NaT
+    item = getattr(value, "item", None)
+    if callable(item) and not isinstance(value, datetime | date):
+        value = item()  # numpy scalar
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"decimal": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        ((kind, text),) = value.items()
+        if kind == "datetime":
+            return datetime.fromisoformat(text)
+        if kind == "date":
+            return date.fromisoformat(text)
+        if kind == "decimal":
+            return Decimal(text)
+        raise QueryError(f"Invalid cursor value {value!r}")
+    return value
+
+
+def encode_cursor(query: str, offset: int, after: Sequence[Any]) -> str:
+    """Opaque cursor: query digest, rows already served and the last sort key."""
+    payload = json.dumps({"q": query, "o": offset, "a": _encode_key(after)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int, list[Any]]:
+    """Inverse of ``encode_cursor``; ``QueryError`` for a malformed cursor."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(payload)
+        return state["q"], int(state["o"]), [_decode_value(v) for v in state["a"]]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise QueryError("Invalid pagination cursor") from e
+
+
+def query_key(model: Any, spec: Any) -> str:
+    """``ResultPager.page`` key of query ``spec`` on ``model``.
+
+    Keyed by the model's fingerprint, so cursors stay valid across
+    processes, restarts and reloads of an unchanged model. A model without
+    a fingerprint is keyed by identity: its cursors only work in-process.
+    """
+    try:
+        identity = model.fingerprint()
+    except SerializationError:
+        identity = f"id-{id(model)}"
+    return request_key(identity, spec)
+
+
+def _resolve_column(field: str, columns: Sequence[str]) -> str:
+    if field in columns:
+        return field
+    unprefixed = field.split(".", 1)[-1]
+    if unprefixed in columns:
+        return unprefixed
+    raise QueryError(f"Cannot paginate by {field!r}: not a sortable column of the result")
+
+
+def sort_keys(
+    columns: Sequence[str], order_by: Sequence[tuple[str, str] | str] | None = None
+) -> list[tuple[str, bool]]:
+    """``(column, descending)`` pairs: ``order_by``, then the other columns ascending."""
+    keys: dict[str, bool] = {}
+    for item in order_by or ():
+        field, direction = (item, "asc") if isinstance(item, str) else item
+        keys.setdefault(
+            _resolve_column(field, columns),
+            str(direction).lower() in ("desc", "descending"),
+        )
+    for column in columns:
+        keys.setdefault(column, False)
+    return list(keys.items())
+
+
+def _ordered(expr, keys: Sequence[tuple[str, bool]]):
+    return expr.order_by(
+        [
+            expr[column].desc(nulls_first=False)
+            if descending
+            else expr[column].asc(nulls_first=False)
+            for column, descending in keys
+        ]
+    )
+
+
+def _after(expr, keys: Sequence[tuple[str, bool]], after: Sequence[Any]):
+    """Predicate of the rows sorting after ``after``; ``None`` when there are none."""
+    terms = []
+    equal = []
+    for (column, descending), value in zip(keys, after, strict=True):
+        col = expr[column]
+        if value is not None:
+            # NULLs sort last in both directions.
+            beyond = (col < value if descending else col > value) | col.isnull()
+            terms.append(reduce(lambda a, b: a & b, [*equal, beyond]))
+        equal.append(col.isnull() if value is None else col == value)
+    return reduce(lambda a, b: a | b, terms) if terms else None
+
+
+def _encode_key(values: Sequence[Any]) -> list[Any]:
+    return [_encode_value(value) for value in values]
+
+
+def _key_of(row: Any, keys: Sequence[tuple[str, bool]]) -> list[Any]:
+    return [row[column] for column, _ in keys]
+
+
+@define
+class _Entry:
+    rows: Any
+    tables: tuple[tuple[str, Any], ...]
+    versions: str
+    built: float
+
+
+class ResultPager:
+    """Serves pages of query results, caching small results between pages.
+
+    Args:
+        max_rows: Largest result kept in memory for paging. Defaults to
+            ``options.page_cache_rows``; ``0`` never caches.
+        max_age: Seconds a cached result is served. Defaults to
+            ``options.page_cache_max_age``.
+        max_entries: Cached results kept, least recently used evicted first.
+    """
+
+    def __init__(
+        self,
+        max_rows: int | None = None,
+        max_age: float | None = None,
+        max_entries: int = 32,
+    ):
+        self._max_rows = max_rows
+        self._max_age = max_age
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    @property
+    def max_rows(self) -> int:
+        return self._max_rows if self._max_rows is not None else options.page_cache_rows
+
+    @property
+    def max_age(self) -> float | None:
+        return self._max_age if self._max_age is not None else options.page_cache_max_age
+
+    def page(
+        self,
+        query_result: Any,
+        *,
+        key: str,
+        page_size: int,
+        cursor: str | None = None,
+        order_by: Sequence[tuple[str, str] | str] | None = None,
+    ) -> Page:
+        """The page of ``query_result`` after ``cursor`` (the first page if ``None``).
+
+        ``key`` identifies the query (see ``query_key``); cursors of other
+        queries are rejected. ``order_by`` is
+        the query's ordering.
+        """
+        if page_size < 1:
+            raise QueryError(f"page_size must be at least 1, got {page_size}")
+        digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+        offset, after = 0, None
+        if cursor is not None:
+            query, offset, after = decode_cursor(cursor)
+            if query != digest:
+                raise QueryError("Pagination cursor belongs to a different query")
+
+        expr = to_untagged(query_result)
+        # Arrays, structs and maps cannot be compared, so never break ties.
+        sortable = [name for name, dtype in expr.schema().items() if not dtype.is_nested()]
+        keys = sort_keys(sortable, order_by)
+        if after is not None and len(after) != len(keys):
+            raise QueryError("Pagination cursor does not match the query's columns")
+        ordered = _ordered(expr, keys)
+
+        entry = self._get(digest)
+        if entry is None and after is None and page_size < self.max_rows:
+            rows = _execute_traced(ordered, lambda e: e.limit(self.max_rows + 1).execute())
+            if len(rows) <= self.max_rows:
+                entry = self._put(digest, rows, expr)
+            else:
+                return self._page(digest, rows.iloc[:page_size], 0, keys, more=True)
+        if entry is not None and (
+            after is None
+            or (
+                0 < offset <= len(entry.rows)
+                and _encode_key(_key_of(entry.rows.iloc[offset - 1], keys)) == _encode_key(after)
+            )
+        ):
+            rows = entry.rows.iloc[offset : offset + page_size]
+            more = offset + page_size < len(entry.rows)
+            return self._page(digest, rows, offset, keys, more, total=len(entry.rows))
+
+        # Keyset query on the backend.
+        if after is not None:
+            predicate = _after(expr, keys, after)
+            if predicate is None:
+                # Only NULLs were left: nothing sorts after them.
+                rows = _execute_traced(ordered, lambda e: e.limit(0).execute())
+                return Page(rows=rows, next_cursor=None)
+            ordered = _ordered(expr.filter(predicate), keys)
+        rows = _execute_traced(ordered, lambda e: e.limit(page_size + 1).execute())
+        return self._page(digest, rows.iloc[:page_size], offset, keys, more=len(rows) > page_size)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _page(digest, rows, offset, keys, more: bool, total: int | None = None) -> Page:
+        next_cursor = None
+        if more and len(rows):
+            next_cursor = encode_cursor(digest, offset + len(rows), _key_of(rows.iloc[-1], keys))
+        return Page(rows=rows.reset_index(drop=True), next_cursor=next_cursor, total_rows=total)
+
+    def _get(self, digest: str) -> _Entry | None:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            max_age = self.max_age
+            if max_age is not None and time.monotonic() - entry.built > max_age:
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+        if repr(data_versions(entry.tables)) != entry.versions:
+            with self._lock:
+                if self._entries.get(digest) is entry:
+                    del self._entries[digest]
+            return None
+        return entry
+
+    def _put(self, digest: str, rows: Any, expr) -> _Entry | None:
+        if self.max_entries < 1:
+            return None
+        tables = tuple(_source_tables(expr)[0])
+        entry = _Entry(rows, tables, repr(data_versions(tables)), time.monotonic())
+        with self._lock:
+            self._entries[digest] = entry
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
@@ -8,7 +8,10 @@ from ibis import BaseBackend
 
 from ._xorq import HAS_XORQ
 from ._xorq import Profile as XorqProfile
+from .config import options
+from .connections import connection_registry
 from .io import read_yaml_file
+from .result_cache import register_data_version
 
 
 class ProfileError(Exception):
@@ -20,7 +23,14 @@ def get_connection(
     profile_file: str | Path | None = None,
     search_locations: list[str] | None = None,
 ) -> BaseBackend:
-    """Get xorq database connection from profile name, dict config, or env vars."""
+    """Get xorq database connection from profile name, dict config, or env vars.
+
+    Each call opens a new connection unless ``options.connection_registry``
+    is on; then connections built from a profile config are shared
+    process-wide through ``connection_registry``, so repeated calls with
+    the same resolved config reuse one connection and its loaded parquet
+    tables.
+    """
     search_locations = search_locations or ["bsl_dir", "local", "xorq_dir"]
 
     # Resolve from env vars if not provided
@@ -151,7 +161,38 @@ def _connect_plain_ibis(ibis, config: dict, conn_type: str) -> BaseBackend:
     return connect_fn.connect(**connect_kwargs)
 
 
+def _resolve_env_vars(value):
+    if isinstance(value, str):
+        return _expand_env_vars(value)
+    if isinstance(value, dict):
+        return {k: _resolve_env_vars(v) for k, v in value.items()}
+    if isinstance(value, list | tuple):
+        return [_resolve_env_vars(v) for v in value]
+    return value
+
+
 def _create_connection_from_config(config: dict) -> BaseBackend:
+    """Get the connection for a config dict with 'type' field.
+
+    Served from the process-wide registry, keyed by the config with
+    environment variables expanded, when ``options.connection_registry``
+    is on. Otherwise a new connection is opened and tracked for its
+    per-thread connections.
+    """
+    if not config.get("type"):
+        raise ProfileError("Profile must specify 'type' field")
+    # Per-thread connections would reload the profile's parquet tables.
+    poolable = not config.get("tables")
+    if not options.connection_registry:
+        return connection_registry.track(
+            _connect(config), lambda: _connect(config), poolable=poolable
+        )
+    return connection_registry.get(
+        _resolve_env_vars(config), lambda: _connect(config), poolable=poolable
+    )
+
+
+def _connect(config: dict) -> BaseBackend:
     """Create database connection from config dict with 'type' field.
 
     When xorq is installed, tries xorq first (handles env-var substitution
@@ -208,3 +249,6 @@ def _load_parquet_tables(connection: BaseBackend, tables_config: dict, conn_type
             raise ProfileError(
                 f"Failed to load parquet file '{source}' as table '{table_name}': {e}"
             ) from e
+        # Cached query results over this table are invalidated when the
+        # file(s) change.
+        register_data_version(table_name, source, backend=connection)
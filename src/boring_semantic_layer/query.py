@@ -6,6 +6,7 @@ Provides parameter-based querying as an alternative to method chaining.
 
 from __future__ import annotations
 
+import logging
 from collections.abc import Callable, Mapping, Sequence
 from typing import Any, ClassVar, Literal
 
@@ -18,6 +19,8 @@ from .errors import QueryError, UnknownFieldError, suggest_kinded, unwrap_or_rai
 from .fieldref import resolve_suffix
 from .safe_eval import safe_eval
 
+logger = logging.getLogger(__name__)
+
 
 def _get_ibis_api():
     """Return xorq's vendored ibis API if available, else plain ibis.
@@ -521,8 +524,6 @@ def _build_time_range_filters(
     if not isinstance(time_range, dict) or "start" not in time_range or "end" not in time_range:
         raise ValueError("time_range must be a dict with 'start' and 'end' keys")
 
-    from datetime import datetime, timedelta
-
     dim_obj = semantic_table.get_dimensions().get(time_dimension)
     if dim_obj is None:
         raise ValueError(
@@ -535,6 +536,21 @@ def _build_time_range_filters(
             "compare_periods and time ranges require a time dimension."
         )
 
+    start_dt, end_bound, end_inclusive = _time_range_bounds(time_range)
+    if end_inclusive:
+        end_filter = lambda t, dim=dim_obj, end=end_bound: dim(t) <= end  # noqa: E731
+    else:
+        end_filter = lambda t, dim=dim_obj, end=end_bound: dim(t) < end  # noqa: E731
+    return [
+        lambda t, dim=dim_obj, start=start_dt: dim(t) >= start,
+        end_filter,
+    ]
+
+
+def _time_range_bounds(time_range: Mapping[str, str]) -> tuple[Any, Any, bool]:
+    """Parse a time range into ``(start, end_bound, end_inclusive)``."""
+    from datetime import datetime, timedelta
+
     start_dt = datetime.fromisoformat(time_range["start"])
     end_dt = datetime.fromisoformat(time_range["end"])
     if end_dt < start_dt:
@@ -545,16 +561,21 @@ def _build_time_range_filters(
     # and comparing <= would silently drop end-date rows with intra-day
     # times, so use an exclusive bound at the next midnight instead. An end
     # with an explicit time component keeps inclusive <= semantics.
-    end_is_date_only = _is_date_only(time_range["end"])
-    if end_is_date_only:
-        end_bound = end_dt + timedelta(days=1)
-        end_filter = lambda t, dim=dim_obj, end=end_bound: dim(t) < end  # noqa: E731
-    else:
-        end_filter = lambda t, dim=dim_obj, end=end_dt: dim(t) <= end  # noqa: E731
-    return [
-        lambda t, dim=dim_obj, start=start_dt: dim(t) >= start,
-        end_filter,
-    ]
+    if _is_date_only(time_range["end"]):
+        return start_dt, end_dt + timedelta(days=1), False
+    return start_dt, end_dt, True
+
+
+def _time_ranges_overlap(first: Mapping[str, str], second: Mapping[str, str]) -> bool:
+    """Whether any instant falls in both ranges (True when undecidable)."""
+    a_start, a_end, a_inclusive = _time_range_bounds(first)
+    b_start, b_end, b_inclusive = _time_range_bounds(second)
+    try:
+        a_before_b_ends = a_start <= b_end if b_inclusive else a_start < b_end
+        b_before_a_ends = b_start <= a_end if a_inclusive else b_start < a_end
+    except TypeError:  # naive vs aware datetimes
+        return True
+    return a_before_b_ends and b_before_a_ends
 
 
 def _is_date_only(value: str) -> bool:
@@ -567,6 +588,13 @@ def _is_date_only(value: str) -> bool:
     return True
 
 
+# Hidden group key labelling each row's period in the single-scan plan.
+_PERIOD_KEY = "__bsl_period"
+
+# Reductions whose value over no rows is 0 rather than NULL.
+_COUNT_REDUCTIONS = frozenset({"count", "countdistinct", "approxcountdistinct"})
+
+
 def compare_periods(
     semantic_table: Any,
     dimensions: Sequence[str] | None = None,
@@ -579,9 +607,18 @@ def compare_periods(
     time_grains: Mapping[str, TimeGrain] | None = None,
     order_by: Sequence[tuple[str, str]] | None = None,
     limit: int | None = None,
+    strategy: Literal["auto", "single_scan", "two_query"] = "auto",
 ) -> Any:
-    """Compare two time ranges and return current/previous/delta columns."""
-    from ._xorq import null_safe_equal
+    """Compare two time ranges and return current/previous/delta columns.
+
+    ``strategy="single_scan"`` reads the fact table once: rows of both
+    ranges are grouped by the requested dimensions plus a period label, and
+    the two periods are pivoted into ``<measure>_current``/``_previous``
+    with filtered aggregates. ``"two_query"`` runs one query per range and
+    outer-joins them. ``"auto"`` (the default) uses the single scan unless
+    the ranges overlap or a calculated measure is requested — a calculated
+    measure's ``t.all(...)`` totals would span both periods.
+    """
     from .api import to_semantic_table
 
     dimensions = list(dimensions or [])
@@ -594,12 +631,13 @@ def compare_periods(
         raise ValueError(
             "compare_periods requires both 'current_time_range' and 'previous_time_range'"
         )
+    if strategy not in ("auto", "single_scan", "two_query"):
+        raise ValueError(f"strategy must be 'auto', 'single_scan' or 'two_query', got {strategy!r}")
 
     dims_dict = semantic_table.get_dimensions()
     known_dimensions = set(dims_dict)
-    known_measures = set(semantic_table.get_measures()) | set(
-        semantic_table.get_calculated_measures()
-    )
+    calc_measures = set(semantic_table.get_calculated_measures())
+    known_measures = set(semantic_table.get_measures()) | calc_measures
     model_name = getattr(semantic_table, "name", None)
 
     dimensions = _normalize_fields(dimensions, known_dimensions, expected_prefix=model_name)
@@ -622,14 +660,84 @@ def compare_periods(
             "or pass time_dimension explicitly."
         )
 
+    current_filters = _build_time_range_filters(
+        semantic_table, resolved_time_dimension, current_time_range
+    )
+    previous_filters = _build_time_range_filters(
+        semantic_table, resolved_time_dimension, previous_time_range
+    )
+
+    blocker = None
+    if _time_ranges_overlap(current_time_range, previous_time_range):
+        blocker = "the time ranges overlap"
+    elif calc_measures.intersection(measures):
+        blocker = f"calculated measures {sorted(calc_measures.intersection(measures))}"
+    elif not hasattr(semantic_table, "with_dimensions"):
+        blocker = f"{type(semantic_table).__name__} cannot take a period dimension"
+    if strategy == "single_scan" and blocker is not None:
+        raise ValueError(f"compare_periods cannot use a single scan: {blocker}")
+
+    if strategy == "two_query" or blocker is not None:
+        plan = _compare_periods_two_query
+    else:
+        plan = _compare_periods_single_scan
+    result_tbl = plan(
+        semantic_table,
+        dimensions=dimensions,
+        measures=measures,
+        filters=filters,
+        current_filters=current_filters,
+        previous_filters=previous_filters,
+        time_grain=time_grain,
+        time_grains=time_grains,
+    )
+
+    pct_mutations = {}
+    delta_mutations = {}
+    for measure in measures:
+        current_col = result_tbl[f"{measure}_current"]
+        previous_col = result_tbl[f"{measure}_previous"]
+        delta_expr = current_col.fill_null(0) - previous_col.fill_null(0)
+        delta_mutations[f"{measure}_delta"] = delta_expr
+        pct_mutations[f"{measure}_pct_change"] = delta_expr / previous_col.nullif(0)
+
+    result_tbl = result_tbl.mutate(**delta_mutations, **pct_mutations)
+
+    if order_by:
+        order_by = _normalize_order_by(
+            order_by, set(result_tbl.columns), expected_prefix=model_name
+        )
+        result_tbl = result_tbl.order_by(
+            [
+                result_tbl[field].desc() if direction.lower() == "desc" else result_tbl[field]
+                for field, direction in order_by
+            ]
+        )
+    if limit is not None:
+        result_tbl = result_tbl.limit(limit)
+
+    return to_semantic_table(result_tbl, name=f"{model_name or 'model'}_period_comparison")
+
+
+def _compare_periods_two_query(
+    semantic_table: Any,
+    *,
+    dimensions: list[str],
+    measures: list[str],
+    filters: list,
+    current_filters: list[Callable],
+    previous_filters: list[Callable],
+    time_grain: TimeGrain | None,
+    time_grains: Mapping[str, TimeGrain] | None,
+):
+    """One query per period, outer-joined on the dimensions."""
+    from ._xorq import null_safe_equal
+
     current_result = query(
         semantic_table=semantic_table,
         dimensions=dimensions,
         measures=measures,
-        filters=[
-            *filters,
-            *_build_time_range_filters(semantic_table, resolved_time_dimension, current_time_range),
-        ],
+        filters=[*filters, *current_filters],
         time_grain=time_grain,
         time_grains=time_grains,
     )
@@ -637,12 +745,7 @@ def compare_periods(
         semantic_table=semantic_table,
         dimensions=dimensions,
         measures=measures,
-        filters=[
-            *filters,
-            *_build_time_range_filters(
-                semantic_table, resolved_time_dimension, previous_time_range
-            ),
-        ],
+        filters=[*filters, *previous_filters],
         time_grain=time_grain,
         time_grains=time_grains,
     )
@@ -666,43 +769,230 @@ def compare_periods(
             for dim in dimensions
         ]
         joined = current_tbl.join(previous_tbl, join_predicates, how="outer")
-        result_tbl = joined.select(
+        return joined.select(
             *[joined[dim].coalesce(joined[f"__previous_{dim}"]).name(dim) for dim in dimensions],
             *[joined[f"{measure}_current"] for measure in measures],
             *[joined[f"{measure}_previous"] for measure in measures],
         )
-    else:
-        joined = current_tbl.join(previous_tbl, how="cross")
-        result_tbl = joined.select(
-            *[joined[f"{measure}_current"] for measure in measures],
-            *[joined[f"{measure}_previous"] for measure in measures],
-        )
+    joined = current_tbl.join(previous_tbl, how="cross")
+    return joined.select(
+        *[joined[f"{measure}_current"] for measure in measures],
+        *[joined[f"{measure}_previous"] for measure in measures],
+    )
 
-    pct_mutations = {}
-    delta_mutations = {}
-    for measure in measures:
-        current_col = result_tbl[f"{measure}_current"]
-        previous_col = result_tbl[f"{measure}_previous"]
-        delta_expr = current_col.fill_null(0) - previous_col.fill_null(0)
-        delta_mutations[f"{measure}_delta"] = delta_expr
-        pct_mutations[f"{measure}_pct_change"] = delta_expr / previous_col.nullif(0)
 
-    result_tbl = result_tbl.mutate(**delta_mutations, **pct_mutations)
+def _all_of(predicates: Sequence[Callable], t: Any):
+    combined = predicates[0](t)
+    for predicate in predicates[1:]:
+        combined = combined & predicate(t)
+    return combined
 
-    if order_by:
-        order_by = _normalize_order_by(
-            order_by, set(result_tbl.columns), expected_prefix=model_name
+
+def _compare_periods_single_scan(
+    semantic_table: Any,
+    *,
+    dimensions: list[str],
+    measures: list[str],
+    filters: list,
+    current_filters: list[Callable],
+    previous_filters: list[Callable],
+    time_grain: TimeGrain | None,
+    time_grains: Mapping[str, TimeGrain] | None,
+):
+    """One scan of both (disjoint) periods, pivoted by a period group key.
+
+    Each ``(dimensions, period)`` group is aggregated exactly as the
+    per-period query would aggregate it, so every base measure — including
+    count-distinct and median — keeps its value, and a group missing from
+    one period gets NULL there just like the outer join gives it. Grouping
+    puts NULL dimension members in one group, matching ``null_safe_equal``.
+    """
+    current, previous = tuple(current_filters), tuple(previous_filters)
+    labelled = semantic_table.with_dimensions(
+        **{
+            _PERIOD_KEY: lambda t, cur=current: _all_of(cur, t).ifelse("current", "previous"),
+        }
+    )
+    in_either = lambda t, cur=current, prev=previous: _all_of(cur, t) | _all_of(prev, t)
+    per_period = query(
+        semantic_table=labelled,
+        dimensions=[*dimensions, _PERIOD_KEY],
+        measures=measures,
+        filters=[*filters, in_either],
+        time_grain=time_grain,
+        time_grains=time_grains,
+    )
+    tbl = per_period.as_table().table
+    is_current = tbl[_PERIOD_KEY] == "current"
+    pivots = {
+        **{f"{m}_current": tbl[m].arbitrary(where=is_current) for m in measures},
+        **{f"{m}_previous": tbl[m].arbitrary(where=~is_current) for m in measures},
+    }
+    if dimensions:
+        return tbl.group_by(dimensions).aggregate(**pivots).select(*dimensions, *pivots)
+
+    # Without dimensions each per-period query returns one row even for an
+    # empty period, where counts are 0 rather than NULL.
+    result = tbl.aggregate(**pivots)
+    algebras = per_period.measure_algebra()
+    counts = [m for m in measures if m in algebras and algebras[m].reduction in _COUNT_REDUCTIONS]
+    return result.mutate(
+        **{
+            f"{m}_{period}": result[f"{m}_{period}"].fill_null(0)
+            for m in counts
+            for period in ("current", "previous")
+        }
+    )
+
+
+# query() arguments every query in a fused batch group must share.
+_BATCH_SHARED_ARGS = ("filters", "time_grain", "time_grains", "time_range")
+# Column of a fused batch aggregation telling its grains apart.
+_BATCH_GROUPING_ID = "__batch_grouping_id"
+
+
+def query_batch(
+    semantic_table: Any,
+    queries: Sequence[Mapping[str, Any]],
+) -> list[Any]:
+    """Run several ``query()`` specs against one model as one aggregation.
+
+    Each spec holds ``query()`` keyword arguments. Specs that share their
+    filters, time grain(s) and time range and differ only in dimensions,
+    measures, ordering and limit are fused: the union of their measures is
+    aggregated into mergeable measure states (see
+    ``SemanticAggregate.to_states``) and merged to every spec's grain in
+    one GROUPING SETS aggregation (see ``ops.grouping_sets``). Each spec's
+    result selects its grain's rows from that aggregation; nothing is
+    executed until a result is.
+
+    Specs that cannot be fused run as ordinary ``query()`` results: specs
+    alone in their group, specs with measure (HAVING) filters, no measures
+    or a ``sample``, and groups whose measures are not mergeable
+    (count-distinct, median, calculated measures). The states are keyed by
+    every dimension of the group, so a group whose specs share no
+    dimension — whose combined grain is the cross product of unrelated
+    dimensions — runs as separate queries too.
+
+    Returns one result per spec, in order; each supports ``execute()``.
+    """
+    from .api import to_semantic_table
+    from .ops import grouping_level, grouping_sets
+
+    specs = [dict(spec) for spec in queries]
+    # Build every query up front: validation errors surface exactly as
+    # they would from query(), and unfused specs use these directly.
+    results = [query(semantic_table=semantic_table, **spec) for spec in specs]
+
+    known_dimensions = set(semantic_table.get_dimensions())
+    known_measures = set(semantic_table.get_measures()) | set(
+        semantic_table.get_calculated_measures()
+    )
+    model_name = getattr(semantic_table, "name", None)
+
+    groups: list[tuple[tuple, list[int]]] = []
+    for index, spec in enumerate(specs):
+        if not spec.get("measures") or spec.get("having") or spec.get("sample") is not None:
+            continue
+        pre_agg: list = []
+        post_agg: list = []
+        for filter_spec in spec.get("filters") or []:
+            _split_filter(filter_spec, known_measures, model_name, pre_agg, post_agg)
+        if post_agg:
+            continue
+        dimensions = _normalize_fields(
+            spec.get("dimensions"), known_dimensions, expected_prefix=model_name
         )
-        result_tbl = result_tbl.order_by(
-            [
-                result_tbl[field].desc() if direction.lower() == "desc" else result_tbl[field]
-                for field, direction in order_by
-            ]
+        # time_range binds to the first time dimension of each query.
+        time_dimension = (
+            find_time_dimension(semantic_table, dimensions) if spec.get("time_range") else None
+        )
+        key = (*(spec.get(arg) or None for arg in _BATCH_SHARED_ARGS), time_dimension)
+        for group_key, members in groups:
+            if group_key == key:
+                members.append(index)
+                break
+        else:
+            groups.append((key, [index]))
+
+    for key, members in groups:
+        if len(members) < 2:
+            continue
+        grains = {
+            index: _normalize_fields(specs[index].get("dimensions"), known_dimensions, model_name)
+            for index in members
+        }
+        # A grand total merges from any grain; the others must overlap.
+        keyed = [set(dims) for dims in grains.values() if dims]
+        if len({frozenset(dims) for dims in keyed}) > 1 and not set.intersection(*keyed):
+            logger.debug("batch group not fused: its queries share no dimension")
+            continue
+        filters, time_grain, time_grains, time_range, time_dimension = key
+        shared_filters = list(filters or [])
+        if time_range:
+            shared_filters.extend(
+                _build_time_range_filters(semantic_table, time_dimension, time_range)
+            )
+        dimensions = _ordered_union(grains.values())
+        measures = _ordered_union(
+            _normalize_fields(specs[i].get("measures"), known_measures, model_name) for i in members
+        )
+        combined = query(
+            semantic_table=semantic_table,
+            dimensions=dimensions,
+            measures=measures,
+            filters=shared_filters,
+            time_grain=time_grain,
+            time_grains=time_grains,
+        )
+        try:
+            states = combined.to_states()
+        except QueryError as exc:
+            logger.debug("batch group not fused: %s", exc)
+            continue
+        fused_members = []
+        for index in members:
+            try:
+                combined._reaggregation_algebras(grains[index])
+            except QueryError as exc:
+                logger.debug("batch query %d not fused: %s", index, exc)
+                continue
+            fused_members.append(index)
+        if len(fused_members) < 2:
+            continue
+        fused = grouping_sets(
+            states,
+            dimensions,
+            [grains[index] for index in fused_members],
+            combined.measure_algebra(),
+            _BATCH_GROUPING_ID,
         )
-    if limit is not None:
-        result_tbl = result_tbl.limit(limit)
 
-    return to_semantic_table(result_tbl, name=f"{model_name or 'model'}_period_comparison")
+        for index in fused_members:
+            spec = specs[index]
+            spec_dims = grains[index]
+            spec_measures = _normalize_fields(spec.get("measures"), known_measures, model_name)
+            tbl = fused.filter(
+                fused[_BATCH_GROUPING_ID] == grouping_level(dimensions, spec_dims)
+            ).select(*spec_dims, *spec_measures)
+            order_by = _normalize_order_by(
+                spec.get("order_by"), set(tbl.columns), expected_prefix=model_name
+            )
+            if order_by:
+                tbl = tbl.order_by(
+                    [
+                        tbl[field].desc() if direction.lower() == "desc" else tbl[field]
+                        for field, direction in order_by
+                    ]
+                )
+            if spec.get("limit") is not None:
+                tbl = tbl.limit(spec["limit"])
+            results[index] = to_semantic_table(tbl, name=model_name)
+    return results
+
+
+def _ordered_union(field_lists) -> list[str]:
+    return list(dict.fromkeys(field for fields in field_lists for field in fields))
 
 
 def query(
@@ -716,6 +1006,7 @@ def query(
     time_grains: Mapping[str, TimeGrain] | None = None,
     time_range: Mapping[str, str] | None = None,
     having: Sequence[dict[str, Any] | str | Callable | Filter] | None = None,
+    sample: float | None = None,
 ) -> Any:  # Returns SemanticModel or SemanticAggregate
     """
     Query semantic table using parameter-based interface with time dimension support.
@@ -739,6 +1030,11 @@ def query(
         having: Optional list of post-aggregation filters.  These are always
             applied after group-by/aggregate regardless of field type.  Use
             this for callable/lambda filters that reference measures.
+        sample: Optional fraction in (0, 1]. Aggregate a row sample of the
+            fact table instead of all of it: sums and counts are rescaled to
+            estimate the full totals, and sums, counts and means gain
+            ``<measure>_ci_low``/``<measure>_ci_high`` 95% confidence bounds.
+            See ``SemanticAggregate.approximate``.
 
     Returns:
         SemanticAggregate or SemanticTable ready for execution
@@ -784,6 +1080,13 @@ def query(
             measures=["total_sales"],
             time_range={"start": "2024-01-01", "end": "2024-12-31"}
         ).execute()
+
+        # Estimated from a 1% sample, with confidence bounds
+        result = st.query(
+            dimensions=["carrier"],
+            measures=["flight_count"],
+            sample=0.01
+        ).execute()
     """
     from .ops import Dimension
 
@@ -917,8 +1220,11 @@ def query(
             #   self.expr.resolve(table) if _is_deferred(self.expr) else self.expr(table)
             # Calling orig_expr(t) directly on a Deferred would cause infinite recursion.
             truncate_unit = TIME_GRAIN_TRANSFORMATIONS[grain]
+            grain_expr = lambda t, dim=dim_obj, unit=truncate_unit: dim(t).truncate(unit)
+            # Lets rollup routing recognise a bucketing of a declared dimension.
+            grain_expr.__bsl_time_grain__ = (dim_obj, truncate_unit)
             time_dims_to_transform[dim_name] = Dimension(
-                expr=lambda t, dim=dim_obj, unit=truncate_unit: dim(t).truncate(unit),
+                expr=grain_expr,
                 description=dim_obj.description,
                 is_time_dimension=dim_obj.is_time_dimension,
                 smallest_time_grain=dim_obj.smallest_time_grain,
@@ -937,6 +1243,13 @@ def query(
         # No dimensions = grand total aggregation
         result = result.group_by().aggregate(*measures)
 
+    # Step 3.25: Estimate from a sample; ordering, HAVING and limit then
+    # apply to the estimates.
+    if sample is not None:
+        if not measures:
+            raise ValueError("sample requires at least one measure")
+        result = result.approximate(sample)
+
     # Step 3.5: Apply measure filters after aggregation (HAVING semantics)
     for filter_spec in post_agg_filters:
         filter_fn = _normalize_post_agg_filter(filter_spec, known_post_agg_fields, model_name)
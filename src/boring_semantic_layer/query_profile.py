@@ -0,0 +1,176 @@
+"""Execution profile of one semantic query: where its time goes.
+
+``SemanticTable.profile()`` compiles and executes the query under a
+``tracing.trace`` and reports, in a ``QueryProfile``:
+
+* wall time per phase, including the compile steps of
+  ``_compile_aggregation`` and ``to_untagged_with_preagg`` as
+  ``compile.aggregation.*`` and ``compile.preagg.*`` sub-phases;
+* the generated SQL, its size and its number of joins and subqueries;
+* backend execution time, rows returned and Arrow bytes transferred;
+* the backend's own ``EXPLAIN ANALYZE`` output where the backend has one.
+
+Profiling always executes on the backend: the result cache is bypassed.
+``EXPLAIN ANALYZE`` runs the query a second time.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Mapping
+from typing import Any
+
+from attrs import asdict, field, frozen
+
+from .expr import _execute_traced, to_untagged
+from .tracing import QueryTrace, phase, trace
+
+logger = logging.getLogger(__name__)
+
+#: Statement prefix that runs and profiles a query, by backend name.
+_EXPLAIN_ANALYZE = {
+    "datafusion": "EXPLAIN ANALYZE",
+    "duckdb": "EXPLAIN ANALYZE",
+    "mysql": "EXPLAIN ANALYZE",
+    "postgres": "EXPLAIN ANALYZE",
+    "trino": "EXPLAIN ANALYZE",
+}
+
+
+@frozen
+class QueryProfile:
+    """Where the time of one query execution went.
+
+    Attributes:
+        phases: Seconds per phase (``compile``, ``sql``, ``execute``,
+            ``convert``, ``explain``) and per compile step
+            (``compile.preagg.combine``, ...).
+        wall_seconds: Total time of the profiled execution.
+        sql: The generated SQL.
+        sql_bytes: Size of ``sql`` in UTF-8 bytes.
+        joins: JOIN clauses in ``sql`` (``None`` if it could not be parsed).
+        subqueries: Subqueries and CTEs in ``sql`` (``None`` if it could
+            not be parsed).
+        rows: Rows returned.
+        nbytes: Size of the result as transferred, in Arrow bytes.
+        backend: Name of the backend that executed the query.
+        explain: The backend's ``EXPLAIN ANALYZE`` output, if available.
+    """
+
+    phases: Mapping[str, float]
+    wall_seconds: float
+    sql: str | None
+    sql_bytes: int | None
+    joins: int | None
+    subqueries: int | None
+    rows: int
+    nbytes: int
+    backend: str | None = None
+    explain: str | None = field(default=None, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-serializable form of the profile."""
+        return asdict(self)
+
+    def __str__(self) -> str:
+        lines = [
+            f"wall time      {self.wall_seconds * 1000:10.1f} ms",
+            *(
+                f"  {name:<28}{seconds * 1000:10.1f} ms"
+                for name, seconds in sorted(self.phases.items())
+            ),
+            f"sql            {self.sql_bytes} bytes, {self.joins} joins, "
+            f"{self.subqueries} subqueries",
+            f"result         {self.rows} rows, {self.nbytes} bytes ({self.backend})",
+        ]
+        if self.explain:
+            lines += ["", self.explain]
+        return "\n".join(lines)
+
+
+def _sql_shape(sql: str, dialect: str | None) -> tuple[int | None, int | None]:
+    """Number of joins and of subqueries (incl. CTEs) in ``sql``."""
+    try:
+        import sqlglot
+        from sqlglot import exp
+    except ImportError:
+        return None, None
+    for read in (dialect, None):
+        try:
+            tree = sqlglot.parse_one(sql, read=read)
+        except Exception:  # noqa: BLE001 - unknown dialect or unparseable SQL
+            continue
+        joins = sum(1 for _ in tree.find_all(exp.Join))
+        subqueries = sum(1 for _ in tree.find_all(exp.Subquery, exp.CTE))
+        return joins, subqueries
+    return None, None
+
+
+def _explain_analyze(backend: Any, sql: str) -> str | None:
+    prefix = _EXPLAIN_ANALYZE.get(getattr(backend, "name", None))
+    if prefix is None:
+        return None
+    result = backend.raw_sql(f"{prefix} {sql}")
+    try:
+        rows = result.fetchall()
+    finally:
+        # DuckDB's ``raw_sql`` returns the backend's own connection: only
+        # close real cursors.
+        close = getattr(result, "close", None)
+        if callable(close) and result is not getattr(backend, "con", None):
+            close()
+    # DuckDB returns (label, plan) rows; other backends one line per row.
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def _explain(expr, sql: str) -> str | None:
+    from .ops import _execute_on_thread_backend
+
+    # On the thread's cursor, like the profiled execution, so the tables
+    # it reads are visible.
+    return _execute_on_thread_backend(expr, lambda e: _explain_analyze(_backend_of(e), sql))
+
+
+def _backend_of(expr) -> Any | None:
+    try:
+        return expr._find_backend(use_default=True)
+    except Exception:  # noqa: BLE001 - e.g. tables of several backends
+        return None
+
+
+def profile_query(semantic_table, *, analyze: bool = True) -> QueryProfile:
+    """Execute ``semantic_table`` once and report where the time went.
+
+    ``analyze=False`` skips the backend's ``EXPLAIN ANALYZE``, which runs
+    the query again.
+    """
+    start = time.perf_counter()
+    with trace(QueryTrace(capture_sql=True)) as query_trace:
+        expr = to_untagged(semantic_table)
+        table = _execute_traced(expr, lambda e: e.to_pyarrow())
+        with phase("convert"):
+            table.to_pandas()
+        sql = query_trace.annotations.get("sql")
+        backend = _backend_of(expr)
+        backend_name = getattr(backend, "name", None)
+        explain = None
+        if analyze and sql is not None and backend is not None:
+            with phase("explain"):
+                try:
+                    explain = _explain(expr, sql)
+                except Exception as e:  # noqa: BLE001 - the profile is still useful
+                    logger.debug("EXPLAIN ANALYZE failed on %s: %s", backend_name, e)
+    joins, subqueries = _sql_shape(sql, backend_name) if sql is not None else (None, None)
+    return QueryProfile(
+        phases=dict(query_trace.phases),
+        wall_seconds=time.perf_counter() - start,
+        sql=sql,
+        sql_bytes=len(sql.encode()) if sql is not None else None,
+        joins=joins,
+        subqueries=subqueries,
+        rows=table.num_rows,
+        nbytes=table.nbytes,
+        backend=backend_name,
+        explain=explain,
+    )
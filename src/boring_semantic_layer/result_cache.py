@@ -0,0 +1,321 @@
+"""Opt-in cache of executed query results.
+
+Dashboards, MCP agents and HTTP clients re-run the same semantic queries
+constantly; each run is a full warehouse round trip. With
+``options.result_cache = True``, ``SemanticTable.execute``/``to_pandas``/
+``to_pyarrow`` (and therefore every ``query(...)`` result) store their
+output here, keyed by the expression's structural ``fingerprint()``, so an
+identical query spec is answered from memory.
+
+Entries are invalidated when a source's *data version* changes. Versions
+come from callbacks registered per source table with
+``register_data_version`` — a plain callable, or one or more file paths /
+globs whose mtime and size form the version (profiles register their
+parquet tables automatically). A registration is scoped to one backend
+connection, or applies to same-named tables of every backend when no
+backend is given. Tables without a registered version are only invalidated
+by ``options.result_cache_ttl`` and eviction.
+
+Eviction is LRU by memory footprint, bounded by
+``options.result_cache_max_bytes``. Counters are exposed through
+``result_cache_info()``.
+"""
+
+from __future__ import annotations
+
+import glob
+import logging
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any
+
+from attrs import frozen
+
+from .config import options
+
+logger = logging.getLogger(__name__)
+
+DataVersion = Callable[[], Hashable]
+
+#: A source table: its name, or ``(name, backend)`` for a table of one connection.
+TableRef = str | tuple[str, Any]
+
+# Keyed by (id of the backend or None for every backend, table name).
+# Scoped keys are dropped when their backend is collected, before its id
+# can be reused.
+_DATA_VERSIONS: dict[tuple[int | None, str], DataVersion] = {}
+_DATA_FILES: dict[tuple[int | None, str], tuple[str, ...]] = {}
+_DATA_VERSIONS_LOCK = threading.Lock()
+
+
+def _key(table: str, backend: Any) -> tuple[int | None, str]:
+    return (None if backend is None else id(backend), table)
+
+
+def _forget(key: tuple[int | None, str]) -> None:
+    with _DATA_VERSIONS_LOCK:
+        _DATA_VERSIONS.pop(key, None)
+        _DATA_FILES.pop(key, None)
+
+
+def file_data_version(*paths: str | os.PathLike) -> DataVersion:
+    """Build a data-version callback from file paths or glob patterns.
+
+    The version is the sorted ``(path, mtime_ns, size)`` of every matching
+    file, so rewriting, appending to, adding or removing a file changes it.
+    Remote URIs (``s3://`` and the like) cannot be stat'ed and contribute
+    only their literal path.
+    """
+    patterns = tuple(os.fspath(p) for p in paths)
+
+    def version() -> tuple:
+        stats = []
+        for pattern in patterns:
+            if "://" in pattern:
+                stats.append((pattern, None, None))
+                continue
+            for path in sorted(glob.glob(pattern)) or [pattern]:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    stats.append((path, None, None))
+                else:
+                    stats.append((path, st.st_mtime_ns, st.st_size))
+        return tuple(stats)
+
+    return version
+
+
+def register_data_version(
+    table: str,
+    version: DataVersion | str | os.PathLike | Iterable[str | os.PathLike],
+    *,
+    backend: Any = None,
+) -> None:
+    """Register how to compute the data version of a source table.
+
+    Args:
+        table: Name of the source table as known to its backend.
+        version: A zero-argument callable returning any hashable version
+            (a snapshot id, a max ``updated_at``, ...), or file path(s) /
+            glob(s) whose mtime and size are the version.
+        backend: The connection holding ``table``. ``None`` applies the
+            version to same-named tables of every backend that has no
+            registration of its own.
+    """
+    files = None
+    if not callable(version):
+        paths = [version] if isinstance(version, str | os.PathLike) else list(version)
+        files = tuple(os.fspath(p) for p in paths)
+        version = file_data_version(*paths)
+    key = _key(table, backend)
+    with _DATA_VERSIONS_LOCK:
+        _DATA_VERSIONS[key] = version
+        if files is None:
+            _DATA_FILES.pop(key, None)
+        else:
+            _DATA_FILES[key] = files
+    if backend is not None:
+        weakref.finalize(backend, _forget, key)
+
+
+def unregister_data_version(table: str, *, backend: Any = None) -> None:
+    """Forget the data-version callback of ``table`` (no-op if absent)."""
+    _forget(_key(table, backend))
+
+
+def data_files(table: str, backend: Any) -> tuple[str, ...] | None:
+    """File paths / globs ``table`` of ``backend`` was registered with, or ``None``.
+
+    Only set when the data version was registered as paths for that
+    backend, which is how profiles register the parquet files they load as
+    tables. Registrations without a backend are ignored: their files need
+    not be what this connection reads.
+    """
+    with _DATA_VERSIONS_LOCK:
+        return _DATA_FILES.get(_key(table, backend))
+
+
+def data_versions(tables: Iterable[TableRef]) -> tuple:
+    """Current data versions of ``tables``; unknown tables version as ``None``."""
+    callbacks = []
+    with _DATA_VERSIONS_LOCK:
+        for ref in tables:
+            name, backend = (ref, None) if isinstance(ref, str) else ref
+            callback = _DATA_VERSIONS.get(_key(name, backend)) if backend is not None else None
+            callbacks.append((name, callback or _DATA_VERSIONS.get((None, name))))
+    return tuple(
+        (name, callback() if callback is not None else None)
+        for name, callback in sorted(callbacks, key=lambda item: item[0])
+    )
+
+
+def _nbytes(value: Any) -> int:
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            return int(memory_usage(deep=True).sum())
+        except Exception:  # noqa: BLE001 - fall back to a shallow estimate
+            pass
+    return sys.getsizeof(value)
+
+
+def _detach(value: Any) -> Any:
+    """Copy mutable results so callers cannot corrupt the cached entry."""
+    copy = getattr(value, "copy", None)
+    if callable(copy) and hasattr(value, "memory_usage"):
+        return copy()
+    return value
+
+
+@frozen
+class ResultCacheInfo:
+    """Counters of the result cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    entries: int
+    nbytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@frozen
+class _Entry:
+    value: Any
+    nbytes: int
+    versions: tuple
+    created: float
+    owners: tuple[weakref.ref, ...] = ()
+
+    def owners_alive(self) -> bool:
+        return all(ref() is not None for ref in self.owners)
+
+
+class _ResultCache:
+    """Thread-safe, byte-bounded LRU of query results."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        tables: Iterable[TableRef],
+        compute: Callable[[], Any],
+        owners: Iterable[Any] = (),
+    ) -> Any:
+        owners = tuple(owners)
+        # Fingerprints name tables by backend kind, not connection; two
+        # in-process connections holding same-named tables must not share
+        # entries. Ids are only trusted while the owner is alive.
+        key = (key, tuple(id(owner) for owner in owners))
+        versions = data_versions(tables)
+        now = time.monotonic()
+        ttl = options.result_cache_ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stale = (
+                    entry.versions != versions
+                    or not entry.owners_alive()
+                    or (ttl is not None and now - entry.created > ttl)
+                )
+                if stale:
+                    self._drop(key)
+                    self._invalidations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return _detach(entry.value)
+            self._misses += 1
+
+        value = compute()
+        refs = tuple(weakref.ref(owner) for owner in owners)
+        self._store(key, _Entry(value, _nbytes(value), versions, now, refs))
+        return _detach(value)
+
+    def _store(self, key: Hashable, entry: _Entry) -> None:
+        max_bytes = options.result_cache_max_bytes
+        if entry.nbytes > max_bytes:
+            logger.debug("result of %d bytes exceeds the cache budget; not cached", entry.nbytes)
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._nbytes += entry.nbytes
+            while self._nbytes > max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._evictions += 1
+
+    def _drop(self, key: Hashable) -> None:
+        self._nbytes -= self._entries.pop(key).nbytes
+
+    def info(self) -> ResultCacheInfo:
+        with self._lock:
+            return ResultCacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                invalidations=self._invalidations,
+                entries=len(self._entries),
+                nbytes=self._nbytes,
+                max_bytes=options.result_cache_max_bytes,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self._hits = self._misses = self._evictions = self._invalidations = 0
+
+
+_RESULT_CACHE = _ResultCache()
+
+
+def result_cache_info() -> ResultCacheInfo:
+    """Return hit/miss/eviction/invalidation counters and the cache footprint."""
+    return _RESULT_CACHE.info()
+
+
+def clear_result_cache() -> None:
+    """Drop every cached result and reset the counters."""
+    _RESULT_CACHE.clear()
+
+
+def cached_result(
+    key: Hashable,
+    tables: Iterable[TableRef],
+    compute: Callable[[], Any],
+    owners: Iterable[Any] = (),
+) -> Any:
+    """Return the cached result for ``key`` or compute and store it.
+
+    ``tables`` are the source tables whose data versions guard the entry; ``owners`` are the backend connections the result was read from.
+    Bypasses the cache entirely unless ``options.result_cache`` is on.
+    """
+    if not options.result_cache:
+        return compute()
+    return _RESULT_CACHE.get_or_compute(key, tables, compute, owners)
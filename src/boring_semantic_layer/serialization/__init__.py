@@ -3,6 +3,7 @@
 Public API:
     to_tagged     — serialize a BSL expression into xorq tagged metadata
     from_tagged   — reconstruct a BSL expression from tagged metadata
+    fingerprint   — deterministic cross-process digest of a BSL expression
     BSLSerializationContext — configuration context for serialization
 """
 
@@ -22,6 +23,7 @@ from .extract import (
     serialize_dimensions,
     serialize_measures,
 )
+from .fingerprint import fingerprint
 from .freeze import freeze
 from .reconstruct import (
     extract_xorq_metadata,
@@ -193,6 +195,7 @@ __all__ = [
     "BSLSerializationContext",
     "XorqModule",
     "deserialize_calc_measures",
+    "fingerprint",
     "from_tagged",
     "serialize_calc_measures",
     "serialize_dimensions",
@@ -0,0 +1,334 @@
+"""Deterministic structural fingerprints of BSL expressions.
+
+A fingerprint is a SHA-256 digest over a canonical, JSON-encoded
+description of the op tree: every semantic op contributes its type and
+arguments, dimension/measure/filter/aggregation callables contribute
+their resolver tree (the same form ``codec.expr_to_structured`` writes
+into tag metadata), and source tables contribute their identity — backend
+kind and connection, namespace, name and schema for database tables,
+content digest for in-memory tables. A connection is identified by the
+profile config it was opened from, else by its connect arguments (e.g. the
+database path); in-memory databases exist in one process only and are
+identified per connection object. Nothing else in the payload depends on
+object identity or ``PYTHONHASHSEED``, so equal queries fingerprint equally
+across processes and workers.
+
+Callables that do not resolve against a ``Deferred`` fall back to their
+bytecode, constants, defaults and closure values; that form is stable
+across processes of the same Python version. Anything that has no stable
+description raises ``SerializationError`` rather than producing a key
+that could collide.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import enum
+import functools
+import hashlib
+import json
+import types
+import uuid
+from collections.abc import Mapping
+from typing import Any
+
+import attrs
+from returns.result import Success
+
+from .._xorq import Expr as XorqExpr
+from ..connections import connection_registry
+from ..errors import SerializationError
+from ..ops._compile_cache import IdentityMemo, _cell_is_set, _referenced_names
+from .codec import _encode_scalar, _is_deferred, expr_to_structured
+
+FINGERPRINT_VERSION = "1"
+
+_ATOMS = (str, int, float, bool, type(None))
+
+# Digests of semantic ops, kept for as long as the op is alive. Ops are
+# immutable, so a subtree shared by many queries (the root model with its
+# hundreds of measures) is described once.
+_OP_DIGESTS = IdentityMemo()
+
+# Per-process ids of in-memory database connections.
+_MEMORY_BACKENDS = IdentityMemo()
+
+
+def _digest(payload: Any) -> str:
+    encoded = json.dumps(payload, separators=(",", ":"), ensure_ascii=True, allow_nan=True)
+    return hashlib.sha256(encoded.encode("ascii")).hexdigest()
+
+
+def _jsonable(value: Any) -> Any:
+    """Turn codec output (nested tuples of scalars) into JSON lists."""
+    if isinstance(value, tuple | list):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def _is_semantic_op(obj: Any) -> bool:
+    return type(obj).__module__.startswith("boring_semantic_layer.ops") and hasattr(
+        obj, "__argnames__"
+    )
+
+
+def _is_concrete(obj: Any) -> bool:
+    return hasattr(type(obj), "__argnames__") and hasattr(obj, "__args__")
+
+
+def _qualname(obj: Any) -> str:
+    return f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', type(obj).__name__)}"
+
+
+class _Canonicalizer:
+    """Single-use walker producing the JSON payload of an op tree."""
+
+    def __init__(self):
+        self._active: set[int] = set()
+
+    def canon(self, obj: Any) -> Any:
+        if isinstance(obj, _ATOMS):
+            return obj
+        if id(obj) in self._active:
+            raise SerializationError(
+                f"Cannot fingerprint self-referencing {type(obj).__name__} object"
+            )
+        self._active.add(id(obj))
+        try:
+            return self._canon(obj)
+        finally:
+            self._active.discard(id(obj))
+
+    def _canon(self, obj: Any) -> Any:
+        from ..ops import Measure, _CallableWrapper
+
+        if _is_semantic_op(obj):
+            return ["op", self.op_digest(obj)]
+        if isinstance(obj, _CallableWrapper):
+            return self.canon(obj.unwrap)
+        if isinstance(obj, Measure) and obj.original_expr is not None:
+            # Measure.expr is an internal ColumnScope adapter around the
+            # user's lambda; the original is what serialization records.
+            return self._attrs(obj, overrides={"expr": obj.original_expr})
+        if isinstance(obj, enum.Enum):
+            return ["enum", _qualname(type(obj)), self.canon(obj.value)]
+        if attrs.has(type(obj)):
+            return self._attrs(obj)
+        if _is_deferred(obj) or callable(obj) and not isinstance(obj, type):
+            return self._callable(obj)
+        if hasattr(obj, "op") and isinstance(obj, XorqExpr | _ibis_expr_type()):
+            return self.canon(obj.op())
+        if _is_concrete(obj):
+            return self._node(obj)
+        if _is_backend(obj):
+            return ["backend", obj.name, _backend_identity(obj)]
+        if isinstance(obj, Mapping):
+            return ["map", [[self.canon(k), self.canon(v)] for k, v in obj.items()]]
+        if isinstance(obj, tuple | list):
+            return [self.canon(v) for v in obj]
+        if isinstance(obj, set | frozenset):
+            return ["set", sorted((self.canon(v) for v in obj), key=_digest)]
+        if isinstance(obj, type):
+            return ["type", _qualname(obj)]
+        if isinstance(obj, types.ModuleType):
+            return ["module", obj.__name__]
+        try:
+            return ["scalar", _jsonable(_encode_scalar(obj))]
+        except ValueError:
+            raise SerializationError(
+                f"Cannot fingerprint object of type {type(obj).__name__}: "
+                "it has no stable cross-process description"
+            ) from None
+
+    def op_digest(self, op: Any) -> str:
+        cached = _OP_DIGESTS.get(op)
+        if cached is None:
+            payload = [
+                type(op).__name__,
+                [
+                    [name, self.canon(arg)]
+                    for name, arg in zip(op.__argnames__, op.__args__, strict=True)
+                ],
+            ]
+            cached = _OP_DIGESTS[op] = _digest(payload)
+        return cached
+
+    def _attrs(self, obj: Any, overrides: Mapping[str, Any] | None = None) -> list:
+        overrides = overrides or {}
+        return [
+            "attrs",
+            _qualname(type(obj)),
+            [
+                [f.name, self.canon(overrides.get(f.name, getattr(obj, f.name)))]
+                for f in attrs.fields(type(obj))
+                if f.eq
+            ],
+        ]
+
+    def _node(self, node: Any) -> list:
+        name = type(node).__name__
+        if name == "InMemoryTable":
+            # Memtable names are generated per process; the content is the
+            # identity.
+            return ["memtable", self._schema(node.schema), _table_content_digest(node)]
+        if name == "DatabaseTable":
+            return [
+                "table",
+                node.name,
+                self.canon(node.namespace),
+                self.canon(node.source),
+                self._schema(node.schema),
+            ]
+        if name == "Schema":
+            return self._schema(node)
+        if _is_datatype(node):
+            return ["dtype", str(node)]
+        return [
+            "node",
+            name,
+            [
+                [arg_name, self.canon(arg)]
+                for arg_name, arg in zip(node.__argnames__, node.__args__, strict=True)
+            ],
+        ]
+
+    @staticmethod
+    def _schema(schema: Any) -> list:
+        return ["schema", [[name, str(dtype)] for name, dtype in schema.items()]]
+
+    def _callable(self, fn: Any) -> list:
+        bare_ref = getattr(fn, "_bsl_bare_ref", None) if not _is_deferred(fn) else None
+        if isinstance(bare_ref, str):
+            return ["ref", bare_ref]
+
+        markers = {}
+        if not _is_deferred(fn):
+            fields = getattr(fn, "__bsl_filter_fields__", None)
+            if fields:
+                markers["filter_fields"] = sorted(fields)
+            with contextlib.suppress(AttributeError, TypeError):
+                fn = object.__getattribute__(fn, "__bsl_serialization_predicate__")
+
+        struct = expr_to_structured(fn)
+        if isinstance(struct, Success):
+            return ["expr", _jsonable(struct.unwrap()), markers]
+        if _is_deferred(fn):
+            return ["deferred", repr(fn), markers]
+        return ["code", self._code_callable(fn), markers]
+
+    def _code_callable(self, fn: Any) -> list:
+        if isinstance(fn, functools.partial):
+            return [
+                "partial",
+                self.canon(fn.func),
+                self.canon(fn.args),
+                self.canon(dict(fn.keywords)),
+            ]
+        if isinstance(fn, types.MethodType):
+            return ["method", self.canon(fn.__self__), self.canon(fn.__func__)]
+        if isinstance(fn, types.BuiltinFunctionType):
+            return ["builtin", _qualname(fn)]
+        if not isinstance(fn, types.FunctionType):
+            raise SerializationError(
+                f"Cannot fingerprint callable of type {type(fn).__name__}: "
+                "it is neither a Deferred expression nor a plain function"
+            )
+        closure = [
+            self.canon(cell.cell_contents) if _cell_is_set(cell) else ["empty-cell"]
+            for cell in fn.__closure__ or ()
+        ]
+        referenced = _referenced_names(fn.__code__)
+        global_atoms = sorted(
+            [name, value]
+            for name, value in fn.__globals__.items()
+            if name in referenced and isinstance(value, _ATOMS)
+        )
+        return [
+            "function",
+            fn.__module__,
+            _code_payload(fn.__code__),
+            self.canon(fn.__defaults__),
+            self.canon(fn.__kwdefaults__),
+            closure,
+            global_atoms,
+        ]
+
+
+@functools.cache
+def _ibis_expr_type() -> type:
+    from ibis.expr.types import Expr
+
+    return Expr
+
+
+def _is_backend(obj: Any) -> bool:
+    return any(cls.__name__ == "BaseBackend" for cls in type(obj).__mro__)
+
+
+_MEMORY_DATABASES = (None, "", ":memory:")
+
+
+def _backend_identity(backend: Any) -> list:
+    key = connection_registry.config_key_of(backend)
+    if key is not None:
+        return ["profile", key]
+    args = list(getattr(backend, "_con_args", ()))
+    kwargs = dict(getattr(backend, "_con_kwargs", {}))
+    database = args[0] if args else kwargs.get("database")
+    if (args or kwargs) and not (backend.name == "duckdb" and database in _MEMORY_DATABASES):
+        return ["connect", [repr(a) for a in args], sorted([k, repr(v)] for k, v in kwargs.items())]
+    memory_id = _MEMORY_BACKENDS.get(backend)
+    if memory_id is None:
+        memory_id = _MEMORY_BACKENDS[backend] = uuid.uuid4().hex
+    return ["memory", memory_id]
+
+
+def _is_datatype(obj: Any) -> bool:
+    return any(cls.__name__ == "DataType" for cls in type(obj).__mro__)
+
+
+def _code_payload(code: types.CodeType) -> list:
+    consts = [
+        _code_payload(c) if isinstance(c, types.CodeType) else _jsonable(_encode_const(c))
+        for c in code.co_consts
+    ]
+    return [code.co_name, code.co_code.hex(), consts, list(code.co_names), list(code.co_varnames)]
+
+
+def _encode_const(value: Any) -> Any:
+    if isinstance(value, frozenset):
+        return ["frozenset", sorted(repr(v) for v in value)]
+    try:
+        return _encode_scalar(value)
+    except ValueError:
+        return repr(value)
+
+
+def _table_content_digest(node: Any) -> str:
+    import pyarrow as pa
+
+    table = node.data.to_pyarrow(node.schema)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return hashlib.sha256(sink.getvalue().to_pybytes()).hexdigest()
+
+
+def fingerprint(expr: Any) -> str:
+    """Return a deterministic, cross-process fingerprint of a BSL expression.
+
+    Accepts a semantic expression (``SemanticTable`` and subclasses) or a
+    semantic op. Two expressions get the same fingerprint when they have
+    the same model definition, filters, grouping keys, aggregations and
+    source tables.
+
+    Raises:
+        SerializationError: If part of the expression has no stable
+            description (e.g. a lambda closing over an arbitrary object).
+    """
+    op = expr.op() if hasattr(expr, "op") and not _is_semantic_op(expr) else expr
+    if not _is_semantic_op(op):
+        raise SerializationError(
+            f"fingerprint() expects a semantic expression or op, got {type(expr).__name__}"
+        )
+    return f"bsl{FINGERPRINT_VERSION}-{_Canonicalizer().op_digest(op)}"
@@ -17,8 +17,13 @@ def main(
     port: int = 8000,
     reload: bool = False,
     cors_origins: Sequence[str] | None = None,
+    reload_models: bool = False,
 ) -> None:
-    """Start the BSL HTTP API server with uvicorn."""
+    """Start the BSL HTTP API server with uvicorn.
+
+    ``reload`` restarts the process on code changes; ``reload_models``
+    instead swaps edited models in without a restart.
+    """
     try:
         import uvicorn
     except ImportError as exc:
@@ -31,6 +36,8 @@ def main(
         os.environ["BSL_CONFIG_PATH"] = str(Path(config).resolve())
     if cors_origins:
         os.environ["BSL_CORS_ORIGINS"] = ",".join(cors_origins)
+    if reload_models:
+        os.environ["BSL_RELOAD_MODELS"] = "1"
 
     uvicorn.run(
         "boring_semantic_layer.server.api:app",
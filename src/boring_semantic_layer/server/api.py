@@ -2,24 +2,43 @@
 
 from __future__ import annotations
 
+import asyncio
 import inspect
 import json
 import logging
 import os
-import re
 import secrets
+import time
 from collections.abc import Awaitable, Callable, Mapping, Sequence
 from contextlib import asynccontextmanager
-from typing import Any
+from typing import Any, Literal
 
 from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field, model_validator
 
+from boring_semantic_layer.pagination import ResultPager, query_key
 from boring_semantic_layer.query import find_time_dimension
-
+from boring_semantic_layer.single_flight import SingleFlight, request_key
+from boring_semantic_layer.time_range import TimeRangeCache
+from boring_semantic_layer.tracing import QueryTrace, phase, trace
+from boring_semantic_layer.value_index import DimensionValueIndexStore, MatchMode
+
+from .executor import ExecutionLimit, ExecutionPools
+from .jobs import (
+    JSON_PAGE_ROWS,
+    MAX_JSON_PAGE_ROWS,
+    PARQUET_MEDIA_TYPE,
+    JobManager,
+    read_batches,
+    read_records,
+)
 from .loader import load_models
+from .metrics import CONTENT_TYPE, Metrics, model_label
+from .reload import ModelReloader
+from .streaming import MEDIA_TYPES, ResponseFormat, encode_arrow, stream_query
 
 logger = logging.getLogger(__name__)
 
@@ -38,12 +57,20 @@ class QueryRequest(BaseModel):
     time_grain: str | None = None
     time_grains: dict[str, str] | None = None
     time_range: dict[str, str] | None = None
+    sample: float | None = Field(default=None, gt=0, le=1)
     get_records: bool = True
     records_limit: int | None = Field(default=None, ge=1)
     get_chart: bool = True
     chart_backend: str | None = None
     chart_format: str | None = None
     chart_spec: dict[str, Any] | None = None
+    response_format: ResponseFormat = "json"
+    # Adds a ``profile`` (``SemanticTable.profile(analyze=False)``) to the response.
+    profile: bool = False
+    # Keyset pagination: ``page_size`` rows per response, continued with the
+    # ``next_cursor`` of the previous page.
+    page_size: int | None = Field(default=None, ge=1, le=100_000)
+    cursor: str | None = None
 
     @model_validator(mode="after")
     def _check_grain_fields(self) -> QueryRequest:
@@ -55,6 +82,20 @@ class QueryRequest(BaseModel):
             )
         return self
 
+    @model_validator(mode="after")
+    def _check_paging_fields(self) -> QueryRequest:
+        if self.cursor is not None and self.page_size is None:
+            raise ValueError("'cursor' requires 'page_size'")
+        if self.page_size is not None and (self.profile or self.response_format != "json"):
+            raise ValueError("Paged queries support neither 'profile' nor streaming formats")
+        return self
+
+
+class QueryBatchRequest(BaseModel):
+    """HTTP request body for the batch query endpoint."""
+
+    queries: list[QueryRequest] = Field(min_length=1, max_length=100)
+
 
 class ComparePeriodsRequest(BaseModel):
     """HTTP request body for the compare-periods endpoint."""
@@ -88,6 +129,69 @@ class ComparePeriodsRequest(BaseModel):
         return self
 
 
+def _query_spec(payload: QueryRequest) -> dict[str, Any]:
+    return {
+        "dimensions": payload.dimensions,
+        "measures": payload.measures,
+        "filters": payload.filters or [],
+        "order_by": payload.order_by,
+        "limit": payload.limit,
+        "time_grain": payload.time_grain,
+        "time_grains": payload.time_grains,
+        "time_range": payload.time_range,
+        "sample": payload.sample,
+    }
+
+
+def _render_result(query_result: Any, payload: QueryRequest | ComparePeriodsRequest) -> dict:
+    response = json.loads(
+        _generate_chart_with_data()(
+            query_result,
+            get_records=payload.get_records,
+            records_limit=payload.records_limit,
+            get_chart=payload.get_chart,
+            chart_backend=payload.chart_backend,
+            chart_format=payload.chart_format,
+            chart_spec=payload.chart_spec,
+            default_backend="altair",
+        )
+    )
+    if "error" in response:
+        raise HTTPException(status_code=400, detail=response["error"])
+    return response
+
+
+def _page_response(
+    pager: ResultPager, model: Any, query_result: Any, payload: QueryRequest
+) -> dict[str, Any]:
+    page = pager.page(
+        query_result,
+        key=query_key(model, _query_spec(payload)),
+        page_size=payload.page_size,
+        cursor=payload.cursor,
+        order_by=payload.order_by,
+    )
+    with phase("convert"):
+        records = json.loads(page.rows.to_json(orient="records", date_format="iso"))
+    response: dict[str, Any] = {
+        "columns": list(page.rows.columns),
+        "records": records,
+        "returned_rows": len(records),
+        "next_cursor": page.next_cursor,
+    }
+    if page.total_rows is not None:
+        response["total_rows"] = page.total_rows
+    return response
+
+
+def _profile_response(query_result: Any) -> dict[str, Any]:
+    profile = getattr(query_result, "profile", None)
+    if profile is None:
+        raise HTTPException(status_code=400, detail="This query cannot be profiled")
+    # No EXPLAIN ANALYZE: it would run the query yet again.
+    return profile(analyze=False).to_dict()
+
+
 def _generate_chart_with_data():
     """Resolve the chart generator from the agents extra at call time.
 
@@ -107,6 +211,10 @@ def _generate_chart_with_data():
     return generate_chart_with_data
 
 
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
 def _default_cors_origins() -> list[str]:
     raw = os.environ.get("BSL_CORS_ORIGINS")
     if not raw:
@@ -127,6 +235,12 @@ def _api_key_auth_hook(api_key: str) -> AuthHook:
     return authenticate
 
 
+def _endpoint(request: Request) -> str:
+    """Route template of the request (``/models/{model_name}/schema``), for metric labels."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
 def _get_models(request: Request) -> Mapping[str, Any]:
     return request.app.state.models
 
@@ -162,35 +276,26 @@ def _build_model_response(model: Any) -> dict[str, Any]:
     return response
 
 
-def _get_time_range_response(model: Any, model_name: str) -> dict[str, str]:
+def _get_time_range_response(
+    model: Any, model_name: str, time_ranges: TimeRangeCache
+) -> dict[str, str]:
     dimensions = model.get_dimensions()
     time_dim_name = find_time_dimension(model, list(dimensions))
     if not time_dim_name:
         raise HTTPException(status_code=400, detail=f"Model '{model_name}' has no time dimension")
-
-    tbl = model.table
-    time_col = dimensions[time_dim_name](tbl)
-    result = tbl.aggregate(start=time_col.min(), end=time_col.max()).execute()
-
-    def to_iso(value: Any) -> str:
-        # Some backends materialize an Ibis date aggregate as a midnight
-        # pandas Timestamp. Preserve the semantic datatype in the HTTP value.
-        if time_col.type().is_date() and callable(as_date := getattr(value, "date", None)):
-            value = as_date()
-        return value.isoformat()
-
-    return {
-        "start": to_iso(result["start"].iloc[0]),
-        "end": to_iso(result["end"].iloc[0]),
-    }
+    # Cached until a source's data version changes; parquet-backed tables
+    # are answered from footer statistics without a scan.
+    return time_ranges.get(model_name, model, time_dim_name).as_dict()
 
 
 def _search_dimension_values_response(
     model: Any,
     model_name: str,
     dimension_name: str,
+    value_indexes: DimensionValueIndexStore,
     search_term: str | None = None,
     limit: int = 20,
+    match: MatchMode = "contains",
 ) -> dict[str, Any]:
     dims = model.get_dimensions()
     if dimension_name not in dims:
@@ -201,68 +306,9 @@ def _search_dimension_values_response(
                 f"Available dimensions: {list(dims.keys())}"
             ),
         )
-
-    from boring_semantic_layer.nested_compile import get_ibis_module as _get_ibis_module
-
-    dim = dims[dimension_name]
-    tbl = model.table
-    # Match the ibis module of the underlying table so sort keys etc. don't
-    # mix plain ibis with xorq-vendored types.
-    ibis_module = _get_ibis_module(tbl)
-    col_expr = dim(tbl)
-    agg = (
-        tbl.select(col_expr.name("_value"))
-        .filter(lambda t: t["_value"].notnull())
-        .group_by("_value")
-        .aggregate(frequency=lambda t: t.count())
-    )
-    total_distinct = int(agg.count().execute())
-
-    def to_value_list(df) -> list[dict[str, Any]]:
-        return [
-            {"value": str(row["_value"]), "count": int(row["frequency"])}
-            for _, row in df.iterrows()
-        ]
-
-    def fetch(base_agg, n: int) -> tuple[list[dict[str, Any]], bool]:
-        df = base_agg.order_by(ibis_module.desc("frequency")).limit(n + 1).execute()
-        return to_value_list(df.head(n)), len(df) <= n
-
-    separator_pattern = r"[\s\-_.,]+"
-
-    if search_term:
-        search_normalized = re.sub(separator_pattern, " ", search_term.lower()).strip()
-        filtered_agg = agg.filter(
-            lambda t: (
-                t["_value"]
-                .cast("string")
-                .lower()
-                .re_replace(separator_pattern, " ")
-                .strip()
-                .contains(search_normalized)
-            )
-        )
-        values, is_complete = fetch(filtered_agg, limit)
-        if not values:
-            fallback_values, fallback_complete = fetch(agg, limit)
-            return {
-                "total_distinct": total_distinct,
-                "is_complete": fallback_complete,
-                "values": [],
-                "fallback_top_values": fallback_values,
-                "note": (
-                    f"No matches found for '{search_term}'. "
-                    "Showing top values for reference; use one of these exact spellings."
-                ),
-            }
-    else:
-        values, is_complete = fetch(agg, limit)
-
-    return {
-        "total_distinct": total_distinct,
-        "is_complete": is_complete,
-        "values": values,
-    }
+    # Answered from an in-memory index, so autocomplete keystrokes don't
+    # hit the warehouse; the request that finds it stale refreshes it.
+    return value_indexes.search(model_name, model, dimension_name, search_term, limit, match)
 
 
 def create_app(
@@ -272,6 +318,11 @@ def create_app(
     cors_origins: Sequence[str] | None = None,
     auth_hook: AuthHook | None = None,
     api_key: str | None = None,
+    execution_limits: Mapping[str, ExecutionLimit] | None = None,
+    default_execution_limit: ExecutionLimit | None = None,
+    reload_models: bool | None = None,
+    reload_interval: float = 1.0,
+    jobs: JobManager | None = None,
 ) -> FastAPI:
     """Create the FastAPI app for the BSL HTTP server.
 
@@ -279,6 +330,31 @@ def create_app(
     preflight requests. It may raise ``HTTPException`` or return ``False`` to
     reject a request. For simple deployments, ``api_key`` (or ``BSL_API_KEY``)
     enables Bearer and ``X-BSL-API-Key`` authentication.
+
+    Endpoints that query a backend run on a bounded pool per backend name,
+    sized by ``execution_limits`` (e.g. ``{"snowflake": ExecutionLimit(8, 64)}``)
+    and ``default_execution_limit`` for the rest (``BSL_EXECUTION_WORKERS`` /
+    ``BSL_EXECUTION_MAX_QUEUED`` when omitted). A full pool answers ``503``;
+    ``/execution`` reports queue depths. Metadata endpoints never queue.
+    Identical query requests in flight at the same time share one execution.
+
+    ``/query`` pages through results with ``page_size`` and the returned
+    ``next_cursor``; results small enough stay cached between pages.
+
+    ``/jobs`` runs heavy queries in the background instead: submit a query,
+    poll ``/jobs/{job_id}``, fetch ``/jobs/{job_id}/result`` as JSON, Arrow
+    or parquet, and ``DELETE`` to cancel. Jobs run on their own workers, a
+    fixed number per backend. ``jobs`` sets the workers and the result store
+    (``BSL_JOBS_DIR``, ``BSL_JOB_WORKERS``, ``BSL_JOB_RESULT_TTL`` when
+    omitted).
+
+    ``/metrics`` serves Prometheus metrics: request and per-model query
+    latency histograms, query time per phase (normalize, compile, sql,
+    execute, convert, chart), cache hit rates and in-flight counts.
+
+    ``reload_models`` (or ``BSL_RELOAD_MODELS=1``) watches the config file
+    and swaps in edited models without a restart, every ``reload_interval``
+    seconds at most; unchanged models keep their caches and connections.
     """
 
     if auth_hook is not None and api_key:
@@ -287,13 +363,34 @@ def create_app(
     effective_auth_hook = auth_hook or (
         _api_key_auth_hook(configured_api_key) if configured_api_key else None
     )
+    if reload_models is None:
+        reload_models = models is None and _env_flag("BSL_RELOAD_MODELS")
+    if reload_models and models is not None:
+        raise ValueError("reload_models requires loading models from config_path")
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         app.state.models = models if models is not None else load_models(config_path)
-        yield
+        app.state.value_indexes = DimensionValueIndexStore()
+        app.state.time_ranges = TimeRangeCache()
+        app.state.execution = ExecutionPools(execution_limits, default_execution_limit)
+        app.state.single_flight = SingleFlight()
+        app.state.pager = ResultPager()
+        app.state.jobs = jobs if jobs is not None else JobManager()
+        watcher = None
+        if reload_models:
+            reloader = ModelReloader(config_path, interval=reload_interval)
+            watcher = asyncio.create_task(reloader.watch(app.state))
+        try:
+            yield
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            app.state.execution.shutdown()
+            app.state.jobs.shutdown()
 
     app = FastAPI(title="Boring Semantic Layer HTTP API", version="0.1.0", lifespan=lifespan)
+    app.state.metrics = Metrics()
 
     @app.middleware("http")
     async def authenticate_request(request: Request, call_next):
@@ -324,11 +421,24 @@ def create_app(
             )
         return await call_next(request)
 
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            request.app.state.metrics.observe_request(
+                _endpoint(request), request.method, status, time.perf_counter() - start
+            )
+
     allowed_origins = list(_default_cors_origins() if cors_origins is None else cors_origins)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=allowed_origins,
-        allow_methods=["GET", "POST"],
+        allow_methods=["GET", "POST", "DELETE"],
         allow_headers=["Authorization", "Content-Type", "X-BSL-API-Key"],
     )
 
@@ -341,101 +451,262 @@ def create_app(
         logger.exception("Unhandled HTTP API error")
         return JSONResponse(status_code=500, content={"detail": "Internal server error"})
 
+    async def run_for(request: Request, model: Any, fn: Callable[..., Any], *args: Any):
+        """Run ``fn`` on ``model``'s execution pool, traced into the query metrics."""
+        query_trace = QueryTrace()
+
+        def traced() -> Any:
+            with trace(query_trace):
+                return fn(*args)
+
+        with request.app.state.metrics.observe_query(
+            _endpoint(request), model_label(model), query_trace
+        ):
+            return await request.app.state.execution.run_for(model, traced)
+
+    def run_shared(request: Request, model: Any, key: Any, fn: Callable[..., Any], *args: Any):
+        """``run_for``, sharing one execution between identical requests in flight."""
+        # id(model) tells reloaded model versions apart; the call in flight
+        # keeps the model alive, so its id cannot be reused meanwhile.
+        return request.app.state.single_flight.do_async(
+            request_key(id(model), key), run_for, request, model, fn, *args
+        )
+
     @app.get("/health")
-    def health() -> dict[str, str]:
+    async def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/execution")
+    async def execution_stats(request: Request) -> dict[str, Any]:
+        """Running/queued calls and counters of each backend's execution pool."""
+        return request.app.state.execution.stats()
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics(request: Request) -> PlainTextResponse:
+        """Prometheus metrics in the text exposition format."""
+        body = request.app.state.metrics.render(
+            execution=request.app.state.execution,
+            single_flight=request.app.state.single_flight,
+            jobs=request.app.state.jobs,
+        )
+        return PlainTextResponse(body, media_type=CONTENT_TYPE)
+
     @app.get("/models")
-    def list_models(request: Request) -> dict[str, str]:
-        return {
-            name: model.description or f"Semantic model: {name}"
-            for name, model in _get_models(request).items()
-        }
+    async def list_models(request: Request) -> dict[str, str]:
+        models = _get_models(request)
+        # A model's first schema resolution can be slow; keep it off the event loop.
+        return await run_in_threadpool(
+            lambda: {
+                name: model.description or f"Semantic model: {name}"
+                for name, model in models.items()
+            }
+        )
 
     @app.get("/models/{model_name}/schema")
-    def get_model(model_name: str, request: Request) -> dict[str, Any]:
+    async def get_model(model_name: str, request: Request) -> dict[str, Any]:
         model = _get_model_or_404(_get_models(request), model_name)
-        return _build_model_response(model)
+        return await run_in_threadpool(_build_model_response, model)
 
     @app.get("/models/{model_name}/time-range")
-    def get_time_range(model_name: str, request: Request) -> dict[str, str]:
+    async def get_time_range(model_name: str, request: Request) -> dict[str, str]:
         model = _get_model_or_404(_get_models(request), model_name)
-        return _get_time_range_response(model, model_name)
+        return await run_for(
+            request,
+            model,
+            _get_time_range_response,
+            model,
+            model_name,
+            request.app.state.time_ranges,
+        )
 
     @app.get("/models/{model_name}/dimensions/{dimension_name}/values")
-    def search_dimension_values(
+    async def search_dimension_values(
         model_name: str,
         dimension_name: str,
         request: Request,
         search_term: str | None = None,
         limit: int = Query(default=20, ge=1, le=1_000),
+        match: MatchMode = "contains",
     ) -> dict[str, Any]:
         model = _get_model_or_404(_get_models(request), model_name)
-        return _search_dimension_values_response(
-            model, model_name, dimension_name, search_term, limit
+        return await run_for(
+            request,
+            model,
+            _search_dimension_values_response,
+            model,
+            model_name,
+            dimension_name,
+            request.app.state.value_indexes,
+            search_term,
+            limit,
+            match,
         )
 
-    @app.post("/query")
-    def query_model(payload: QueryRequest, request: Request) -> dict[str, Any]:
+    @app.post("/query", response_model=None)
+    async def query_model(
+        payload: QueryRequest, request: Request
+    ) -> dict[str, Any] | StreamingResponse:
+        """Query a model; ``response_format`` "arrow"/"ndjson" streams the rows."""
         model = _get_model_or_404(_get_models(request), payload.model_name)
+        if payload.response_format != "json":
+            if payload.profile:
+                raise HTTPException(
+                    status_code=400, detail="profile requires response_format 'json'"
+                )
+            return await stream_query(
+                request.app.state.execution,
+                model,
+                lambda: model.query(**_query_spec(payload)),
+                payload.response_format,
+                payload.records_limit,
+            )
 
-        query_result = model.query(
-            dimensions=payload.dimensions,
-            measures=payload.measures,
-            filters=payload.filters or [],
-            order_by=payload.order_by,
-            limit=payload.limit,
-            time_grain=payload.time_grain,
-            time_grains=payload.time_grains,
-            time_range=payload.time_range,
-        )
-        response = json.loads(
-            _generate_chart_with_data()(
-                query_result,
-                get_records=payload.get_records,
-                records_limit=payload.records_limit,
-                get_chart=payload.get_chart,
-                chart_backend=payload.chart_backend,
-                chart_format=payload.chart_format,
-                chart_spec=payload.chart_spec,
-                default_backend="altair",
+        def run() -> dict[str, Any]:
+            query_result = model.query(**_query_spec(payload))
+            if payload.page_size is not None:
+                return _page_response(request.app.state.pager, model, query_result, payload)
+            # Profiled first, so its timings are not of a warmed-up query.
+            profile = _profile_response(query_result) if payload.profile else None
+            response = _render_result(query_result, payload)
+            if profile is not None:
+                response["profile"] = profile
+            return response
+
+        return await run_shared(request, model, ("query", payload.model_dump(mode="json")), run)
+
+    @app.post("/query/batch")
+    async def query_batch(payload: QueryBatchRequest, request: Request) -> dict[str, Any]:
+        """Run dashboard tiles together; tiles sharing a scan are fused."""
+        models = _get_models(request)
+        by_model: dict[str, list[int]] = {}
+        for index, item in enumerate(payload.queries):
+            _get_model_or_404(models, item.model_name)
+            if item.response_format != "json":
+                raise HTTPException(
+                    status_code=400,
+                    detail="Batch queries only support response_format 'json'",
+                )
+            if item.profile or item.page_size is not None:
+                raise HTTPException(
+                    status_code=400, detail="Batch queries cannot be profiled or paged; use /query"
+                )
+            by_model.setdefault(item.model_name, []).append(index)
+
+        def run(model_name: str, indices: list[int]) -> list[dict[str, Any]]:
+            batch = models[model_name].query_batch(
+                [_query_spec(payload.queries[index]) for index in indices]
+            )
+            return [
+                _render_result(query_result, payload.queries[index])
+                for index, query_result in zip(indices, batch, strict=True)
+            ]
+
+        # Each model's tiles run on its backend's pool, concurrently.
+        rendered = await asyncio.gather(
+            *(
+                run_shared(
+                    request,
+                    models[model_name],
+                    (
+                        "batch",
+                        [payload.queries[index].model_dump(mode="json") for index in indices],
+                    ),
+                    run,
+                    model_name,
+                    indices,
+                )
+                for model_name, indices in by_model.items()
             )
         )
-        if "error" in response:
-            raise HTTPException(status_code=400, detail=response["error"])
-        return response
+        results: list[Any] = [None] * len(payload.queries)
+        for indices, responses in zip(by_model.values(), rendered, strict=True):
+            for index, response in zip(indices, responses, strict=True):
+                results[index] = response
+        return {"results": results}
 
     @app.post("/compare-periods")
-    def compare_periods(payload: ComparePeriodsRequest, request: Request) -> dict[str, Any]:
+    async def compare_periods(payload: ComparePeriodsRequest, request: Request) -> dict[str, Any]:
         model = _get_model_or_404(_get_models(request), payload.model_name)
 
-        query_result = model.compare_periods(
-            dimensions=payload.dimensions,
-            measures=payload.measures,
-            current_time_range=payload.current_time_range,
-            previous_time_range=payload.previous_time_range,
-            filters=payload.filters or [],
-            time_dimension=payload.time_dimension,
-            time_grain=payload.time_grain,
-            time_grains=payload.time_grains,
-            order_by=payload.order_by,
-            limit=payload.limit,
+        def run() -> dict[str, Any]:
+            query_result = model.compare_periods(
+                dimensions=payload.dimensions,
+                measures=payload.measures,
+                current_time_range=payload.current_time_range,
+                previous_time_range=payload.previous_time_range,
+                filters=payload.filters or [],
+                time_dimension=payload.time_dimension,
+                time_grain=payload.time_grain,
+                time_grains=payload.time_grains,
+                order_by=payload.order_by,
+                limit=payload.limit,
+            )
+            return _render_result(query_result, payload)
+
+        return await run_shared(
+            request, model, ("compare-periods", payload.model_dump(mode="json")), run
         )
-        response = json.loads(
-            _generate_chart_with_data()(
-                query_result,
-                get_records=payload.get_records,
-                records_limit=payload.records_limit,
-                get_chart=payload.get_chart,
-                chart_backend=payload.chart_backend,
-                chart_format=payload.chart_format,
-                chart_spec=payload.chart_spec,
-                default_backend="altair",
+
+    @app.post("/jobs", status_code=202)
+    async def submit_job(payload: QueryRequest, request: Request) -> JSONResponse:
+        """Run a query in the background; poll the returned job for its result."""
+        model = _get_model_or_404(_get_models(request), payload.model_name)
+        if payload.profile or payload.page_size is not None:
+            raise HTTPException(
+                status_code=400, detail="Jobs cannot be profiled or paged; use /query"
             )
+        jobs = request.app.state.jobs
+        job = jobs.submit(
+            payload.model_name,
+            lambda: model.query(**_query_spec(payload)),
+            backend=request.app.state.execution.backend_of(model),
+        )
+        return JSONResponse(
+            status_code=202,
+            content=job.as_dict(jobs.result_ttl),
+            headers={"Location": f"/jobs/{job.id}"},
         )
-        if "error" in response:
-            raise HTTPException(status_code=400, detail=response["error"])
-        return response
+
+    @app.get("/jobs/{job_id}")
+    async def get_job(job_id: str, request: Request) -> dict[str, Any]:
+        """Status and progress (rows written so far) of a job."""
+        jobs = request.app.state.jobs
+        return jobs.get(job_id).as_dict(jobs.result_ttl)
+
+    @app.get("/jobs/{job_id}/result", response_model=None)
+    async def get_job_result(
+        job_id: str,
+        request: Request,
+        format: Literal["json", "arrow", "parquet"] = "json",
+        offset: int = Query(default=0, ge=0),
+        limit: int | None = Query(default=None, ge=1, le=100_000),
+    ) -> dict[str, Any] | FileResponse | StreamingResponse:
+        """The result of a succeeded job; ``offset``/``limit`` slice JSON and Arrow rows.
+
+        JSON is served in pages of ``limit`` rows (``JSON_PAGE_ROWS`` by default,
+        ``MAX_JSON_PAGE_ROWS`` at most).
+        """
+        path = request.app.state.jobs.result_path(job_id)
+        if format == "parquet":
+            return FileResponse(path, media_type=PARQUET_MEDIA_TYPE, filename=f"{job_id}.parquet")
+        if format == "arrow":
+            reader = await run_in_threadpool(read_batches, path, offset)
+            return StreamingResponse(encode_arrow(reader, limit), media_type=MEDIA_TYPES["arrow"])
+        if limit is not None and limit > MAX_JSON_PAGE_ROWS:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"JSON pages hold at most {MAX_JSON_PAGE_ROWS} rows; "
+                    "page with offset or fetch format=arrow or parquet"
+                ),
+            )
+        return await run_in_threadpool(read_records, path, offset, limit or JSON_PAGE_ROWS)
+
+    @app.delete("/jobs/{job_id}")
+    async def cancel_job(job_id: str, request: Request) -> dict[str, Any]:
+        """Cancel a queued or running job, or delete a finished one and its result."""
+        jobs = request.app.state.jobs
+        return jobs.cancel(job_id).as_dict(jobs.result_ttl)
 
     return app
 
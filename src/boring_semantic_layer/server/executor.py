@@ -0,0 +1,211 @@
+"""Per-backend execution pools for warehouse-bound HTTP handlers.
+
+Queries, period comparisons and value searches run blocking backend calls.
+Running them on Starlette's shared threadpool lets a burst of heavy queries
+occupy every thread, so even ``/models`` waits. Instead, each backend gets
+its own bounded thread pool and an admission limit: at most
+``workers + max_queued`` calls are in flight per backend, and further calls
+are rejected with ``503`` rather than piling up. Metadata endpoints run on
+the event loop and never enter a pool.
+
+Models are assigned to the pool of the backend that owns their tables,
+by backend name (``"duckdb"``, ``"snowflake"``, ...); connections of the
+same backend type share a pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from collections.abc import Callable, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from attrs import asdict, field, frozen
+from fastapi import HTTPException
+
+T = TypeVar("T")
+
+DEFAULT_BACKEND = "default"
+
+
+def _positive(_instance, attribute, value: int) -> None:
+    if value < 1:
+        raise ValueError(f"{attribute.name} must be at least 1, got {value}")
+
+
+def _non_negative(_instance, attribute, value: int) -> None:
+    if value < 0:
+        raise ValueError(f"{attribute.name} must be non-negative, got {value}")
+
+
+@frozen
+class ExecutionLimit:
+    """Size of one backend's execution pool.
+
+    Attributes:
+        workers: Calls executed concurrently against the backend.
+        max_queued: Calls allowed to wait for a worker; beyond that, new
+            calls are rejected with ``503``.
+    """
+
+    workers: int = field(default=4, validator=_positive)
+    max_queued: int = field(default=32, validator=_non_negative)
+
+
+@frozen
+class PoolStats:
+    """Snapshot of one execution pool's queue."""
+
+    backend: str
+    workers: int
+    max_queued: int
+    running: int
+    queued: int
+    completed: int
+    rejected: int
+
+
+def default_execution_limit() -> ExecutionLimit:
+    """Limit from ``BSL_EXECUTION_WORKERS`` / ``BSL_EXECUTION_MAX_QUEUED``."""
+    defaults = ExecutionLimit()
+    return ExecutionLimit(
+        workers=int(os.environ.get("BSL_EXECUTION_WORKERS", defaults.workers)),
+        max_queued=int(os.environ.get("BSL_EXECUTION_MAX_QUEUED", defaults.max_queued)),
+    )
+
+
+class _Pool:
+    def __init__(self, backend: str, limit: ExecutionLimit):
+        self.backend = backend
+        self.limit = limit
+        self.executor = ThreadPoolExecutor(
+            max_workers=limit.workers, thread_name_prefix=f"bsl-{backend}"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def admit(self) -> bool:
+        with self._lock:
+            if self._queued + self._running >= self.limit.workers + self.limit.max_queued:
+                self._rejected += 1
+                return False
+            self._queued += 1
+            return True
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> Future[T]:
+        def run() -> T:
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        def release() -> None:
+            with self._lock:
+                self._queued -= 1
+
+        def release_if_cancelled(future: Future) -> None:
+            # A call cancelled before it started never reaches run().
+            if future.cancelled():
+                release()
+
+        try:
+            future = self.executor.submit(run)
+        except RuntimeError:  # pool shut down
+            release()
+            raise
+        future.add_done_callback(release_if_cancelled)
+        return future
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(
+                backend=self.backend,
+                workers=self.limit.workers,
+                max_queued=self.limit.max_queued,
+                running=self._running,
+                queued=self._queued,
+                completed=self._completed,
+                rejected=self._rejected,
+            )
+
+
+class ExecutionPools:
+    """One bounded thread pool per backend name.
+
+    Args:
+        limits: Per-backend limits keyed by backend name.
+        default: Limit of backends not listed in ``limits``; defaults to
+            ``default_execution_limit()``.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[str, ExecutionLimit] | None = None,
+        default: ExecutionLimit | None = None,
+    ):
+        self._limits = dict(limits or {})
+        self._default = default or default_execution_limit()
+        self._lock = threading.Lock()
+        self._pools: dict[str, _Pool] = {}
+
+    @staticmethod
+    def backend_of(model: Any) -> str:
+        """Name of the backend(s) holding the tables ``model`` reads."""
+        try:
+            tables = model.table.op().find(
+                lambda node: type(node).__name__ in ("DatabaseTable", "Read")
+            )
+        except Exception:  # noqa: BLE001 - an unknown model shape uses the default pool
+            return DEFAULT_BACKEND
+        names = {
+            str(getattr(source, "name", type(source).__name__))
+            for node in tables
+            if (source := getattr(node, "source", None)) is not None
+        }
+        return "+".join(sorted(names)) or DEFAULT_BACKEND
+
+    async def run(self, backend: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn`` on ``backend``'s pool; ``503`` when the pool is full."""
+        pool = self._pool(backend)
+        if not pool.admit():
+            raise HTTPException(
+                status_code=503,
+                detail=f"Too many queries queued for backend '{backend}'; retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        return await asyncio.wrap_future(pool.submit(fn, *args, **kwargs))
+
+    async def run_for(self, model: Any, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn`` on the pool of the backend ``model`` reads from."""
+        return await self.run(self.backend_of(model), fn, *args, **kwargs)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Queue depth and counters of every pool created so far."""
+        with self._lock:
+            pools = list(self._pools.values())
+        return {pool.backend: asdict(pool.stats()) for pool in pools}
+
+    def shutdown(self) -> None:
+        """Stop all pools, dropping calls that have not started."""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _pool(self, backend: str) -> _Pool:
+        with self._lock:
+            pool = self._pools.get(backend)
+            if pool is None:
+                limit = self._limits.get(backend, self._default)
+                pool = self._pools[backend] = _Pool(backend, limit)
+            return pool
@@ -0,0 +1,354 @@
+"""Asynchronous query jobs: submit, poll, fetch the result later.
+
+A heavy query on ``/query`` holds its HTTP connection open until it
+finishes, or until a proxy in between times out. ``POST /jobs`` instead
+answers at once with a job id. The query runs in the background on the job
+manager's own worker threads, so long jobs never occupy the interactive
+execution pools. Like those pools, workers are capped per backend (see
+``ExecutionPools.backend_of``): a warehouse sees at most its job workers
+besides its interactive ones, and jobs queued for a busy backend do not
+hold up jobs for another. Its record batches (``SemanticTable.to_pyarrow_batches``)
+are written to a parquet file in a local result store as they arrive,
+keeping memory constant. Clients poll the job's status and progress, fetch
+the result as JSON, Arrow IPC or parquet, and may cancel it.
+
+Finished jobs and their result files expire ``result_ttl`` seconds after
+they finish. Jobs live in the server process: a restart forgets them.
+Cancelling a running job stops it before the next record batch; a backend
+call already in progress is not interrupted.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Literal
+
+from attrs import define, field
+from fastapi import HTTPException
+
+from .executor import DEFAULT_BACKEND
+
+logger = logging.getLogger(__name__)
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+_DONE: tuple[JobStatus, ...] = ("succeeded", "failed", "cancelled")
+
+#: Rows per record batch pulled from the backend and written to the store.
+CHUNK_ROWS = 50_000
+
+#: Rows of a JSON result page when the client sets no ``limit``, and the most it may ask for.
+JSON_PAGE_ROWS = 1_000
+MAX_JSON_PAGE_ROWS = 10_000
+
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+
+@define
+class Job:
+    """State of one query job.
+
+    Attributes:
+        id: Opaque job id.
+        model_name: Model the query runs on.
+        backend: Backend whose job workers run it.
+        status: ``queued``, ``running``, ``succeeded``, ``failed`` or
+            ``cancelled``.
+        stage: What a running job is doing: ``compiling``, ``executing`` or
+            ``writing`` (the result store).
+        rows: Result rows written so far.
+        error: Why the job failed.
+        path: Parquet file of the result, once the job succeeded.
+    """
+
+    id: str
+    model_name: str
+    backend: str = DEFAULT_BACKEND
+    status: JobStatus = "queued"
+    stage: str | None = None
+    rows: int = 0
+    error: str | None = None
+    path: Path | None = None
+    created_at: float = field(factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    _cancelled: threading.Event = field(factory=threading.Event, repr=False)
+    _future: Future | None = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in _DONE
+
+    def as_dict(self, result_ttl: float) -> dict[str, Any]:
+        """JSON form of the job, as served by ``GET /jobs/{id}``."""
+        return {
+            "id": self.id,
+            "model_name": self.model_name,
+            "backend": self.backend,
+            "status": self.status,
+            "progress": {"stage": self.stage, "rows": self.rows},
+            "cancel_requested": self._cancelled.is_set() and not self.done,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "expires_at": (self.finished_at + result_ttl if self.finished_at is not None else None),
+        }
+
+
+def _skipped(batches: Iterator[Any], offset: int) -> Iterator[Any]:
+    for batch in batches:
+        if offset >= batch.num_rows:
+            offset -= batch.num_rows
+            continue
+        yield batch.slice(offset) if offset else batch
+        offset = 0
+
+
+def read_batches(path: Path, offset: int = 0) -> Any:
+    """The result at ``path``, from row ``offset``, as a ``pyarrow.RecordBatchReader``."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    return pa.RecordBatchReader.from_batches(
+        parquet.schema_arrow, _skipped(parquet.iter_batches(batch_size=CHUNK_ROWS), offset)
+    )
+
+
+def read_records(path: Path, offset: int = 0, limit: int = JSON_PAGE_ROWS) -> dict[str, Any]:
+    """Rows ``offset`` to ``offset + limit`` of the result at ``path`` as JSON records.
+
+    Only the row groups holding those rows are read.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    metadata = parquet.metadata
+    groups, skip, start = [], offset, 0
+    for group in range(metadata.num_row_groups):
+        rows = metadata.row_group(group).num_rows
+        if start + rows > offset and start < offset + limit:
+            groups.append(group)
+        elif start + rows <= offset:
+            skip -= rows
+        start += rows
+    batches, wanted = [], limit
+    if groups:
+        for batch in _skipped(parquet.iter_batches(CHUNK_ROWS, row_groups=groups), skip):
+            batches.append(batch.slice(0, wanted))
+            wanted -= batches[-1].num_rows
+            if not wanted:
+                break
+    rows = pa.Table.from_batches(batches, parquet.schema_arrow).to_pandas()
+    return {
+        "columns": parquet.schema_arrow.names,
+        "records": json.loads(rows.to_json(orient="records", date_format="iso")),
+        "returned_rows": len(rows),
+        "total_rows": metadata.num_rows,
+    }
+
+
+def _env_number(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+class JobManager:
+    """Runs query jobs in the background and keeps their results on disk.
+
+    Args:
+        result_dir: Directory of the result store; ``BSL_JOBS_DIR`` or a
+            temporary directory (removed on ``shutdown``) when omitted.
+        workers: Jobs executed concurrently per backend (``BSL_JOB_WORKERS``,
+            default 2).
+        backend_workers: Per-backend overrides of ``workers``, keyed by
+            backend name.
+        result_ttl: Seconds a finished job and its result are kept
+            (``BSL_JOB_RESULT_TTL``, default one hour).
+        max_jobs: Jobs kept at once, finished or not; further submissions
+            are rejected with ``503``.
+    """
+
+    def __init__(
+        self,
+        result_dir: str | Path | None = None,
+        *,
+        workers: int | None = None,
+        backend_workers: Mapping[str, int] | None = None,
+        result_ttl: float | None = None,
+        max_jobs: int = 1_000,
+    ):
+        result_dir = result_dir or os.environ.get("BSL_JOBS_DIR")
+        self._owns_dir = result_dir is None
+        self.result_dir = Path(result_dir or tempfile.mkdtemp(prefix="bsl-jobs-"))
+        self.result_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = int(workers or _env_number("BSL_JOB_WORKERS", 2))
+        self.backend_workers = dict(backend_workers or {})
+        for backend, count in {"*": self.workers, **self.backend_workers}.items():
+            if count < 1:
+                raise ValueError(f"job workers of {backend!r} must be at least 1, got {count}")
+        self.result_ttl = (
+            result_ttl if result_ttl is not None else _env_number("BSL_JOB_RESULT_TTL", 3600)
+        )
+        self.max_jobs = max_jobs
+        self._executors: dict[str, ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+        self._jobs: dict[str, Job] = {}
+
+    def submit(
+        self, model_name: str, build: Callable[[], Any], backend: str = DEFAULT_BACKEND
+    ) -> Job:
+        """Queue a job running the semantic expression returned by ``build()``.
+
+        The job waits for one of ``backend``'s job workers.
+        """
+        self.expire()
+        job = Job(id=uuid.uuid4().hex, model_name=model_name, backend=backend)
+        with self._lock:
+            if len(self._jobs) >= self.max_jobs:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Too many jobs; retry once older results have expired",
+                    headers={"Retry-After": "60"},
+                )
+            self._jobs[job.id] = job
+            executor = self._executors.get(backend)
+            if executor is None:
+                executor = self._executors[backend] = ThreadPoolExecutor(
+                    max_workers=self.backend_workers.get(backend, self.workers),
+                    thread_name_prefix=f"bsl-job-{backend}",
+                )
+        job._future = executor.submit(self._run, job, build)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """The job ``job_id``; ``404`` if it is unknown or expired."""
+        self.expire()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        """Cancel a queued or running job; a finished job is deleted with its result."""
+        job = self.get(job_id)
+        with self._lock:
+            finished = job.done
+            if finished:
+                self._jobs.pop(job.id, None)
+            else:
+                job._cancelled.set()
+                if job.status == "queued" and job._future is not None and job._future.cancel():
+                    self._finish(job, "cancelled")
+        if finished:
+            self._remove_result(job)
+        return job
+
+    def result_path(self, job_id: str) -> Path:
+        """Parquet file of a succeeded job; ``409`` while it has no result."""
+        job = self.get(job_id)
+        if job.status != "succeeded" or job.path is None:
+            raise HTTPException(
+                status_code=409, detail=f"Job '{job_id}' is {job.status}; no result to fetch"
+            )
+        return job.path
+
+    def expire(self) -> None:
+        """Drop finished jobs older than ``result_ttl`` and their results."""
+        now = time.time()
+        with self._lock:
+            expired = [
+                job
+                for job in self._jobs.values()
+                if job.finished_at is not None and now - job.finished_at > self.result_ttl
+            ]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            self._remove_result(job)
+
+    def stats(self) -> dict[str, int]:
+        """Jobs kept, by status."""
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in (*_DONE, "queued", "running")}
+
+    def shutdown(self) -> None:
+        """Cancel every job; a temporary result store is deleted."""
+        with self._lock:
+            for job in self._jobs.values():
+                job._cancelled.set()
+            executors, self._executors = list(self._executors.values()), {}
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if self._owns_dir:
+            shutil.rmtree(self.result_dir, ignore_errors=True)
+
+    def _finish(self, job: Job, status: JobStatus) -> None:
+        job.status = status
+        job.stage = None
+        job.finished_at = time.time()
+
+    def _remove_result(self, job: Job) -> None:
+        if job.path is not None:
+            job.path.unlink(missing_ok=True)
+
+    def _run(self, job: Job, build: Callable[[], Any]) -> None:
+        with self._lock:
+            if job._cancelled.is_set():
+                self._finish(job, "cancelled")
+                return
+            job.status, job.stage, job.started_at = "running", "compiling", time.time()
+        path = self.result_dir / f"{job.id}.parquet"
+        partial = path.with_name(f"{path.name}.partial")
+        try:
+            import pyarrow.parquet as pq
+
+            query_result = build()
+            job.stage = "executing"
+            reader = query_result.to_pyarrow_batches(chunk_size=CHUNK_ROWS)
+            try:
+                with pq.ParquetWriter(partial, reader.schema) as writer:
+                    job.stage = "writing"
+                    for batch in reader:
+                        if job._cancelled.is_set():
+                            break
+                        writer.write_batch(batch)
+                        job.rows += batch.num_rows
+            finally:
+                close = getattr(reader, "close", None)
+                if callable(close):
+                    close()
+            if not job._cancelled.is_set():
+                partial.replace(path)
+        except Exception as exc:  # noqa: BLE001 - reported as the job's error
+            logger.debug("Job %s failed", job.id, exc_info=True)
+            partial.unlink(missing_ok=True)
+            with self._lock:
+                job.error = str(exc) or type(exc).__name__
+                self._finish(job, "failed")
+            return
+        with self._lock:
+            if job._cancelled.is_set():
+                # The cancel may have landed after the result was moved in place.
+                partial.unlink(missing_ok=True)
+                path.unlink(missing_ok=True)
+                self._finish(job, "cancelled")
+            elif job.id not in self._jobs:
+                # Expired or shut down meanwhile.
+                path.unlink(missing_ok=True)
+            else:
+                job.path = path
+                self._finish(job, "succeeded")
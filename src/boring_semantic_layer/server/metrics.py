@@ -0,0 +1,336 @@
+"""Prometheus metrics of the HTTP API, served at ``/metrics``.
+
+Request latency alone cannot tell Python compile time from warehouse time,
+so every call that runs on an execution pool is traced (see
+``boring_semantic_layer.tracing``) and each phase it went through —
+``normalize``, ``compile``, ``sql`` (profiled queries only), ``execute``,
+``convert``, ``chart`` — is observed into ``bsl_query_phase_seconds`` by endpoint and model.
+Scraping also reports the execution pools' queues, the result and compile
+cache counters, single-flight coalescing and background jobs by status.
+
+The text exposition format is rendered here directly, so serving metrics
+needs no client library.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections.abc import Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+from boring_semantic_layer.ops import compile_cache_info
+from boring_semantic_layer.result_cache import result_cache_info
+from boring_semantic_layer.tracing import QueryTrace
+
+#: Upper bounds (seconds) of the latency histogram buckets.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_Sample = tuple[str, Mapping[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _render_family(name: str, kind: str, help_text: str, samples: Sequence[_Sample]) -> str:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for sample_name, labels, value in samples:
+        label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        lines.append(
+            f"{sample_name}{{{label_text}}} {_format_value(value)}"
+            if label_text
+            else f"{sample_name} {_format_value(value)}"
+        )
+    return "\n".join(lines)
+
+
+class _Family:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Mapping[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> list[_Sample]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        return _render_family(self.name, self.kind, self.help, self.samples())
+
+
+class Counter(_Family):
+    """A monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[_Sample]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key, strict=True)), v) for key, v in values]
+
+
+class Gauge(Counter):
+    """A value per label set that goes up and down."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Family):
+    """Observations counted into cumulative ``le`` buckets per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: count per bucket (last one is +Inf), then the sum.
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = next(
+            (i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets)
+        )
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels), ([0], [0.0]))
+            return sum(counts)
+
+    def samples(self) -> list[_Sample]:
+        with self._lock:
+            values = sorted((key, (list(c), s[0])) for key, (c, s) in self._values.items())
+        samples: list[_Sample] = []
+        for key, (counts, total) in values:
+            labels = dict(zip(self.labelnames, key, strict=True))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                le = _format_value(bound)
+                samples.append((f"{self.name}_bucket", {**labels, "le": le}, cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+def model_label(model: Any) -> str:
+    """The ``model`` label of a semantic model: its name, if it has one."""
+    return str(getattr(model, "name", None) or "unnamed")
+
+
+class Metrics:
+    """Request and query metrics of one app.
+
+    Args:
+        buckets: Upper bounds (seconds) of the latency histograms.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.requests = Counter(
+            "bsl_http_requests_total",
+            "HTTP requests by route template, method and status code.",
+            ("endpoint", "method", "status"),
+        )
+        self.request_seconds = Histogram(
+            "bsl_http_request_duration_seconds",
+            "HTTP request latency by route template and method.",
+            ("endpoint", "method"),
+            buckets,
+        )
+        self.queries = Counter(
+            "bsl_queries_total",
+            "Backend-bound calls by endpoint, model and outcome (ok/error).",
+            ("endpoint", "model", "outcome"),
+        )
+        self.queries_in_flight = Gauge(
+            "bsl_queries_in_flight",
+            "Backend-bound calls queued or running, by endpoint and model.",
+            ("endpoint", "model"),
+        )
+        self.query_seconds = Histogram(
+            "bsl_query_duration_seconds",
+            "Latency of backend-bound calls, including time queued for a worker.",
+            ("endpoint", "model"),
+            buckets,
+        )
+        self.phase_seconds = Histogram(
+            "bsl_query_phase_seconds",
+            "Time spent per query phase (normalize, compile, sql, execute, convert, chart).",
+            ("endpoint", "model", "phase"),
+            buckets,
+        )
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float) -> None:
+        self.requests.inc(endpoint=endpoint, method=method, status=str(status))
+        self.request_seconds.observe(seconds, endpoint=endpoint, method=method)
+
+    @contextmanager
+    def observe_query(self, endpoint: str, model: str, query_trace: QueryTrace) -> Iterator[None]:
+        """Count and time the enclosed call; its phases are read from ``query_trace``."""
+        labels = {"endpoint": endpoint, "model": model}
+        self.queries_in_flight.inc(**labels)
+        outcome = "error"
+        start = time.perf_counter()
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            self.queries_in_flight.dec(**labels)
+            self.queries.inc(outcome=outcome, **labels)
+            self.query_seconds.observe(time.perf_counter() - start, **labels)
+            for name, seconds in query_trace.phases.items():
+                self.phase_seconds.observe(seconds, phase=name, **labels)
+
+    def render(self, *, execution: Any = None, single_flight: Any = None, jobs: Any = None) -> str:
+        """The metrics in Prometheus text format, plus the process's caches and
+        the given ``ExecutionPools``, ``SingleFlight`` and ``JobManager``."""
+        families = [
+            family.render()
+            for family in (
+                self.requests,
+                self.request_seconds,
+                self.queries,
+                self.queries_in_flight,
+                self.query_seconds,
+                self.phase_seconds,
+            )
+        ]
+        families.extend(_cache_families())
+        if execution is not None:
+            families.extend(_execution_families(execution.stats()))
+        if single_flight is not None:
+            stats = single_flight.stats()
+            families.extend(
+                [
+                    _render_family(
+                        "bsl_single_flight_in_flight",
+                        "gauge",
+                        "Distinct queries being computed.",
+                        [("bsl_single_flight_in_flight", {}, stats.in_flight)],
+                    ),
+                    _render_family(
+                        "bsl_single_flight_calls_total",
+                        "counter",
+                        "Query calls that executed or were coalesced into another's execution.",
+                        [
+                            (
+                                "bsl_single_flight_calls_total",
+                                {"result": "executed"},
+                                stats.executed,
+                            ),
+                            (
+                                "bsl_single_flight_calls_total",
+                                {"result": "coalesced"},
+                                stats.coalesced,
+                            ),
+                        ],
+                    ),
+                ]
+            )
+        if jobs is not None:
+            families.append(
+                _render_family(
+                    "bsl_jobs",
+                    "gauge",
+                    "Background query jobs kept, by status.",
+                    [("bsl_jobs", {"status": status}, n) for status, n in jobs.stats().items()],
+                )
+            )
+        return "\n".join(families) + "\n"
+
+
+def _cache_families() -> list[str]:
+    families = []
+    for cache, info, size in (
+        ("result", result_cache_info(), "entries"),
+        ("compile", compile_cache_info(), "currsize"),
+    ):
+        name = f"bsl_{cache}_cache"
+        families.append(
+            _render_family(
+                f"{name}_requests_total",
+                "counter",
+                f"Lookups in the {cache} cache by result (hit/miss).",
+                [
+                    (f"{name}_requests_total", {"result": "hit"}, info.hits),
+                    (f"{name}_requests_total", {"result": "miss"}, info.misses),
+                ],
+            )
+        )
+        families.append(
+            _render_family(
+                f"{name}_entries",
+                "gauge",
+                f"Entries held by the {cache} cache.",
+                [(f"{name}_entries", {}, getattr(info, size))],
+            )
+        )
+        lookups = info.hits + info.misses
+        families.append(
+            _render_family(
+                f"{name}_hit_ratio",
+                "gauge",
+                f"Fraction of {cache} cache lookups that hit.",
+                [(f"{name}_hit_ratio", {}, info.hits / lookups if lookups else 0.0)],
+            )
+        )
+    return families
+
+
+def _execution_families(stats: Mapping[str, Mapping[str, Any]]) -> list[str]:
+    fields = (
+        ("running", "gauge", "Calls running on the backend's execution pool."),
+        ("queued", "gauge", "Calls waiting for a worker of the backend's execution pool."),
+        ("completed", "counter", "Calls completed by the backend's execution pool."),
+        ("rejected", "counter", "Calls rejected because the backend's pool was full."),
+    )
+    families = []
+    for field, kind, help_text in fields:
+        name = f"bsl_execution_{field}" + ("_total" if kind == "counter" else "")
+        samples = [(name, {"backend": backend}, pool[field]) for backend, pool in stats.items()]
+        families.append(_render_family(name, kind, help_text, samples))
+    return families
@@ -0,0 +1,183 @@
+"""Hot reload of the server's MODELS config.
+
+``load_models`` executes the config once at startup, so editing a model
+used to mean restarting the process: reconnecting, reloading parquet and
+re-warming every cache. ``ModelReloader`` polls the config file (and the
+``.py``/``.yml``/``.yaml`` files next to it, which configs commonly import)
+and, when one changes, re-executes the config off the event loop (with
+the modules it imported from its own directory imported afresh), diffs
+the new models against the served ones by fingerprint and swaps
+``app.state.models`` in one assignment.
+
+Models whose fingerprint did not change keep their existing object, and
+with it their connection, value index, time range and result cache
+entries. Requests in flight finish on the mapping they started with. A
+config that fails to load is logged and the served models stay as they
+are.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from attrs import frozen
+
+from boring_semantic_layer.errors import SerializationError
+
+from .loader import load_models, resolve_config_path
+
+logger = logging.getLogger(__name__)
+
+_WATCHED_SUFFIXES = (".py", ".yml", ".yaml")
+
+
+@frozen
+class ModelDiff:
+    """Outcome of a reload.
+
+    Attributes:
+        models: The mapping to serve from now on.
+        added: Names of models that are new.
+        changed: Names of models whose definition changed.
+        removed: Names of models no longer defined.
+        unchanged: Names of models kept as the previously served object.
+    """
+
+    models: Mapping[str, Any]
+    added: tuple[str, ...] = ()
+    changed: tuple[str, ...] = ()
+    removed: tuple[str, ...] = ()
+    unchanged: tuple[str, ...] = ()
+
+    @property
+    def stale(self) -> tuple[str, ...]:
+        """Models whose cached state must be dropped."""
+        return self.changed + self.removed
+
+
+def _fingerprint(model: Any) -> str | None:
+    try:
+        return model.fingerprint()
+    except (SerializationError, AttributeError):
+        return None
+
+
+def diff_models(current: Mapping[str, Any], fresh: Mapping[str, Any]) -> ModelDiff:
+    """Merge freshly loaded models into ``current``, keeping unchanged ones."""
+    models: dict[str, Any] = {}
+    added, changed, unchanged = [], [], []
+    for name, model in fresh.items():
+        old = current.get(name)
+        if old is None:
+            added.append(name)
+            models[name] = model
+            continue
+        fingerprint = _fingerprint(model)
+        if old is model or (fingerprint is not None and fingerprint == _fingerprint(old)):
+            unchanged.append(name)
+            models[name] = old
+        else:
+            changed.append(name)
+            models[name] = model
+    removed = [name for name in current if name not in fresh]
+    return ModelDiff(models, tuple(added), tuple(changed), tuple(removed), tuple(unchanged))
+
+
+def _forget_modules_in(directory: Path) -> None:
+    """Drop imported modules defined by files in ``directory`` from ``sys.modules``.
+
+    Otherwise re-executing the config would reuse the sibling modules it
+    imported the first time, edits to them included.
+    """
+    for name, module in list(sys.modules.items()):
+        file = getattr(module, "__file__", None)
+        if not file or name == "__main__":
+            continue
+        path = Path(file).resolve()
+        if path.parent == directory or (
+            path.name == "__init__.py" and path.parent.parent == directory
+        ):
+            del sys.modules[name]
+
+
+class ModelReloader:
+    """Watch a config file and reload its MODELS when it changes.
+
+    Args:
+        config_path: The config file; resolved like ``load_models`` does.
+        interval: Seconds between checks for modified files.
+    """
+
+    def __init__(self, config_path: str | Path | None = None, interval: float = 1.0):
+        self.config_path = resolve_config_path(config_path)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        paths = {self.config_path}
+        paths.update(
+            path
+            for path in self.config_path.parent.iterdir()
+            if path.suffix in _WATCHED_SUFFIXES and path.is_file()
+        )
+        snapshot = {}
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self) -> bool:
+        """Whether a watched file changed since the previous poll."""
+        snapshot = self._scan()
+        changed = snapshot != self._snapshot
+        self._snapshot = snapshot
+        return changed
+
+    def reload(self, current: Mapping[str, Any]) -> ModelDiff:
+        """Re-execute the config and diff its models against ``current``."""
+        _forget_modules_in(self.config_path.parent)
+        return diff_models(current, load_models(self.config_path))
+
+    async def watch(self, state: Any) -> None:
+        """Poll forever, swapping ``state.models`` whenever the config changes.
+
+        ``state`` is the app state: besides ``models`` its ``value_indexes``
+        and ``time_ranges`` caches drop entries of changed models.
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self.poll():
+                continue
+            try:
+                diff = await asyncio.to_thread(self.reload, state.models)
+            except Exception:
+                logger.exception(
+                    "Reloading %s failed; still serving the previous models", self.config_path
+                )
+                continue
+            apply_diff(state, diff)
+
+
+def apply_diff(state: Any, diff: ModelDiff) -> None:
+    """Serve ``diff.models`` and forget cached state of stale models."""
+    state.models = diff.models
+    for name in diff.stale:
+        for cache in ("value_indexes", "time_ranges"):
+            store = getattr(state, cache, None)
+            if store is not None:
+                store.invalidate(name)
+    logger.info(
+        "Reloaded models: %d added, %d changed, %d removed, %d unchanged",
+        len(diff.added),
+        len(diff.changed),
+        len(diff.removed),
+        len(diff.unchanged),
+    )
@@ -0,0 +1,169 @@
+"""Streaming query responses: Arrow IPC stream and NDJSON.
+
+The default ``/query`` response materializes the result as pandas, turns
+it into records and sends one JSON document. For exports that is the whole
+result in server memory, serialized twice, with nothing sent until the
+query has finished. A streaming response instead pulls record batches from
+``SemanticTable.to_pyarrow_batches`` on the model's execution pool and
+hands each encoded batch to the client as soon as it is ready. A small
+bounded queue between the pool thread and the response keeps memory
+constant: a slow client pauses the producer instead of buffering rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import threading
+from collections.abc import AsyncIterator, Callable, Iterator
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Literal
+
+from fastapi.responses import StreamingResponse
+
+from .executor import ExecutionPools
+
+ResponseFormat = Literal["json", "arrow", "ndjson"]
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "ndjson": "application/x-ndjson",
+}
+
+#: Rows per record batch pulled from the backend.
+CHUNK_ROWS = 10_000
+#: Encoded batches buffered between the pool thread and the client.
+_QUEUE_SIZE = 4
+
+_DONE = object()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime | date | time):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def _limited(batches: Iterator[Any], limit: int | None) -> Iterator[Any]:
+    if limit is None:
+        yield from batches
+        return
+    remaining = limit
+    for batch in batches:
+        if remaining <= 0:
+            return
+        if batch.num_rows > remaining:
+            batch = batch.slice(0, remaining)
+        remaining -= batch.num_rows
+        yield batch
+
+
+def encode_ndjson(reader: Any, limit: int | None = None) -> Iterator[bytes]:
+    """One JSON object per row, one chunk per record batch."""
+    for batch in _limited(iter(reader), limit):
+        rows = batch.to_pylist()
+        if rows:
+            yield "".join(json.dumps(row, default=_json_default) + "\n" for row in rows).encode()
+
+
+def encode_arrow(reader: Any, limit: int | None = None) -> Iterator[bytes]:
+    """An Arrow IPC stream: the schema, then one message per record batch."""
+    import pyarrow as pa
+
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        chunk = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return chunk
+
+    with pa.ipc.new_stream(sink, reader.schema) as writer:
+        yield drain()
+        for batch in _limited(iter(reader), limit):
+            writer.write_batch(batch)
+            yield drain()
+    yield drain()
+
+
+_ENCODERS: dict[str, Callable[[Any, int | None], Iterator[bytes]]] = {
+    "arrow": encode_arrow,
+    "ndjson": encode_ndjson,
+}
+
+
+async def stream_query(
+    pools: ExecutionPools,
+    model: Any,
+    build: Callable[[], Any],
+    response_format: Literal["arrow", "ndjson"],
+    limit: int | None = None,
+) -> StreamingResponse:
+    """Stream the result of ``build()`` (a semantic expression) as ``response_format``.
+
+    Errors raised while building or starting the query propagate before any
+    byte is sent, so they still map to regular HTTP error responses.
+    """
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+    stopped = threading.Event()
+    encode = _ENCODERS[response_format]
+
+    def put(item: Any) -> None:
+        asyncio.run_coroutine_threadsafe(chunks.put(item), loop).result()
+
+    def produce() -> None:
+        try:
+            reader = build().to_pyarrow_batches(chunk_size=CHUNK_ROWS)
+        except BaseException as exc:  # noqa: BLE001 - re-raised on the event loop
+            put(exc)
+            return
+        try:
+            for chunk in encode(reader, limit):
+                put(chunk)
+                if stopped.is_set():
+                    return
+        except BaseException as exc:  # noqa: BLE001 - ends the stream early
+            if not stopped.is_set():
+                put(exc)
+            return
+        finally:
+            close = getattr(reader, "close", None)
+            if callable(close):
+                close()
+        put(_DONE)
+
+    producer = asyncio.ensure_future(pools.run_for(model, produce))
+    first = asyncio.ensure_future(chunks.get())
+    done, _ = await asyncio.wait({producer, first}, return_when=asyncio.FIRST_COMPLETED)
+    if first not in done and (error := producer.exception()) is not None:
+        # The pool rejected the call before anything was produced.
+        first.cancel()
+        raise error
+    head = await first
+    if isinstance(head, BaseException):
+        await producer
+        raise head
+
+    async def body() -> AsyncIterator[bytes]:
+        item = head
+        try:
+            while item is not _DONE:
+                if isinstance(item, BaseException):
+                    # Headers are sent; the truncated body signals the failure.
+                    raise item
+                yield item
+                item = await chunks.get()
+        finally:
+            stopped.set()
+            while not chunks.empty():
+                chunks.get_nowait()
+            await producer
+
+    return StreamingResponse(body(), media_type=MEDIA_TYPES[response_format])
@@ -0,0 +1,121 @@
+"""Single-flight coalescing of identical concurrent calls.
+
+When a dashboard opens for many people at once, the same semantic query
+arrives many times within the same second. ``SingleFlight`` lets the first
+caller for a key (the leader) run the computation while later callers with
+the same key wait for the leader's result instead of executing it again.
+Once the call finishes the key is forgotten, so only *concurrent* calls are
+shared; reuse across time is the result cache's job.
+
+The result object is handed to every waiter as is, so callers must not
+mutate it. Exceptions are shared the same way.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+from attrs import frozen
+
+T = TypeVar("T")
+
+
+def request_key(*parts: Any) -> str:
+    """Normalized JSON key of a request: dict keys sorted, compact separators.
+
+    Non-JSON values (dates, decimals, ...) are keyed by ``str``.
+    """
+    return json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+
+
+@frozen
+class SingleFlightStats:
+    """Counters of a ``SingleFlight``.
+
+    Attributes:
+        in_flight: Keys currently being computed.
+        executed: Calls that ran the computation.
+        coalesced: Calls answered by another call's computation.
+    """
+
+    in_flight: int
+    executed: int
+    coalesced: int
+
+
+class SingleFlight:
+    """Share one execution between identical concurrent calls.
+
+    ``do`` coalesces calls made from threads; ``do_async`` coalesces
+    coroutines on one event loop. The two never share keys.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+        self._tasks: dict[Hashable, asyncio.Future] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Return ``fn(*args, **kwargs)``, or the result of an identical call in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+                self._executed += 1
+            else:
+                self._coalesced += 1
+        if not leader:
+            return call.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            call.set_exception(exc)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def do_async(
+        self, key: Hashable, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        """Await ``fn(*args, **kwargs)``, or the result of an identical call in flight.
+
+        The computation runs as its own task: a waiter that is cancelled
+        (e.g. a client that disconnects) stops waiting without cancelling
+        the computation the other waiters share.
+        """
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is not None:
+                self._coalesced += 1
+            else:
+                task = self._tasks[key] = asyncio.ensure_future(fn(*args, **kwargs))
+                self._executed += 1
+                task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return SingleFlightStats(
+                in_flight=len(self._calls) + len(self._tasks),
+                executed=self._executed,
+                coalesced=self._coalesced,
+            )
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every waiter went away
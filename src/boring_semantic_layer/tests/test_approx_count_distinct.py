@@ -0,0 +1,90 @@
+"""Tests for sketch-based ``approx_nunique`` measures over joins."""
+
+import ibis
+import numpy as np
+import pandas as pd
+import pytest
+
+from boring_semantic_layer import to_semantic_table
+from boring_semantic_layer.ops._sketch import hll_estimate, hll_registers
+
+TOLERANCE = 0.05
+
+
+@pytest.fixture
+def joined():
+    rng = np.random.default_rng(7)
+    n = 20_000
+    con = ibis.duckdb.connect(":memory:")
+    customers = con.create_table(
+        "customers",
+        pd.DataFrame({"cid": range(101), "region": ["E", "W", "N", "S"] * 25 + ["X"]}),
+    )
+    products = rng.integers(0, 8_000, n).astype("float64")
+    products[::50] = np.nan
+    orders = con.create_table(
+        "orders",
+        pd.DataFrame(
+            {
+                "cid": rng.integers(0, 100, n),
+                "product": products,
+                "status": rng.choice(["open", "shipped"], n),
+            }
+        ),
+    )
+    c = (
+        to_semantic_table(customers, "c")
+        .with_dimensions(region=lambda t: t.region)
+        .with_measures(customers=lambda t: t.count())
+    )
+    o = (
+        to_semantic_table(orders, "o")
+        .with_dimensions(status=lambda t: t.status)
+        .with_measures(
+            products=lambda t: t["product"].nunique(),
+            approx_products=lambda t: t["product"].approx_nunique(),
+            shipped_products=lambda t: t["product"].nunique(where=t.status == "shipped"),
+            approx_shipped=lambda t: t["product"].approx_nunique(where=t.status == "shipped"),
+        )
+    )
+    return c.join_many(o, lambda c, o: c.cid == o.cid)
+
+
+def _assert_close(actual, expected):
+    for a, e in zip(actual, expected, strict=True):
+        assert abs(a - e) <= TOLERANCE * max(e, 1), (a, e)
+
+
+@pytest.mark.parametrize(
+    "dimensions", [["c.region"], ["c.region", "o.status"], []], ids=["one", "local", "total"]
+)
+def test_estimates_track_exact_counts(joined, dimensions):
+    measures = [
+        "c.customers",
+        "o.products",
+        "o.approx_products",
+        "o.shipped_products",
+        "o.approx_shipped",
+    ]
+    df = joined.query(dimensions=dimensions, measures=measures).execute()
+
+    _assert_close(df["o.approx_products"], df["o.products"])
+    _assert_close(df["o.approx_shipped"], df["o.shipped_products"])
+
+
+def test_unmatched_group_is_zero(joined):
+    df = joined.query(dimensions=["c.region"], measures=["o.approx_products"]).execute()
+    assert df.set_index("c.region").loc["X", "o.approx_products"] == 0
+
+
+def test_sketches_are_merged_instead_of_raw_rows(joined):
+    sql = joined.query(dimensions=["c.region"], measures=["o.approx_products"]).sql()
+    assert "__bsl_hll_bucket" in sql
+    assert "COUNT(DISTINCT" not in sql.upper()
+
+
+@pytest.mark.parametrize("cardinality", [0, 1, 40, 100_000])
+def test_estimate_of_a_single_column(cardinality):
+    tbl = ibis.memtable({"x": [f"v{i}" for i in range(cardinality)] or [None]})
+    estimate = hll_estimate(hll_registers(tbl, tbl.x, ()), (), "n").execute()["n"].iloc[0]
+    assert abs(estimate - cardinality) <= TOLERANCE * max(cardinality, 1)
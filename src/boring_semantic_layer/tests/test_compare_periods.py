@@ -0,0 +1,144 @@
+"""Tests for the single-scan and two-query ``compare_periods`` plans."""
+
+import ibis
+import pandas as pd
+import pytest
+
+from boring_semantic_layer import to_semantic_table
+
+CURRENT = {"start": "2024-02-01", "end": "2024-02-29"}
+PREVIOUS = {"start": "2024-01-01", "end": "2024-01-31"}
+
+
+@pytest.fixture
+def con():
+    return ibis.duckdb.connect(":memory:")
+
+
+@pytest.fixture
+def orders(con):
+    tbl = con.create_table(
+        "orders",
+        pd.DataFrame(
+            {
+                "order_date": pd.to_datetime(
+                    [
+                        "2024-01-05",
+                        "2024-01-06",
+                        "2024-01-07",
+                        "2024-01-08",
+                        "2024-01-09",
+                        "2024-02-05",
+                        "2024-02-06",
+                        "2024-02-07",
+                        "2024-02-08",
+                        "2024-03-01",
+                    ]
+                ),
+                "category": ["A", "A", "B", "D", None, "A", "B", "C", None, "A"],
+                "customer": [1, 2, 1, 3, 4, 1, 1, 2, 5, 9],
+                "amount": [10, 20, 30, 70, 5, 40, 50, 60, 15, 999],
+            }
+        ),
+    )
+    return (
+        to_semantic_table(tbl, "orders")
+        .with_dimensions(
+            order_date={"expr": lambda t: t.order_date, "is_time_dimension": True},
+            category=lambda t: t.category,
+        )
+        .with_measures(
+            order_count=lambda t: t.count(),
+            revenue=lambda t: t.amount.sum(),
+            avg_amount=lambda t: t.amount.mean(),
+            customers=lambda t: t.customer.nunique(),
+            median_amount=lambda t: t.amount.median(),
+            share=lambda t: t.revenue / t.all(t.revenue),
+        )
+    )
+
+
+def _compare(model, strategy, **kwargs):
+    kwargs.setdefault("current_time_range", CURRENT)
+    kwargs.setdefault("previous_time_range", PREVIOUS)
+    return model.compare_periods(strategy=strategy, **kwargs)
+
+
+def _frame(result, by):
+    df = result.execute()
+    return df.sort_values(by, na_position="first").reset_index(drop=True) if by else df
+
+
+_MEASURES = ["order_count", "revenue", "avg_amount", "customers", "median_amount"]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"dimensions": ["category"], "measures": _MEASURES},
+        {"measures": _MEASURES},
+        {
+            "dimensions": ["order_date"],
+            "measures": ["revenue", "order_count"],
+            "time_grain": "TIME_GRAIN_MONTH",
+        },
+        {
+            "dimensions": ["category"],
+            "measures": ["revenue"],
+            "filters": [{"field": "category", "operator": "in", "values": ["A", "B"]}],
+        },
+        {
+            "measures": ["order_count", "customers", "revenue"],
+            "previous_time_range": {"start": "2023-01-01", "end": "2023-01-31"},
+        },
+    ],
+    ids=["by-dimension", "no-dimensions", "time-grain", "filtered", "empty-period"],
+)
+def test_single_scan_matches_two_query(orders, kwargs):
+    by = kwargs.get("dimensions", [])
+    single = _frame(_compare(orders, "single_scan", **kwargs), by)
+    pd.testing.assert_frame_equal(
+        single, _frame(_compare(orders, "two_query", **kwargs), by), check_dtype=False
+    )
+
+
+def test_null_dimension_member_is_one_row(orders):
+    df = _compare(orders, "single_scan", dimensions=["category"], measures=["revenue"]).execute()
+    null_rows = df[df["category"].isna()]
+    assert len(null_rows) == 1
+    assert null_rows.iloc[0][["revenue_current", "revenue_previous"]].tolist() == [15, 5]
+
+
+def test_single_scan_reads_the_table_once(orders):
+    single = _compare(orders, "single_scan", dimensions=["category"], measures=["revenue"]).sql()
+    two = _compare(orders, "two_query", dimensions=["category"], measures=["revenue"]).sql()
+    assert single.count('"orders"') == 1
+    assert two.count('"orders"') == 2
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"measures": ["share"]},
+        {
+            "measures": ["revenue"],
+            "previous_time_range": {"start": "2024-01-01", "end": "2024-02-01"},
+        },
+    ],
+    ids=["calc-measure", "overlapping-ranges"],
+)
+def test_auto_falls_back_to_two_query(orders, kwargs):
+    auto = _compare(orders, "auto", dimensions=["category"], **kwargs)
+    assert auto.sql().count('"orders"') == 2
+    with pytest.raises(ValueError, match="single scan"):
+        _compare(orders, "single_scan", dimensions=["category"], **kwargs)
+
+
+def test_auto_uses_single_scan(orders):
+    auto = _compare(orders, "auto", dimensions=["category"], measures=["revenue"])
+    assert auto.sql().count('"orders"') == 1
+
+
+def test_unknown_strategy(orders):
+    with pytest.raises(ValueError, match="strategy"):
+        _compare(orders, "parallel", measures=["revenue"])
@@ -0,0 +1,176 @@
+"""Tests for the structural compile cache behind SemanticAggregateOp.to_untagged."""
+
+import ibis
+import pytest
+
+from boring_semantic_layer import options, to_semantic_table
+from boring_semantic_layer.ops import clear_compile_cache, compile_cache_info
+
+
+@pytest.fixture
+def flights():
+    con = ibis.duckdb.connect(":memory:")
+    tbl = con.create_table(
+        "flights",
+        ibis.memtable(
+            {
+                "origin": ["JFK", "JFK", "LAX", "SFO"],
+                "carrier": ["AA", "UA", "AA", "UA"],
+                "distance": [100, 200, 300, 400],
+            }
+        ),
+    )
+    return (
+        to_semantic_table(tbl, name="flights")
+        .with_dimensions(origin=lambda t: t.origin, carrier=lambda t: t.carrier)
+        .with_measures(
+            flight_count=lambda t: t.count(),
+            total_distance=lambda t: t.distance.sum(),
+        )
+    )
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_compile_cache()
+    yield
+    clear_compile_cache()
+
+
+def _compile(model, **kwargs):
+    return model.query(**kwargs).op().to_untagged()
+
+
+def test_repeated_query_hits_cache(flights):
+    first = _compile(flights, dimensions=["origin"], measures=["flight_count"])
+    second = _compile(flights, dimensions=["origin"], measures=["flight_count"])
+
+    info = compile_cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    assert first is second
+
+
+def test_cached_plan_returns_same_rows(flights):
+    kwargs = {"dimensions": ["origin"], "measures": ["total_distance"]}
+    cold = flights.query(**kwargs).execute().sort_values("origin")
+    warm = flights.query(**kwargs).execute().sort_values("origin")
+
+    assert compile_cache_info().hits >= 1
+    assert cold.to_dict("records") == warm.to_dict("records")
+
+
+def test_different_filter_values_do_not_collide(flights):
+    jfk = flights.query(
+        dimensions=["origin"],
+        measures=["flight_count"],
+        filters=[{"field": "origin", "operator": "=", "value": "JFK"}],
+    ).execute()
+    lax = flights.query(
+        dimensions=["origin"],
+        measures=["flight_count"],
+        filters=[{"field": "origin", "operator": "=", "value": "LAX"}],
+    ).execute()
+
+    assert list(jfk["origin"]) == ["JFK"]
+    assert list(lax["origin"]) == ["LAX"]
+    assert compile_cache_info().hits == 0
+
+
+def test_lambda_closures_are_part_of_the_key(flights):
+    def above(limit):
+        return (
+            flights.filter(lambda t: t.distance > limit)
+            .group_by("origin")
+            .aggregate("flight_count")
+        )
+
+    low = above(150).execute()
+    high = above(350).execute()
+
+    assert set(low["origin"]) == {"JFK", "LAX", "SFO"}
+    assert set(high["origin"]) == {"SFO"}
+
+
+CARRIERS = ["AA"]
+
+
+def _carrier_filter(t):
+    return t.carrier.isin(CARRIERS)
+
+
+def test_referenced_globals_are_part_of_the_key(flights, monkeypatch):
+    def compile_carriers():
+        return flights.filter(lambda t: _carrier_filter(t)).aggregate("flight_count").execute()
+
+    assert compile_carriers()["flight_count"].item() == 2
+
+    CARRIERS.append("UA")
+    try:
+        assert compile_carriers()["flight_count"].item() == 4
+    finally:
+        CARRIERS.remove("UA")
+
+    monkeypatch.setitem(globals(), "_carrier_filter", lambda t: t.carrier == "UA")
+    assert compile_carriers()["flight_count"].item() == 2
+    assert compile_cache_info().hits == 0
+
+
+def test_lru_eviction(flights, monkeypatch):
+    monkeypatch.setattr(options, "compile_cache_size", 2)
+    for dims in (["origin"], ["carrier"], ["origin", "carrier"]):
+        _compile(flights, dimensions=dims, measures=["flight_count"])
+
+    info = compile_cache_info()
+    assert info.currsize == 2
+    assert info.evictions == 1
+
+    _compile(flights, dimensions=["origin"], measures=["flight_count"])
+    assert compile_cache_info().misses == 4
+
+
+def test_opt_out(flights, monkeypatch):
+    monkeypatch.setattr(options, "compile_cache", False)
+    first = _compile(flights, dimensions=["origin"], measures=["flight_count"])
+    second = _compile(flights, dimensions=["origin"], measures=["flight_count"])
+
+    info = compile_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (0, 0, 0)
+    assert first is not second
+
+
+def test_table_values_are_computed_once_per_op():
+    calls = []
+
+    def total(t):
+        calls.append(1)
+        return t.distance.sum()
+
+    model = to_semantic_table(ibis.memtable({"distance": [1, 2, 3]}), name="wide").with_measures(
+        total=total
+    )
+    op = model.op()
+    calls.clear()
+
+    first_schema = op.schema
+    assert op.schema is first_schema
+    assert op.values is op.values
+    assert len(calls) == 1
+    assert first_schema["total"].is_integer()
+
+
+def test_equal_tables_of_different_connections_do_not_share_plans():
+    def model(origin):
+        con = ibis.duckdb.connect(":memory:")
+        tbl = con.create_table("flights", ibis.memtable({"origin": [origin]}))
+        return (
+            to_semantic_table(tbl, name="flights")
+            .with_dimensions(origin=lambda t: t.origin)
+            .with_measures(flight_count=lambda t: t.count())
+        )
+
+    jfk, sfo = model("JFK"), model("SFO")
+    kwargs = {"dimensions": ["origin"], "measures": ["flight_count"]}
+
+    assert list(jfk.query(**kwargs).execute()["origin"]) == ["JFK"]
+    assert list(sfo.query(**kwargs).execute()["origin"]) == ["SFO"]
+    assert compile_cache_info().hits == 0
@@ -0,0 +1,198 @@
+"""Tests for the process-wide connection registry behind ``get_connection``."""
+
+import threading
+
+import ibis
+import pytest
+
+import boring_semantic_layer.connections as connections_module
+from boring_semantic_layer import options
+from boring_semantic_layer.connections import ConnectionRegistry, connection_registry
+from boring_semantic_layer.profile import get_connection
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(options, "connection_registry", True)
+    connection_registry.close()
+    yield
+    connection_registry.close()
+
+
+@pytest.fixture
+def parquet_profile(tmp_path):
+    ibis.memtable({"id": [1, 2, 3]}).to_parquet(tmp_path / "items.parquet")
+    profile_file = tmp_path / "profiles.yml"
+    profile_file.write_text(f"""
+items_db:
+  type: duckdb
+  database: ":memory:"
+  tables:
+    items: "{tmp_path / "items.parquet"}"
+""")
+    return profile_file
+
+
+def _in_thread(fn):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", fn()))
+    thread.start()
+    thread.join()
+    return result["value"]
+
+
+def test_same_profile_shares_one_connection(parquet_profile):
+    con = get_connection("items_db", profile_file=parquet_profile)
+    assert get_connection("items_db", profile_file=parquet_profile) is con
+    assert get_connection(str(parquet_profile)) is con
+    assert len(connection_registry) == 1
+
+
+def test_registry_is_opt_in(parquet_profile, monkeypatch):
+    from boring_semantic_layer.config import Options
+
+    assert Options().connection_registry is False
+    monkeypatch.setattr(options, "connection_registry", False)
+    first = get_connection("items_db", profile_file=parquet_profile)
+    assert get_connection("items_db", profile_file=parquet_profile) is not first
+    assert len(connection_registry) == 0
+
+    # Unshared connections still get their own cursor per thread.
+    other = _in_thread(lambda: connection_registry.thread_backend(first))
+    assert other is not first
+    assert other.table("items").count().execute() == 3
+
+
+def test_env_vars_are_part_of_the_key(tmp_path, monkeypatch):
+    profile = {"type": "duckdb", "database": "${BSL_TEST_DB}"}
+    monkeypatch.setenv("BSL_TEST_DB", str(tmp_path / "a.db"))
+    first = get_connection(profile)
+    monkeypatch.setenv("BSL_TEST_DB", str(tmp_path / "b.db"))
+    assert get_connection(profile) is not first
+
+
+def test_duckdb_thread_cursor_sees_profile_tables(parquet_profile):
+    con = get_connection("items_db", profile_file=parquet_profile)
+    assert connection_registry.thread_backend(con) is connection_registry.thread_backend(con)
+
+    other = _in_thread(lambda: connection_registry.thread_backend(con))
+    assert other is not con
+    assert other is not connection_registry.thread_backend(con)
+    assert other.table("items").count().execute() == 3
+
+
+def test_unregistered_duckdb_backend_keeps_its_connection():
+    con = ibis.duckdb.connect()
+    assert _in_thread(lambda: ConnectionRegistry().thread_backend(con)) is con
+
+
+def test_user_temp_table_is_queried_from_a_worker_thread():
+    from boring_semantic_layer import to_semantic_table
+
+    con = ibis.duckdb.connect()
+    tbl = con.create_table("f", ibis.memtable({"n": [1, 2, 3]}), temp=True)
+    model = to_semantic_table(tbl, name="f").with_measures(total=lambda t: t.n.sum())
+    assert _in_thread(lambda: model.aggregate("total").execute())["total"].iloc[0] == 6
+
+
+def test_failed_health_check_reconnects(parquet_profile, monkeypatch):
+    first = get_connection("items_db", profile_file=parquet_profile)
+    monkeypatch.setattr(options, "connection_health_check_interval", 0.0)
+    monkeypatch.setattr(connections_module, "_is_healthy", lambda con: False)
+    second = get_connection("items_db", profile_file=parquet_profile)
+    assert second is not first
+    assert second.table("items").count().execute() == 3
+
+
+def test_health_check_keeps_duckdb_connection_open(parquet_profile, monkeypatch):
+    monkeypatch.setattr(options, "connection_health_check_interval", 0.0)
+    con = get_connection("items_db", profile_file=parquet_profile)
+    items = con.table("items")
+
+    assert get_connection("items_db", profile_file=parquet_profile) is con
+    assert items.count().execute() == 3
+
+
+def test_reconnect_closes_the_failed_connection(parquet_profile, monkeypatch):
+    first = get_connection("items_db", profile_file=parquet_profile)
+    closed = []
+    monkeypatch.setattr(first, "disconnect", lambda: closed.append(first), raising=False)
+    monkeypatch.setattr(options, "connection_health_check_interval", 0.0)
+    monkeypatch.setattr(connections_module, "_is_healthy", lambda con: False)
+
+    assert get_connection("items_db", profile_file=parquet_profile) is not first
+    assert closed == [first]
+    assert _in_thread(lambda: connection_registry.thread_backend(first)) is first
+
+
+def test_close_drops_connections(parquet_profile):
+    first = get_connection("items_db", profile_file=parquet_profile)
+    connection_registry.close(first)
+    assert len(connection_registry) == 0
+    assert get_connection("items_db", profile_file=parquet_profile) is not first
+
+
+@pytest.fixture
+def items_model(parquet_profile):
+    from boring_semantic_layer import to_semantic_table
+
+    con = get_connection("items_db", profile_file=parquet_profile)
+    return to_semantic_table(con.table("items"), name="items").with_measures(
+        total=lambda t: t.id.sum(), n=lambda t: t.count()
+    )
+
+
+def test_worker_threads_execute_on_their_own_cursor(items_model, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    opened = []
+    thread_backend = connection_registry.thread_backend
+
+    def spy(con, **kwargs):
+        backend = thread_backend(con, **kwargs)
+        opened.append((threading.get_ident(), id(backend)))
+        return backend
+
+    monkeypatch.setattr(connection_registry, "thread_backend", spy)
+    query = items_model.aggregate("total", "n")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: query.execute(), range(16)))
+
+    assert all(result.to_dict("records") == [{"total": 6, "n": 3}] for result in results)
+    cursors = {}
+    for thread, backend in opened:
+        cursors.setdefault(thread, set()).add(backend)
+    assert all(len(backends) == 1 for backends in cursors.values())
+    assert len({next(iter(b)) for b in cursors.values()}) == len(cursors)
+
+
+def test_main_thread_keeps_the_shared_connection(items_model, monkeypatch):
+    calls = []
+    monkeypatch.setattr(connection_registry, "thread_backend", lambda con, **kw: calls.append(con))
+    assert items_model.aggregate("n").execute()["n"].iloc[0] == 3
+    assert calls == []
+
+
+def test_cursor_is_refreshed_for_tables_created_later(items_model):
+    from boring_semantic_layer import to_semantic_table
+
+    source = items_model.table.op().find(lambda n: type(n).__name__ == "DatabaseTable")[0].source
+
+    def run():
+        connection_registry.thread_backend(source)  # opened before the view exists
+        source.raw_sql("CREATE OR REPLACE TEMP VIEW later_items AS SELECT * FROM items")
+        later = to_semantic_table(source.table("later_items"), name="later").with_measures(
+            n=lambda t: t.count()
+        )
+        return later.aggregate("n").execute()["n"].iloc[0]
+
+    assert _in_thread(run) == 3
+
+
+def test_profile_temp_table_falls_back_to_the_shared_connection(parquet_profile):
+    from boring_semantic_layer import to_semantic_table
+
+    con = get_connection("items_db", profile_file=parquet_profile)
+    tbl = con.create_table("scratch", ibis.memtable({"n": [4, 5]}), temp=True)
+    model = to_semantic_table(tbl, name="scratch").with_measures(total=lambda t: t.n.sum())
+    assert _in_thread(lambda: model.aggregate("total").execute())["total"].iloc[0] == 9
@@ -0,0 +1,141 @@
+"""Tests for the deterministic structural fingerprint of semantic expressions."""
+
+import subprocess
+import sys
+import textwrap
+
+import ibis
+import pytest
+
+from boring_semantic_layer import SerializationError, to_semantic_table
+
+_MODEL_SCRIPT = textwrap.dedent(
+    """
+    import ibis
+    from boring_semantic_layer import to_semantic_table
+
+    tbl = ibis.memtable({"origin": ["JFK", "LAX", "JFK"], "distance": [100, 200, 300]})
+    flights = (
+        to_semantic_table(tbl, name="flights")
+        .with_dimensions(origin=lambda t: t.origin)
+        .with_measures(
+            flight_count=lambda t: t.count(),
+            total_distance=lambda t: t.distance.sum(),
+        )
+    )
+    query = flights.query(
+        dimensions=["origin"],
+        measures=["total_distance"],
+        filters=[{"field": "origin", "operator": "=", "value": "JFK"}],
+        order_by=[("total_distance", "desc")],
+        limit=5,
+    )
+    """
+)
+
+
+@pytest.fixture
+def flights():
+    namespace: dict = {}
+    exec(_MODEL_SCRIPT, namespace)
+    return namespace["flights"]
+
+
+def _query(model, origin="JFK", **kwargs):
+    return model.query(
+        dimensions=["origin"],
+        measures=["total_distance"],
+        filters=[{"field": "origin", "operator": "=", "value": origin}],
+        order_by=[("total_distance", "desc")],
+        limit=5,
+        **kwargs,
+    )
+
+
+def test_equal_queries_share_fingerprint(flights):
+    assert _query(flights).fingerprint() == _query(flights).fingerprint()
+
+
+def test_fingerprint_is_stable_across_processes(flights):
+    script = _MODEL_SCRIPT + "\nprint(query.fingerprint())\n"
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"PYTHONHASHSEED": "123", "PATH": ""},
+    )
+    assert result.stdout.strip() == _query(flights).fingerprint()
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda m: _query(m, origin="LAX"),
+        lambda m: m.query(dimensions=["origin"], measures=["flight_count"]),
+        lambda m: m.query(dimensions=["origin"], measures=["total_distance"], limit=10),
+        lambda m: m.with_measures(total_distance=lambda t: t.distance.mean()).query(
+            dimensions=["origin"], measures=["total_distance"]
+        ),
+    ],
+    ids=["filter-value", "measure", "limit", "measure-definition"],
+)
+def test_fingerprint_changes_with_query(flights, change):
+    base = flights.query(dimensions=["origin"], measures=["total_distance"])
+    assert change(flights).fingerprint() != base.fingerprint()
+
+
+def test_closure_values_are_part_of_fingerprint(flights):
+    def above(limit):
+        return (
+            flights.filter(lambda t: t.distance > limit)
+            .group_by("origin")
+            .aggregate("flight_count")
+        )
+
+    assert above(150).fingerprint() == above(150).fingerprint()
+    assert above(150).fingerprint() != above(250).fingerprint()
+
+
+def test_source_table_identity(flights):
+    con = ibis.duckdb.connect(":memory:")
+    con.create_table("flights", {"origin": ["JFK"], "distance": [1]})
+    con.create_table("flights_v2", {"origin": ["JFK"], "distance": [1]})
+
+    def model(name):
+        return to_semantic_table(con.table(name), name="flights").with_measures(
+            flight_count=lambda t: t.count()
+        )
+
+    assert model("flights").fingerprint() == model("flights").fingerprint()
+    assert model("flights").fingerprint() != model("flights_v2").fingerprint()
+    assert model("flights").fingerprint() != flights.fingerprint()
+
+
+def test_same_named_tables_of_different_databases_differ(tmp_path):
+    def model(con):
+        con.create_table("flights", {"origin": ["JFK"]}, overwrite=True)
+        return to_semantic_table(con.table("flights"), name="flights").with_measures(
+            flight_count=lambda t: t.count()
+        )
+
+    first = model(ibis.duckdb.connect(tmp_path / "a.db"))
+    assert first.fingerprint() == model(ibis.duckdb.connect(tmp_path / "a.db")).fingerprint()
+    assert first.fingerprint() != model(ibis.duckdb.connect(tmp_path / "b.db")).fingerprint()
+    assert model(ibis.duckdb.connect()).fingerprint() != (
+        model(ibis.duckdb.connect()).fingerprint()
+    )
+
+
+def test_unfingerprintable_closure_raises(flights):
+    class Switch:
+        enabled = True
+
+    switch = Switch()
+
+    def predicate(t):
+        # Not expressible as a Deferred: the result depends on ``switch``.
+        return ibis.literal(True) if switch.enabled else t.distance > 0
+
+    with pytest.raises(SerializationError):
+        flights.filter(predicate).fingerprint()
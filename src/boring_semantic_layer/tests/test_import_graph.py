@@ -212,6 +212,7 @@ _LAYERS: dict[str, int] = {
     "nested_access": 0,
     "predicate": 0,
     "config": 0,
+    "tracing": 0,
     # 1: analysis/util modules over primitives
     "graph_utils": 1,
     "measure_scope": 1,
@@ -219,6 +220,9 @@ _LAYERS: dict[str, int] = {
     "nested_compile": 1,
     "projection_utils": 1,
     "profile": 1,
+    "connections": 1,
+    "result_cache": 1,
+    "single_flight": 1,
     # 2: compilers-of-expressions
     "calc_compiler": 2,
     "convert": 2,
@@ -230,6 +234,10 @@ _LAYERS: dict[str, int] = {
     # 5: sugar and orchestration over expressions
     "api": 5,
     "query": 5,
+    "query_profile": 5,
+    "pagination": 5,
+    "time_range": 5,
+    "value_index": 5,
     "yaml": 5,
     # 6: serialization of everything below
     "serialization": 6,
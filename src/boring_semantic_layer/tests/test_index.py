@@ -206,11 +206,79 @@ class TestIndexWithSampling:
         full_result = flights_semantic.index("carrier").execute()
         sampled_result = flights_semantic.index("carrier", sample=5).execute()
 
-        # Both should have same carriers but potentially different weights
-        assert len(full_result) == len(sampled_result)
-        # Weights might differ due to sampling
-        # (This is a probabilistic test, so we just check structure)
-        assert "weight" in sampled_result.columns
+        # Weights count only the sampled rows, over carriers that exist
+        assert sampled_result["weight"].sum() == 5
+        assert set(sampled_result["fieldValue"]) <= set(full_result["fieldValue"])
+
+    def test_index_sample_is_deterministic(self, flights_semantic):
+        """Test that the hash-based sample picks the same rows every run."""
+        first = flights_semantic.index("origin", sample=7).execute()
+        second = flights_semantic.index("origin", sample=7).execute()
+
+        key = ["fieldValue", "weight"]
+        pd.testing.assert_frame_equal(
+            first[key].sort_values(key).reset_index(drop=True),
+            second[key].sort_values(key).reset_index(drop=True),
+        )
+
+    def test_index_sample_filters_on_entity_hash_without_sorting(self, flights_table):
+        """Test that the sample is a hash filter on the entity key, not a sort."""
+        model = to_semantic_table(flights_table, name="flights").with_dimensions(
+            flight_id={"expr": lambda t: t.flight_id, "is_entity": True},
+            carrier=lambda t: t.carrier,
+        )
+        sampled = model.index("carrier", sample=5)
+
+        sql = sampled.sql()
+        assert "ORDER BY" not in sql
+        assert 'HASH("t0"."flight_id")' in sql
+        assert 'HASH("t0"."carrier")' not in sql
+        assert sampled.execute()["weight"].sum() == 5
+
+
+class TestIndexStrategies:
+    """Tests for the single-scan "unpivot" strategy against per-field "union"."""
+
+    @staticmethod
+    def _sorted(df):
+        cols = ["fieldName", "fieldPath", "fieldType", "fieldValue", "weight"]
+        return df[cols].sort_values(["fieldPath", "fieldValue"]).reset_index(drop=True)
+
+    def test_unpivot_matches_union(self, flights_semantic):
+        """Test that both strategies index string and numeric fields alike."""
+        fields = ["carrier", "origin", "distance", "flight_id"]
+        union = flights_semantic.index(fields, strategy="union").execute()
+        unpivot = flights_semantic.index(fields, strategy="unpivot").execute()
+
+        pd.testing.assert_frame_equal(self._sorted(unpivot), self._sorted(union), check_dtype=False)
+        distance = unpivot[unpivot["fieldPath"] == "distance"]
+        assert distance["fieldValue"].tolist() == ["702 to 2565"]
+
+    def test_unpivot_matches_union_with_weight(self, flights_semantic):
+        """Test that a weight measure is evaluated per field value in one pass."""
+        fields = ["carrier", "dest"]
+        union = flights_semantic.index(fields, by="total_distance", strategy="union").execute()
+        unpivot = flights_semantic.index(fields, by="total_distance", strategy="unpivot").execute()
+
+        pd.testing.assert_frame_equal(self._sorted(unpivot), self._sorted(union), check_dtype=False)
+
+    def test_unpivot_after_join(self, flights_semantic, airports_semantic):
+        """Test the unpivot strategy on prefixed join fields."""
+        joined = flights_semantic.join_one(airports_semantic, lambda f, a: f.origin == a.code)
+        fields = ["flights.carrier", "airports.state"]
+        union = joined.index(fields, strategy="union").execute()
+        unpivot = joined.index(fields, strategy="unpivot").execute()
+
+        pd.testing.assert_frame_equal(self._sorted(unpivot), self._sorted(union), check_dtype=False)
+
+    def test_unpivot_scans_source_once(self, flights_semantic):
+        """Test that "auto" picks the single-scan plan for several fields."""
+        sql = flights_semantic.index(["carrier", "origin", "dest"]).sql()
+        assert sql.count('"flights"') == 1
+
+    def test_unknown_strategy(self, flights_semantic):
+        with pytest.raises(ValueError, match="strategy must be"):
+            flights_semantic.index("carrier", strategy="fastest")
 
 
 class TestIndexOnJoin:
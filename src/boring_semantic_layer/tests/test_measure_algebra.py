@@ -0,0 +1,171 @@
+"""Tests for the mergeable measure-state algebra and ``reaggregate``."""
+
+import ibis
+import pandas as pd
+import pytest
+
+from boring_semantic_layer import QueryError, to_semantic_table
+from boring_semantic_layer.ops import (
+    ADDITIVE,
+    DECOMPOSABLE,
+    HOLISTIC,
+    SEMI_ADDITIVE,
+    classify_reduction,
+)
+
+_MERGEABLE = ["flight_count", "total_distance", "max_distance", "avg_distance", "sd", "var_pop"]
+
+
+@pytest.fixture
+def flights():
+    tbl = ibis.memtable(
+        {
+            "carrier": ["AA", "AA", "UA", "UA", "AA", "UA", "UA"],
+            "origin": ["JFK", "LAX", "JFK", "JFK", "SFO", "LAX", "SFO"],
+            "distance": [100.0, 200.0, 300.0, 400.0, 500.0, None, 650.0],
+        }
+    )
+    return (
+        to_semantic_table(tbl, name="flights")
+        .with_dimensions(carrier=lambda t: t.carrier, origin=lambda t: t.origin)
+        .with_measures(
+            flight_count=lambda t: t.count(),
+            total_distance=lambda t: t.distance.sum(),
+            max_distance=lambda t: t.distance.max(),
+            avg_distance=lambda t: t.distance.mean(),
+            sd=lambda t: t.distance.std(),
+            var_pop=lambda t: t.distance.var(how="pop"),
+            long_avg=lambda t: t.distance.mean(where=t.distance > 250),
+            origins=lambda t: t.origin.nunique(),
+            median_distance=lambda t: t.distance.median(),
+            distance_per_flight=lambda t: t.total_distance / t.flight_count,
+        )
+    )
+
+
+def _sorted(df, by):
+    return df.sort_values(by).reset_index(drop=True) if by else df
+
+
+@pytest.mark.parametrize(
+    "build, kind",
+    [
+        (lambda t: t.distance.sum(), ADDITIVE),
+        (lambda t: t.count(), ADDITIVE),
+        (lambda t: t.distance.min(), SEMI_ADDITIVE),
+        (lambda t: t.distance.mean(), DECOMPOSABLE),
+        (lambda t: t.distance.var(), DECOMPOSABLE),
+        (lambda t: t.distance.nunique(), HOLISTIC),
+        (lambda t: t.distance.approx_nunique(), HOLISTIC),
+        (lambda t: t.distance.median(), HOLISTIC),
+        (lambda t: t.distance.sum() / t.count(), HOLISTIC),
+    ],
+)
+def test_classify_reduction(build, kind):
+    tbl = ibis.table({"distance": "float64"}, name="flights")
+    assert classify_reduction(build(tbl)).kind == kind
+
+
+def test_measure_algebra_of_query(flights):
+    query = flights.query(
+        dimensions=["carrier"],
+        measures=["total_distance", "avg_distance", "origins", "distance_per_flight"],
+    )
+    kinds = {name: algebra.kind for name, algebra in query.measure_algebra().items()}
+    assert kinds == {
+        "total_distance": ADDITIVE,
+        "avg_distance": DECOMPOSABLE,
+        "origins": HOLISTIC,
+        "distance_per_flight": HOLISTIC,
+    }
+
+
+@pytest.mark.parametrize("by", [["carrier"], ["origin"], []])
+def test_reaggregate_matches_direct_query(flights, by):
+    fine = flights.query(dimensions=["carrier", "origin"], measures=[*_MERGEABLE, "long_avg"])
+    states = fine.to_states().execute()
+
+    merged = fine.reaggregate(states, by=by).execute()
+    direct = flights.query(dimensions=by, measures=[*_MERGEABLE, "long_avg"]).execute()
+
+    pd.testing.assert_frame_equal(
+        _sorted(merged, by), _sorted(direct[merged.columns], by), check_dtype=False
+    )
+
+
+def test_state_columns(flights):
+    query = flights.query(dimensions=["carrier"], measures=["total_distance", "avg_distance"])
+    assert list(query.to_states().columns) == [
+        "carrier",
+        "total_distance",
+        "avg_distance__sum",
+        "avg_distance__count",
+    ]
+
+
+def test_partitioned_states_merge(flights):
+    """States computed per partition union into the full result."""
+    query = flights.query(dimensions=["carrier"], measures=["avg_distance", "sd"])
+    parts = [
+        flights.filter(lambda t, origin=origin: t.origin == origin)
+        .query(dimensions=["carrier"], measures=["avg_distance", "sd"])
+        .to_states()
+        .execute()
+        for origin in ("JFK", "LAX", "SFO")
+    ]
+
+    merged = query.reaggregate(pd.concat(parts), by=["carrier"]).execute()
+
+    pd.testing.assert_frame_equal(
+        _sorted(merged, ["carrier"]), _sorted(query.execute(), ["carrier"]), check_dtype=False
+    )
+
+
+@pytest.mark.parametrize("measure", ["origins", "median_distance", "distance_per_flight"])
+def test_holistic_measures_refuse_states(flights, measure):
+    query = flights.query(dimensions=["carrier"], measures=["flight_count", measure])
+    with pytest.raises(QueryError, match=measure):
+        query.to_states()
+
+
+def test_reaggregate_rejects_unknown_keys(flights):
+    query = flights.query(dimensions=["carrier"], measures=["flight_count"])
+    with pytest.raises(QueryError, match="origin"):
+        query.reaggregate(query.to_states(), by=["origin"])
+
+
+def test_joined_states_refuse_fanned_out_merge():
+    customers = to_semantic_table(
+        ibis.memtable({"cid": [1, 2, 3], "region": ["E", "E", "W"]}), name="c"
+    ).with_measures(customers=lambda t: t.count())
+    orders = (
+        to_semantic_table(
+            ibis.memtable(
+                {
+                    "cid": [1, 1, 2, 3, 3],
+                    "amount": [10.0, 20.0, 30.0, 40.0, 70.0],
+                    "status": ["a", "b", "a", "a", "b"],
+                }
+            ),
+            name="o",
+        )
+        .with_dimensions(status=lambda t: t.status)
+        .with_measures(avg_amount=lambda t: t.amount.mean())
+    )
+    joined = customers.with_dimensions(region=lambda t: t.region).join_many(
+        orders, lambda c, o: c.cid == o.cid
+    )
+    fine = joined.query(
+        dimensions=["c.region", "o.status"], measures=["c.customers", "o.avg_amount"]
+    )
+    states = fine.to_states().execute()
+
+    with pytest.raises(QueryError, match="c.customers"):
+        fine.reaggregate(states, by=["c.region"])
+
+    orders_only = joined.query(dimensions=["c.region", "o.status"], measures=["o.avg_amount"])
+    merged = orders_only.reaggregate(orders_only.to_states().execute(), by=["c.region"])
+    direct = joined.query(dimensions=["c.region"], measures=["o.avg_amount"]).execute()
+    pd.testing.assert_frame_equal(
+        _sorted(merged.execute(), ["c.region"]), _sorted(direct, ["c.region"]), check_dtype=False
+    )
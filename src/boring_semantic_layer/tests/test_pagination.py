@@ -0,0 +1,110 @@
+"""Tests for keyset pagination of query results."""
+
+import ibis
+import pandas as pd
+import pytest
+
+from boring_semantic_layer import QueryError, ResultPager, to_semantic_table
+from boring_semantic_layer.pagination import decode_cursor, encode_cursor, query_key, sort_keys
+
+
+@pytest.fixture
+def flights():
+    tbl = ibis.memtable(
+        {
+            "carrier": ["AA", "UA", "DL", "WN", "B6", None, "AA", "UA"],
+            "origin": ["JFK", "LAX", "ORD", "DEN", "BOS", "SEA", "LAX", "JFK"],
+        }
+    )
+    return (
+        to_semantic_table(tbl, name="flights")
+        .with_dimensions(carrier=lambda t: t.carrier, origin=lambda t: t.origin)
+        .with_measures(flight_count=lambda t: t.count())
+    )
+
+
+def _all_pages(pager, query_result, page_size, order_by=None, key="q"):
+    pages, cursor = [], None
+    while True:
+        page = pager.page(
+            query_result, key=key, page_size=page_size, cursor=cursor, order_by=order_by
+        )
+        pages.append(page)
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("max_rows", [0, 1_000])
+def test_pages_cover_the_ordered_result_once(flights, max_rows):
+    order_by = [("flight_count", "desc")]
+    query_result = flights.query(
+        dimensions=["carrier", "origin"], measures=["flight_count"], order_by=order_by
+    )
+    pages = _all_pages(ResultPager(max_rows=max_rows), query_result, 3, order_by)
+
+    rows = [row for page in pages for row in page.rows.to_dict("records")]
+    assert [len(page.rows) for page in pages] == [3, 3, 2]
+    assert len({(r["carrier"], r["origin"]) for r in rows}) == 8
+    assert [r["flight_count"] for r in rows] == sorted(
+        (r["flight_count"] for r in rows), reverse=True
+    )
+    assert pd.isna(rows[-1]["carrier"])  # NULLs sort last
+
+
+def test_cached_result_is_not_re_executed(flights, monkeypatch):
+    import boring_semantic_layer.pagination as pagination
+
+    calls = []
+    execute = pagination._execute_traced
+    monkeypatch.setattr(pagination, "_execute_traced", lambda *a: calls.append(1) or execute(*a))
+    query_result = flights.query(dimensions=["origin"], measures=["flight_count"])
+    pages = _all_pages(ResultPager(max_rows=100), query_result, 2)
+
+    assert len(calls) == 1
+    assert pages[0].total_rows == 6
+    assert sum(len(page.rows) for page in pages) == 6
+
+
+def test_cursor_of_another_query_is_rejected(flights):
+    pager = ResultPager()
+    query_result = flights.query(dimensions=["origin"], measures=["flight_count"])
+    cursor = pager.page(query_result, key="a", page_size=2).next_cursor
+    with pytest.raises(QueryError, match="different query"):
+        pager.page(query_result, key="b", page_size=2, cursor=cursor)
+    with pytest.raises(QueryError, match="Invalid pagination cursor"):
+        pager.page(query_result, key="a", page_size=2, cursor="not-a-cursor")
+
+
+def test_cursor_survives_a_rebuilt_model_and_a_new_pager(flights):
+    spec = {"dimensions": ["carrier", "origin"], "measures": ["flight_count"]}
+    rebuilt = to_semantic_table(flights.op().table, name="flights")
+    rebuilt = rebuilt.with_dimensions(
+        carrier=lambda t: t.carrier, origin=lambda t: t.origin
+    ).with_measures(flight_count=lambda t: t.count())
+    assert query_key(rebuilt, spec) == query_key(flights, spec)
+
+    first = ResultPager(max_rows=0).page(
+        flights.query(**spec), key=query_key(flights, spec), page_size=3
+    )
+    second = ResultPager(max_rows=0).page(
+        rebuilt.query(**spec),
+        key=query_key(rebuilt, spec),
+        page_size=3,
+        cursor=first.next_cursor,
+    )
+    assert len(second.rows) == 3
+    assert query_key(flights, {**spec, "limit": 1}) != query_key(flights, spec)
+
+
+def test_cursor_round_trips_typed_values():
+    from datetime import date, datetime
+    from decimal import Decimal
+
+    after = [datetime(2024, 1, 2, 3, 4), date(2024, 1, 2), Decimal("1.50"), None, "x", 3]
+    assert decode_cursor(encode_cursor("q", 4, after)) == ("q", 4, after)
+
+
+def test_sort_keys_append_remaining_columns_as_tiebreaker():
+    keys = sort_keys(["carrier", "origin", "n"], [("flights.n", "desc"), "carrier"])
+    assert keys == [("n", True), ("carrier", False), ("origin", False)]
@@ -0,0 +1,163 @@
+"""Tests for ``query_batch``: fusing queries that share a scan."""
+
+import ibis
+import pandas as pd
+import pytest
+
+from boring_semantic_layer import to_semantic_table
+from boring_semantic_layer.expr import SemanticAggregate
+
+BY_ORIGIN = [{"field": "origin", "operator": "!=", "value": "SFO"}]
+
+
+@pytest.fixture
+def flights():
+    con = ibis.duckdb.connect(":memory:")
+    tbl = con.create_table(
+        "flights",
+        pd.DataFrame(
+            {
+                "carrier": ["AA", "AA", "UA", "UA", "AA", None, "UA"],
+                "origin": ["JFK", "LAX", "JFK", "JFK", "SFO", "LAX", "LAX"],
+                "arr_time": pd.to_datetime(
+                    [
+                        "2024-01-05",
+                        "2024-01-20",
+                        "2024-02-03",
+                        "2024-04-01",
+                        "2024-05-09",
+                        "2024-05-10",
+                        "2024-05-11",
+                    ]
+                ),
+                "distance": [100, 200, 300, 400, 500, 50, 70],
+            }
+        ),
+    )
+    return (
+        to_semantic_table(tbl, name="flights")
+        .with_dimensions(
+            carrier=lambda t: t.carrier,
+            origin=lambda t: t.origin,
+            arr_time={"expr": lambda t: t.arr_time, "is_time_dimension": True},
+        )
+        .with_measures(
+            flight_count=lambda t: t.count(),
+            total_distance=lambda t: t.distance.sum(),
+            avg_distance=lambda t: t.distance.mean(),
+            origins=lambda t: t.origin.nunique(),
+        )
+    )
+
+
+def _fused(result):
+    return "__batch_grouping_id" in result.sql()
+
+
+def _assert_same_as_query(model, specs, results):
+    for spec, result in zip(specs, results, strict=True):
+        expected = model.query(**spec).execute()
+        actual = result.execute()
+        if not spec.get("order_by"):
+            expected = expected.sort_values(list(expected.columns)).reset_index(drop=True)
+            actual = actual.sort_values(list(actual.columns)).reset_index(drop=True)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_dashboard_tiles_share_one_scan(flights):
+    specs = [
+        {"measures": ["flight_count"], "filters": BY_ORIGIN},
+        {
+            "dimensions": ["flights.carrier"],
+            "measures": ["flight_count", "avg_distance"],
+            "filters": BY_ORIGIN,
+            "order_by": [("flight_count", "desc")],
+            "limit": 2,
+        },
+        {
+            "dimensions": ["carrier", "origin"],
+            "measures": ["total_distance"],
+            "filters": BY_ORIGIN,
+        },
+    ]
+    results = flights.query_batch(specs)
+
+    assert all(_fused(result) for result in results)
+    _assert_same_as_query(flights, specs, results)
+
+
+def test_time_grain_and_range_are_shared(flights):
+    window = {"start": "2024-01-01", "end": "2024-04-30"}
+    specs = [
+        {
+            "dimensions": ["arr_time"],
+            "measures": ["flight_count"],
+            "time_grain": "TIME_GRAIN_MONTH",
+            "time_range": window,
+        },
+        {
+            "dimensions": ["arr_time", "carrier"],
+            "measures": ["total_distance"],
+            "time_grain": "TIME_GRAIN_MONTH",
+            "time_range": window,
+        },
+    ]
+    results = flights.query_batch(specs)
+
+    assert all(_fused(result) for result in results)
+    _assert_same_as_query(flights, specs, results)
+
+
+@pytest.mark.parametrize(
+    "specs",
+    [
+        [
+            {"dimensions": ["carrier"], "measures": ["origins"]},
+            {"measures": ["origins"]},
+        ],
+        [
+            {"measures": ["flight_count"]},
+            {"measures": ["flight_count"], "filters": BY_ORIGIN},
+        ],
+        [
+            {"measures": ["flight_count"]},
+            {
+                "dimensions": ["carrier"],
+                "measures": ["flight_count"],
+                "filters": [{"field": "flight_count", "operator": ">", "value": 1}],
+            },
+        ],
+        [
+            {"dimensions": ["carrier"], "measures": ["flight_count"]},
+            {"dimensions": ["origin"], "measures": ["total_distance"]},
+        ],
+    ],
+    ids=["holistic-measure", "different-filters", "having-filter", "disjoint-dimensions"],
+)
+def test_unfusable_specs_run_as_queries(flights, specs):
+    results = flights.query_batch(specs)
+
+    assert not any(_fused(result) for result in results)
+    _assert_same_as_query(flights, specs, results)
+
+
+def test_fused_queries_select_their_grain_lazily(flights):
+    specs = [
+        {"measures": ["flight_count"]},
+        {"dimensions": ["carrier"], "measures": ["flight_count"]},
+    ]
+    total, by_carrier = flights.query_batch(specs)
+
+    # Both read the one grouping-sets aggregation; neither has run yet.
+    assert total.sql().count("UNNEST") == by_carrier.sql().count("UNNEST") == 1
+    assert by_carrier.execute()["flight_count"].sum() == total.execute()["flight_count"].item()
+
+
+def test_unfused_results_are_ordinary_queries(flights):
+    (result,) = flights.query_batch([{"dimensions": ["carrier"], "measures": ["flight_count"]}])
+    assert isinstance(result, SemanticAggregate)
+
+
+def test_invalid_spec_raises_like_query(flights):
+    with pytest.raises(KeyError, match="nope"):
+        flights.query_batch([{"measures": ["flight_count"]}, {"measures": ["nope"]}])
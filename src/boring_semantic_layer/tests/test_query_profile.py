@@ -0,0 +1,61 @@
+"""Tests for ``SemanticTable.profile()``."""
+
+import ibis
+import pytest
+
+from boring_semantic_layer import QueryProfile, to_semantic_table
+
+
+@pytest.fixture
+def models():
+    con = ibis.duckdb.connect()
+    flights = con.create_table(
+        "flights",
+        ibis.memtable({"carrier": ["AA", "UA", "UA", "DL"], "distance": [100, 200, 300, 400]}),
+    )
+    carriers = con.create_table(
+        "carriers", ibis.memtable({"code": ["AA", "UA", "DL"], "name": ["A", "U", "D"]})
+    )
+    flights_model = (
+        to_semantic_table(flights, name="flights")
+        .with_dimensions(carrier=lambda t: t.carrier)
+        .with_measures(flight_count=lambda t: t.count(), distance=lambda t: t.distance.sum())
+    )
+    carriers_model = (
+        to_semantic_table(carriers, name="carriers")
+        .with_dimensions(code=lambda t: t.code, name=lambda t: t.name)
+        .with_measures(carrier_count=lambda t: t.count())
+    )
+    return flights_model, carriers_model
+
+
+def test_profile_reports_phases_sql_and_result_size(models):
+    flights, _ = models
+    profile = flights.query(dimensions=["carrier"], measures=["flight_count"]).profile()
+
+    assert isinstance(profile, QueryProfile)
+    assert {"compile", "sql", "execute", "convert", "explain"} <= set(profile.phases)
+    assert any(name.startswith("compile.aggregation.") for name in profile.phases)
+    assert profile.rows == 3
+    assert profile.nbytes > 0
+    assert profile.sql_bytes == len(profile.sql.encode())
+    assert profile.backend == "duckdb"
+    assert profile.explain
+    assert profile.wall_seconds >= profile.phases["execute"]
+    assert profile.to_dict()["rows"] == 3
+    # EXPLAIN ANALYZE leaves the connection usable.
+    assert len(flights.query(dimensions=["carrier"], measures=["flight_count"]).execute()) == 3
+
+
+def test_profile_of_joined_query_times_preaggregation(models):
+    flights, carriers = models
+    joined = flights.join_many(carriers, lambda f, c: f.carrier == c.code)
+    profile = joined.query(
+        dimensions=["carriers.name"], measures=["flights.flight_count", "carriers.carrier_count"]
+    ).profile(analyze=False)
+
+    assert any(name.startswith("compile.preagg.") for name in profile.phases)
+    assert profile.joins >= 1
+    assert profile.subqueries >= 1
+    assert profile.explain is None
+    assert "explain" not in profile.phases
@@ -0,0 +1,152 @@
+"""Tests for the opt-in query result cache."""
+
+import ibis
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from boring_semantic_layer import (
+    clear_result_cache,
+    options,
+    register_data_version,
+    result_cache_info,
+    to_semantic_table,
+)
+from boring_semantic_layer.result_cache import unregister_data_version
+
+
+@pytest.fixture(autouse=True)
+def result_cache(monkeypatch):
+    monkeypatch.setattr(options, "result_cache", True)
+    clear_result_cache()
+    yield
+    clear_result_cache()
+    unregister_data_version("flights")
+
+
+@pytest.fixture
+def con():
+    return ibis.duckdb.connect(":memory:")
+
+
+def _model(con, table="flights"):
+    return (
+        to_semantic_table(con.table(table), name="flights")
+        .with_dimensions(origin=lambda t: t.origin)
+        .with_measures(flight_count=lambda t: t.count())
+    )
+
+
+def _counts(model):
+    df = model.query(dimensions=["origin"], measures=["flight_count"]).execute()
+    return dict(zip(df["origin"], df["flight_count"], strict=True))
+
+
+@pytest.fixture
+def flights(con):
+    con.create_table("flights", {"origin": ["JFK", "JFK", "LAX"]})
+    return _model(con)
+
+
+def test_identical_queries_hit(flights):
+    first = _counts(flights)
+    second = _counts(flights)
+
+    info = result_cache_info()
+    assert first == second == {"JFK": 2, "LAX": 1}
+    assert (info.hits, info.misses, info.entries) == (1, 1, 1)
+    assert info.nbytes > 0
+
+
+def test_disabled_by_default(flights, monkeypatch):
+    monkeypatch.setattr(options, "result_cache", False)
+    _counts(flights)
+    _counts(flights)
+    assert result_cache_info().misses == 0
+
+
+def test_cached_frames_are_detached(flights):
+    query = flights.query(dimensions=["origin"], measures=["flight_count"])
+    query.execute()["flight_count"] = -1
+    assert (query.execute()["flight_count"] > 0).all()
+
+
+def test_arrow_results_are_cached(flights):
+    query = flights.query(dimensions=["origin"], measures=["flight_count"])
+    assert isinstance(query.to_pyarrow(), pa.Table)
+    query.to_pyarrow()
+    assert result_cache_info().hits == 1
+
+
+def test_callback_data_version_invalidates(con, flights):
+    version = {"v": 1}
+    register_data_version("flights", lambda: version["v"])
+    assert _counts(flights) == {"JFK": 2, "LAX": 1}
+
+    con.insert("flights", {"origin": ["SFO"]})
+    assert _counts(flights) == {"JFK": 2, "LAX": 1}  # stale, version unchanged
+
+    version["v"] = 2
+    assert _counts(flights) == {"JFK": 2, "LAX": 1, "SFO": 1}
+    assert result_cache_info().invalidations == 1
+
+
+def test_parquet_file_version_invalidates(con, tmp_path):
+    path = tmp_path / "flights.parquet"
+    pq.write_table(pa.table({"origin": ["JFK"]}), path)
+    con.read_parquet(path, table_name="flights")
+    register_data_version("flights", str(path))
+    model = _model(con)
+    assert _counts(model) == {"JFK": 1}
+
+    pq.write_table(pa.table({"origin": ["JFK", "LAX", "LAX"]}), path)
+    assert _counts(model) == {"JFK": 1, "LAX": 2}
+    assert result_cache_info().invalidations == 1
+
+
+def test_connections_do_not_share_entries(flights):
+    other = ibis.duckdb.connect(":memory:")
+    other.create_table("flights", {"origin": ["SFO"]})
+
+    assert _counts(flights) == {"JFK": 2, "LAX": 1}
+    assert _counts(_model(other)) == {"SFO": 1}
+
+
+def test_data_version_is_scoped_to_its_backend(con, flights):
+    other = ibis.duckdb.connect(":memory:")
+    other.create_table("flights", {"origin": ["SFO"]})
+    other_model = _model(other)
+    version = {"v": 1}
+    register_data_version("flights", lambda: version["v"], backend=other)
+    try:
+        _counts(flights)
+        _counts(other_model)
+        version["v"] = 2
+        _counts(flights)
+        _counts(other_model)
+        assert result_cache_info().invalidations == 1
+    finally:
+        unregister_data_version("flights", backend=other)
+
+
+def test_memory_budget_evicts_lru(con, monkeypatch):
+    con.create_table("flights", {"origin": ["JFK", "LAX"]})
+    model = _model(con)
+    _counts(model)
+    entry_size = result_cache_info().nbytes
+    monkeypatch.setattr(options, "result_cache_max_bytes", entry_size + entry_size // 2)
+
+    model.query(dimensions=["origin"], measures=["flight_count"], limit=1).execute()
+
+    info = result_cache_info()
+    assert info.evictions == 1
+    assert info.entries == 1
+
+
+def test_ttl_expires_entries(flights, monkeypatch):
+    monkeypatch.setattr(options, "result_cache_ttl", 0.0)
+    _counts(flights)
+    _counts(flights)
+    info = result_cache_info()
+    assert info.hits == 0
+    assert info.invalidations == 1
@@ -0,0 +1,181 @@
+"""Tests for routing aggregate queries to registered rollup tables."""
+
+import ibis
+import pandas as pd
+import pytest
+
+from boring_semantic_layer import to_semantic_table
+from boring_semantic_layer.errors import DefinitionError
+
+
+@pytest.fixture
+def con():
+    con = ibis.duckdb.connect(":memory:")
+    con.create_table(
+        "flights",
+        pd.DataFrame(
+            {
+                "carrier": ["AA", "AA", "UA", "UA", "AA", "UA"],
+                "origin": ["JFK", "LAX", "JFK", "JFK", "SFO", "LAX"],
+                "arr_time": pd.to_datetime(
+                    [
+                        "2024-01-05",
+                        "2024-01-20",
+                        "2024-02-03",
+                        "2024-04-01",
+                        "2024-05-09",
+                        "2024-11-30",
+                    ]
+                ),
+                "distance": [100, 200, 300, 400, 500, 600],
+            }
+        ),
+    )
+    return con
+
+
+@pytest.fixture
+def flights(con):
+    return (
+        to_semantic_table(con.table("flights"), name="flights")
+        .with_dimensions(
+            carrier=lambda t: t.carrier,
+            origin=lambda t: t.origin,
+            arr_time={
+                "expr": lambda t: t.arr_time,
+                "is_time_dimension": True,
+                "smallest_time_grain": "TIME_GRAIN_DAY",
+            },
+        )
+        .with_measures(
+            flight_count=lambda t: t.count(),
+            total_distance=lambda t: t.distance.sum(),
+            max_distance=lambda t: t.distance.max(),
+            avg_distance=lambda t: t.distance.mean(),
+        )
+    )
+
+
+@pytest.fixture
+def monthly(con, flights):
+    """Model with a (carrier, month) rollup materialized from the base model."""
+    measures = ["flight_count", "total_distance", "max_distance"]
+    rows = flights.query(
+        dimensions=["carrier", "arr_time"], measures=measures, time_grain="TIME_GRAIN_MONTH"
+    ).execute()
+    con.create_table("flights_by_carrier_month", rows)
+    return flights.with_rollup(
+        con.table("flights_by_carrier_month"),
+        dimensions=["carrier", "arr_time"],
+        measures=measures,
+        time_grains={"arr_time": "TIME_GRAIN_MONTH"},
+        name="carrier_month",
+    )
+
+
+def _rows(query):
+    df = query.execute()
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def _assert_routing(model, base, routed, table="flights_by_carrier_month", **query):
+    q = model.query(**query)
+    assert (table in q.sql()) is routed
+    pd.testing.assert_frame_equal(_rows(q), _rows(base.query(**query)), check_dtype=False)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        {"dimensions": ["carrier"], "measures": ["flight_count", "total_distance"]},
+        {"dimensions": [], "measures": ["max_distance"]},
+        {
+            "dimensions": ["carrier", "arr_time"],
+            "measures": ["flight_count"],
+            "time_grain": "TIME_GRAIN_QUARTER",
+        },
+        {
+            "dimensions": ["arr_time"],
+            "measures": ["total_distance"],
+            "time_grain": "TIME_GRAIN_YEAR",
+            "filters": [{"field": "carrier", "operator": "=", "value": "AA"}],
+        },
+    ],
+    ids=["drop-dimension", "grand-total", "coarser-grain", "filtered"],
+)
+def test_covered_queries_use_rollup(monthly, flights, query):
+    _assert_routing(monthly, flights, True, **query)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        {"dimensions": ["origin"], "measures": ["flight_count"]},
+        {"dimensions": ["carrier"], "measures": ["avg_distance"]},
+        {
+            "dimensions": ["arr_time"],
+            "measures": ["flight_count"],
+            "time_grain": "TIME_GRAIN_DAY",
+        },
+        {
+            "dimensions": ["carrier"],
+            "measures": ["flight_count"],
+            "filters": [{"field": "origin", "operator": "=", "value": "JFK"}],
+        },
+    ],
+    ids=["uncovered-dimension", "unmergeable-measure", "finer-grain", "uncovered-filter"],
+)
+def test_uncovered_queries_fall_back(monthly, flights, query):
+    _assert_routing(monthly, flights, False, **query)
+
+
+def test_smallest_covering_rollup_wins(con, monthly, flights):
+    totals = flights.query(dimensions=["carrier"], measures=["flight_count"]).execute()
+    con.create_table("flights_by_carrier", totals)
+    model = monthly.with_rollup(
+        con.table("flights_by_carrier"), dimensions=["carrier"], measures=["flight_count"]
+    )
+
+    assert (
+        'flights_by_carrier"'
+        in model.query(dimensions=["carrier"], measures=["flight_count"]).sql()
+    )
+    _assert_routing(model, flights, True, dimensions=["carrier"], measures=["total_distance"])
+
+
+def test_redefined_measure_stops_routing(monthly, flights):
+    redefined = monthly.with_measures(total_distance=lambda t: t.distance.sum() * 2)
+    _assert_routing(
+        redefined,
+        flights.with_measures(total_distance=lambda t: t.distance.sum() * 2),
+        False,
+        dimensions=["carrier"],
+        measures=["total_distance"],
+    )
+
+
+def test_rollups_survive_model_extension(monthly, flights):
+    extended = monthly.with_dimensions(route=lambda t: t.origin + "-" + t.carrier)
+    _assert_routing(extended, flights, True, dimensions=["carrier"], measures=["flight_count"])
+
+
+@pytest.mark.parametrize(
+    "kwargs, match",
+    [
+        ({"dimensions": ["tail_num"], "measures": ["flight_count"]}, "dimensions"),
+        ({"dimensions": ["carrier"], "measures": ["avg_distance"]}, "re-aggregated"),
+        ({"dimensions": ["origin"], "measures": ["flight_count"]}, "no columns"),
+        (
+            {
+                "dimensions": ["carrier"],
+                "measures": ["flight_count"],
+                "time_grains": {"carrier": "TIME_GRAIN_MONTH"},
+            },
+            "time_grains",
+        ),
+    ],
+    ids=["unknown-dimension", "unmergeable-measure", "missing-column", "non-time-grain"],
+)
+def test_invalid_rollup_declaration(monthly, con, kwargs, match):
+    with pytest.raises(DefinitionError, match=match):
+        monthly.with_rollup(con.table("flights_by_carrier_month"), **kwargs)
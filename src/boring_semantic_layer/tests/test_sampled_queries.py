@@ -0,0 +1,140 @@
+"""Tests for sample-based approximate queries (``approximate`` / ``sample=``)."""
+
+import ibis
+import numpy as np
+import pandas as pd
+import pytest
+
+from boring_semantic_layer import QueryError, to_semantic_table
+
+N = 50_000
+
+
+@pytest.fixture
+def con():
+    return ibis.duckdb.connect(":memory:")
+
+
+@pytest.fixture
+def flights(con):
+    rng = np.random.default_rng(3)
+    tbl = con.create_table(
+        "flights",
+        pd.DataFrame(
+            {
+                "carrier": rng.choice(["AA", "UA", "DL"], N),
+                "distance": rng.exponential(500.0, N),
+            }
+        ),
+    )
+    return (
+        to_semantic_table(tbl, name="flights")
+        .with_dimensions(carrier=lambda t: t.carrier)
+        .with_measures(
+            flight_count=lambda t: t.count(),
+            total_distance=lambda t: t.distance.sum(),
+            avg_distance=lambda t: t.distance.mean(),
+            max_distance=lambda t: t.distance.max(),
+            carriers=lambda t: t.carrier.nunique(),
+            distance_per_flight=lambda t: t.total_distance / t.flight_count,
+        )
+    )
+
+
+MEASURES = ["flight_count", "total_distance", "avg_distance"]
+
+
+def _by_carrier(df):
+    return df.set_index("carrier").sort_index()
+
+
+def test_estimates_and_intervals(flights):
+    exact = _by_carrier(flights.query(dimensions=["carrier"], measures=MEASURES).execute())
+    approx = _by_carrier(
+        flights.query(dimensions=["carrier"], measures=MEASURES, sample=0.2).execute()
+    )
+
+    for measure in MEASURES:
+        low, high = approx[f"{measure}_ci_low"], approx[f"{measure}_ci_high"]
+        assert (low <= approx[measure]).all() and (approx[measure] <= high).all()
+        # Widen the 95% interval so the fixed-seed data never flakes.
+        slack = (high - low) / 2
+        assert ((exact[measure] >= low - slack) & (exact[measure] <= high + slack)).all()
+
+
+def test_result_columns(flights):
+    approx = flights.query(
+        dimensions=["carrier"],
+        measures=["flight_count", "max_distance", "distance_per_flight"],
+        sample=0.5,
+    )
+    assert list(approx.execute().columns) == [
+        "carrier",
+        "flight_count",
+        "flight_count_ci_low",
+        "flight_count_ci_high",
+        "max_distance",
+        "distance_per_flight",
+    ]
+
+
+def test_calc_measures_use_rescaled_bases(flights):
+    approx = flights.query(measures=["avg_distance", "distance_per_flight"], sample=0.3).execute()
+    assert approx["distance_per_flight"].iloc[0] == pytest.approx(approx["avg_distance"].iloc[0])
+
+
+def test_full_sample_is_exact(flights):
+    exact = flights.query(measures=["flight_count", "total_distance"]).execute()
+    approx = flights.group_by().aggregate("flight_count", "total_distance").execute(sample=1.0)
+    assert approx["flight_count"].iloc[0] == exact["flight_count"].iloc[0]
+    assert approx["total_distance"].iloc[0] == pytest.approx(exact["total_distance"].iloc[0])
+    assert approx["flight_count_ci_low"].iloc[0] == approx["flight_count_ci_high"].iloc[0]
+
+
+def test_sample_is_pushed_into_sql(flights):
+    sql = flights.group_by("carrier").aggregate("flight_count").approximate(0.1).sql()
+    assert "TABLESAMPLE" in sql.upper()
+
+
+def test_seed_is_repeatable(flights):
+    query = flights.group_by("carrier").aggregate("total_distance")
+    first = query.approximate(0.1, seed=7).execute()
+    second = query.approximate(0.1, seed=7).execute()
+    pd.testing.assert_frame_equal(_by_carrier(first), _by_carrier(second))
+
+
+def test_join_samples_only_the_measure_model(con, flights):
+    carriers = (
+        to_semantic_table(
+            con.create_table(
+                "carriers",
+                pd.DataFrame({"code": ["AA", "UA", "DL"], "name": ["American", "United", "Delta"]}),
+            ),
+            name="carriers",
+        )
+        .with_dimensions(name=lambda t: t.name)
+        .with_measures(carrier_count=lambda t: t.count())
+    )
+    joined = flights.join_one(carriers, lambda f, c: f.carrier == c.code)
+
+    approx = joined.query(
+        dimensions=["carriers.name"], measures=["flights.flight_count"], sample=0.5
+    ).execute()
+    assert sorted(approx["carriers.name"]) == ["American", "Delta", "United"]
+    assert approx["flights.flight_count"].sum() == pytest.approx(N, rel=0.05)
+
+    with pytest.raises(QueryError, match="single model"):
+        joined.query(measures=["flights.flight_count", "carriers.carrier_count"], sample=0.5)
+
+
+@pytest.mark.parametrize(
+    "kwargs, match",
+    [
+        ({"measures": ["carriers"], "sample": 0.1}, "Distinct-count"),
+        ({"measures": ["flight_count"], "sample": 0}, "fraction"),
+        ({"measures": ["flight_count"], "sample": 1.5}, "fraction"),
+    ],
+)
+def test_rejected_samples(flights, kwargs, match):
+    with pytest.raises(QueryError, match=match):
+        flights.query(**kwargs)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import inspect
+import json
 
 import ibis
 import pandas as pd
@@ -221,6 +222,60 @@ def test_query_uses_core_bsl_interface(client):
     assert "chart" not in data
 
 
+def test_query_batch_returns_results_in_order(client):
+    tiles = [
+        {"model_name": "flights", "measures": ["flight_count"]},
+        {"model_name": "carriers", "measures": ["carrier_count"]},
+        {
+            "model_name": "flights",
+            "dimensions": ["carrier"],
+            "measures": ["flight_count", "avg_delay"],
+            "order_by": [["carrier", "asc"]],
+        },
+    ]
+    response = client.post(
+        "/query/batch",
+        json={"queries": [{**tile, "get_chart": False} for tile in tiles]},
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["records"] == [{"flight_count": 30}]
+    assert results[1]["records"] == [{"carrier_count": 3}]
+    assert [r["carrier"] for r in results[2]["records"]] == ["AA", "DL", "UA"]
+    assert results[2]["records"][0] == {"carrier": "AA", "flight_count": 10, "avg_delay": 5.2}
+
+
+def test_query_batch_unknown_model_is_404(client):
+    response = client.post(
+        "/query/batch",
+        json={"queries": [{"model_name": "missing", "measures": ["x"], "get_chart": False}]},
+    )
+    assert response.status_code == 404
+
+
+def test_query_with_sample_returns_confidence_bounds(client):
+    response = client.post(
+        "/query",
+        json={
+            "model_name": "flights",
+            "measures": ["flight_count"],
+            "sample": 1.0,
+            "get_chart": False,
+        },
+    )
+
+    assert response.status_code == 200
+    (record,) = response.json()["records"]
+    assert record["flight_count"] == 30
+    assert record["flight_count_ci_low"] == record["flight_count_ci_high"] == 30
+
+    invalid = client.post(
+        "/query", json={"model_name": "flights", "measures": ["flight_count"], "sample": 0}
+    )
+    assert invalid.status_code == 422
+
+
 def test_query_supports_time_grain_and_time_range(client):
     response = client.post(
         "/query",
@@ -384,3 +439,215 @@ def test_unhandled_errors_do_not_leak_exception_text():
 
     assert response.status_code == 500
     assert response.json() == {"detail": "Internal server error"}
+
+
+def test_queries_run_on_backend_execution_pool(client):
+    response = client.post(
+        "/query",
+        json={"model_name": "flights", "measures": ["flight_count"], "get_chart": False},
+    )
+    assert response.status_code == 200
+
+    stats = client.get("/execution").json()
+    assert stats["duckdb"]["completed"] >= 1
+    assert stats["duckdb"]["running"] == 0
+    assert stats["duckdb"]["queued"] == 0
+
+
+def test_full_execution_pool_rejects_with_503():
+    import asyncio
+    import threading
+
+    from fastapi import HTTPException
+
+    from boring_semantic_layer.server.executor import ExecutionLimit, ExecutionPools
+
+    pools = ExecutionPools(default=ExecutionLimit(workers=1, max_queued=1))
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(pools.run("duckdb", release.wait))
+        queued = asyncio.ensure_future(pools.run("duckdb", lambda: "done"))
+        await asyncio.sleep(0.05)
+        assert pools.stats()["duckdb"]["running"] == 1
+        assert pools.stats()["duckdb"]["queued"] == 1
+        with pytest.raises(HTTPException) as excinfo:
+            await pools.run("duckdb", lambda: "rejected")
+        # Other backends have their own pool.
+        assert await pools.run("postgres", lambda: "fast") == "fast"
+        release.set()
+        return excinfo.value, await running, await queued
+
+    try:
+        rejection, first, second = asyncio.run(scenario())
+    finally:
+        pools.shutdown()
+
+    assert rejection.status_code == 503
+    assert rejection.headers == {"Retry-After": "1"}
+    assert (first, second) == (True, "done")
+
+
+def test_execution_limit_validation():
+    from boring_semantic_layer.server.executor import ExecutionLimit
+
+    with pytest.raises(ValueError, match="workers"):
+        ExecutionLimit(workers=0)
+
+
+def test_query_streams_ndjson(client):
+    response = client.post(
+        "/query",
+        json={
+            "model_name": "flights",
+            "dimensions": ["carrier"],
+            "measures": ["flight_count"],
+            "order_by": [["carrier", "asc"]],
+            "response_format": "ndjson",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == [
+        {"carrier": "AA", "flight_count": 10},
+        {"carrier": "DL", "flight_count": 10},
+        {"carrier": "UA", "flight_count": 10},
+    ]
+
+
+def test_query_streams_arrow_ipc(client):
+    pa = pytest.importorskip("pyarrow")
+    response = client.post(
+        "/query",
+        json={
+            "model_name": "flights",
+            "dimensions": ["origin"],
+            "measures": ["flight_count"],
+            "records_limit": 2,
+            "response_format": "arrow",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == ["origin", "flight_count"]
+    assert table.num_rows == 2
+
+
+def test_streaming_query_errors_before_first_byte(client):
+    response = client.post(
+        "/query",
+        json={"model_name": "flights", "measures": ["missing"], "response_format": "ndjson"},
+    )
+
+    assert response.status_code in (400, 500)
+    assert "detail" in response.json()
+
+
+def test_batch_rejects_streaming_formats(client):
+    response = client.post(
+        "/query/batch",
+        json={
+            "queries": [
+                {"model_name": "flights", "measures": ["flight_count"], "response_format": "arrow"}
+            ]
+        },
+    )
+
+    assert response.status_code == 400
+
+
+def _metric(body: str, name: str, **labels: str) -> float:
+    for line in body.splitlines():
+        sample, _, value = line.rpartition(" ")
+        if sample.split("{")[0] == name and all(f'{k}="{v}"' in sample for k, v in labels.items()):
+            return float(value)
+    raise AssertionError(f"{name} {labels} not in metrics")
+
+
+def test_metrics_break_query_latency_into_phases(client):
+    response = client.post(
+        "/query",
+        json={"model_name": "flights", "dimensions": ["origin"], "measures": ["flight_count"]},
+    )
+    assert response.status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    labels = {"endpoint": "/query", "model": "flights"}
+    assert _metric(body, "bsl_query_duration_seconds_count", **labels) >= 1
+    assert _metric(body, "bsl_queries_total", outcome="ok", **labels) >= 1
+    assert _metric(body, "bsl_queries_in_flight", **labels) == 0
+    for phase in ("normalize", "compile", "execute", "convert"):
+        assert _metric(body, "bsl_query_phase_seconds_count", phase=phase, **labels) >= 1
+    assert _metric(body, "bsl_query_phase_seconds_bucket", phase="execute", le="+Inf", **labels)
+    assert _metric(body, "bsl_http_requests_total", endpoint="/query", status="200") >= 1
+    assert _metric(body, "bsl_execution_completed_total", backend="duckdb") >= 1
+    assert "bsl_result_cache_hit_ratio" in body
+    assert _metric(body, "bsl_single_flight_calls_total", result="executed") >= 1
+
+
+def test_metrics_label_requests_by_route_template(client):
+    client.get("/models/flights/schema")
+    client.get("/no-such-path")
+
+    body = client.get("/metrics").text
+    assert _metric(body, "bsl_http_requests_total", endpoint="/models/{model_name}/schema") >= 1
+    assert _metric(body, "bsl_http_requests_total", endpoint="unmatched", status="404") >= 1
+
+
+def test_query_profile_flag_adds_a_profile(client):
+    response = client.post(
+        "/query",
+        json={
+            "model_name": "flights",
+            "dimensions": ["origin"],
+            "measures": ["flight_count"],
+            "profile": True,
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["records"]) == 3
+    assert body["profile"]["rows"] == 3
+    assert body["profile"]["sql"].upper().startswith(("SELECT", "WITH"))
+    assert "execute" in body["profile"]["phases"]
+    assert body["profile"]["explain"] is None
+
+
+def test_query_pages_through_results_with_cursors(client):
+    query = {
+        "model_name": "flights",
+        "dimensions": ["origin", "destination"],
+        "measures": ["flight_count"],
+        "order_by": [["origin", "desc"]],
+        "page_size": 2,
+    }
+    first = client.post("/query", json=query).json()
+    assert first["returned_rows"] == 2
+    assert first["total_rows"] == 3
+    assert [r["origin"] for r in first["records"]] == ["ORD", "LAX"]
+
+    second = client.post("/query", json={**query, "cursor": first["next_cursor"]}).json()
+    assert [r["origin"] for r in second["records"]] == ["JFK"]
+    assert second["next_cursor"] is None
+
+
+def test_query_rejects_cursor_of_other_query(client):
+    query = {
+        "model_name": "flights",
+        "dimensions": ["origin"],
+        "measures": ["flight_count"],
+        "page_size": 1,
+    }
+    cursor = client.post("/query", json=query).json()["next_cursor"]
+
+    response = client.post("/query", json={**query, "dimensions": ["carrier"], "cursor": cursor})
+    assert response.status_code == 400
+    assert "different query" in response.json()["detail"]
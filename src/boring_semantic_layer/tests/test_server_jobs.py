@@ -0,0 +1,215 @@
+"""Tests for background query jobs (``/jobs``)."""
+
+from __future__ import annotations
+
+import io
+import threading
+import time
+
+import ibis
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from boring_semantic_layer import to_semantic_table
+from boring_semantic_layer.server import create_app
+from boring_semantic_layer.server.jobs import MAX_JSON_PAGE_ROWS, JobManager, read_records
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture(scope="module")
+def flights():
+    con = ibis.duckdb.connect(":memory:")
+    tbl = con.create_table(
+        "flights_jobs",
+        pd.DataFrame(
+            {
+                "carrier": ["AA", "UA", "DL"] * 10,
+                "dep_delay": [5.0, 8.0, 3.0] * 10,
+            }
+        ),
+        overwrite=True,
+    )
+    return (
+        to_semantic_table(tbl, name="flights")
+        .with_dimensions(carrier=lambda t: t.carrier)
+        .with_measures(
+            flight_count=lambda t: t.count(),
+            avg_delay=lambda t: t.dep_delay.mean(),
+        )
+    )
+
+
+@pytest.fixture
+def client(flights, tmp_path):
+    app = create_app(models={"flights": flights}, jobs=JobManager(tmp_path, workers=1))
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _wait(client, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed", "cancelled"):
+            return job
+        assert time.monotonic() < deadline, f"job still {job['status']}"
+        time.sleep(0.02)
+
+
+def _submit(client, **query):
+    response = client.post("/jobs", json={"model_name": "flights", **query})
+    assert response.status_code == 202
+    assert response.headers["location"] == f"/jobs/{response.json()['id']}"
+    return response.json()
+
+
+def test_job_runs_in_background_and_serves_json(client):
+    job = _submit(
+        client, dimensions=["carrier"], measures=["flight_count"], order_by=[("carrier", "asc")]
+    )
+    assert job["status"] in ("queued", "running", "succeeded")
+    assert job["backend"] == "duckdb"
+
+    done = _wait(client, job["id"])
+    assert done["status"] == "succeeded"
+    assert done["progress"]["rows"] == 3
+    assert done["expires_at"] > done["finished_at"]
+
+    result = client.get(f"/jobs/{job['id']}/result").json()
+    assert result["columns"] == ["carrier", "flight_count"]
+    assert result["total_rows"] == 3
+    assert result["records"] == [
+        {"carrier": "AA", "flight_count": 10},
+        {"carrier": "DL", "flight_count": 10},
+        {"carrier": "UA", "flight_count": 10},
+    ]
+
+    sliced = client.get(f"/jobs/{job['id']}/result", params={"offset": 1, "limit": 1}).json()
+    assert sliced["records"] == [{"carrier": "DL", "flight_count": 10}]
+    assert sliced["returned_rows"] == 1
+
+
+def test_job_result_as_arrow_and_parquet(client):
+    job = _submit(client, dimensions=["carrier"], measures=["avg_delay"])
+    _wait(client, job["id"])
+
+    arrow = client.get(f"/jobs/{job['id']}/result", params={"format": "arrow"})
+    assert arrow.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(arrow.content).read_all()
+    assert table.num_rows == 3
+
+    parquet = client.get(f"/jobs/{job['id']}/result", params={"format": "parquet"})
+    assert parquet.headers["content-type"] == "application/vnd.apache.parquet"
+    assert pq.read_table(io.BytesIO(parquet.content)).equals(table)
+
+
+def test_json_pages_read_only_their_row_groups(tmp_path):
+    path = tmp_path / "result.parquet"
+    pq.write_table(pa.table({"n": list(range(10))}), path, row_group_size=3)
+
+    page = read_records(path, offset=4, limit=4)
+    assert page["records"] == [{"n": n} for n in range(4, 8)]
+    assert (page["returned_rows"], page["total_rows"]) == (4, 10)
+    assert read_records(path, offset=9)["records"] == [{"n": 9}]
+    assert read_records(path, offset=12)["returned_rows"] == 0
+
+
+def test_json_page_size_is_capped(client):
+    job = _submit(client, measures=["flight_count"])
+    _wait(client, job["id"])
+    response = client.get(f"/jobs/{job['id']}/result", params={"limit": MAX_JSON_PAGE_ROWS + 1})
+    assert response.status_code == 400
+
+
+def test_failed_job_reports_its_error(client):
+    job = _submit(client, measures=["missing_measure"])
+    done = _wait(client, job["id"])
+
+    assert done["status"] == "failed"
+    assert "missing_measure" in done["error"]
+    assert client.get(f"/jobs/{job['id']}/result").status_code == 409
+
+
+def test_cancel_queued_job_and_delete_finished_one(client, flights):
+    jobs = client.app.state.jobs
+    release = threading.Event()
+    # Occupy the backend's only job worker so the next job stays queued.
+    blocker = jobs.submit(
+        "flights",
+        lambda: release.wait(10) and flights.query(measures=["flight_count"]),
+        client.app.state.execution.backend_of(flights),
+    )
+    queued = _submit(client, measures=["flight_count"])
+
+    cancelled = client.delete(f"/jobs/{queued['id']}").json()
+    assert cancelled["status"] == "cancelled"
+
+    release.set()
+    finished = _wait(client, blocker.id)
+    assert finished["status"] in ("succeeded", "failed")
+    assert client.delete(f"/jobs/{blocker.id}").status_code == 200
+    assert client.get(f"/jobs/{blocker.id}").status_code == 404
+    assert not list(jobs.result_dir.glob(f"{blocker.id}*"))
+
+
+def test_jobs_are_capped_per_backend(flights, tmp_path):
+    jobs = JobManager(tmp_path, workers=1, backend_workers={"fast": 2})
+    release = threading.Event()
+    try:
+        blocker = jobs.submit(
+            "flights", lambda: release.wait(10) and flights.query(measures=["flight_count"])
+        )
+        waiting = jobs.submit("flights", lambda: flights.query(measures=["flight_count"]))
+        other = jobs.submit("flights", lambda: flights.query(measures=["flight_count"]), "fast")
+        # The busy backend's only worker holds its next job back, not other backends'.
+        deadline = time.monotonic() + 10
+        while not other.done:
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+        assert other.status == "succeeded"
+        assert waiting.status == "queued"
+        assert blocker.as_dict(jobs.result_ttl)["backend"] == "default"
+    finally:
+        release.set()
+        jobs.shutdown()
+
+    with pytest.raises(ValueError, match="at least 1"):
+        JobManager(tmp_path, backend_workers={"duckdb": 0})
+
+
+def test_finished_jobs_expire(flights, tmp_path):
+    jobs = JobManager(tmp_path, workers=1, result_ttl=0)
+    try:
+        job = jobs.submit("flights", lambda: flights.query(measures=["flight_count"]))
+        deadline = time.monotonic() + 10
+        while not job.done:
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+        assert job.path is not None and job.path.exists()
+        time.sleep(0.01)
+
+        jobs.expire()
+
+        assert jobs.stats()["succeeded"] == 0
+        assert not job.path.exists()
+    finally:
+        jobs.shutdown()
+
+
+def test_jobs_reject_profiling_and_paging(client):
+    for extra in ({"profile": True}, {"page_size": 10}):
+        response = client.post(
+            "/jobs", json={"model_name": "flights", "measures": ["flight_count"], **extra}
+        )
+        assert response.status_code == 400
+    assert client.post("/jobs", json={"model_name": "nope", "measures": ["x"]}).status_code == 404
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_metrics_report_jobs_by_status(client):
+    _wait(client, _submit(client, measures=["flight_count"])["id"])
+    body = client.get("/metrics").text
+    assert 'bsl_jobs{status="succeeded"} 1' in body
@@ -0,0 +1,138 @@
+"""Tests for hot reload of the server's MODELS config."""
+
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from boring_semantic_layer.server.api import create_app
+from boring_semantic_layer.server.loader import load_models
+from boring_semantic_layer.server.reload import ModelReloader, diff_models
+
+CONFIG = """
+import ibis
+
+from boring_semantic_layer import to_semantic_table
+
+tbl = ibis.memtable({{"carrier": ["AA", "UA", "UA"]}})
+flights = (
+    to_semantic_table(tbl, name="flights")
+    .with_dimensions(carrier=lambda t: t.carrier)
+    .with_measures(flight_count=lambda t: t.count())
+)
+carriers = (
+    to_semantic_table(tbl, name="carriers")
+    .with_dimensions(carrier=lambda t: t.carrier)
+    .with_measures({carriers_measure})
+)
+
+MODELS = {{"flights": flights, "carriers": carriers{extra}}}
+"""
+
+
+def _write_config(path, *, carriers_measure="n=lambda t: t.count()", extra=""):
+    path.write_text(CONFIG.format(carriers_measure=carriers_measure, extra=extra))
+    # Make sure the edit is visible to mtime-based polling.
+    stamp = time.time_ns() + 1_000_000_000
+    os.utime(path, ns=(stamp, stamp))
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "semantic_config.py"
+    _write_config(path)
+    return path
+
+
+def test_unchanged_models_keep_their_object(config_path):
+    current = load_models(config_path)
+    _write_config(config_path, carriers_measure="n=lambda t: t.carrier.nunique()")
+
+    diff = diff_models(current, load_models(config_path))
+
+    assert diff.unchanged == ("flights",)
+    assert diff.changed == ("carriers",)
+    assert diff.models["flights"] is current["flights"]
+    assert diff.models["carriers"] is not current["carriers"]
+
+
+def test_added_and_removed_models(config_path):
+    current = {**load_models(config_path), "legacy": object()}
+    _write_config(config_path, extra=', "flights_v2": flights')
+
+    diff = diff_models(current, load_models(config_path))
+
+    assert diff.added == ("flights_v2",)
+    assert diff.removed == ("legacy",)
+    assert set(diff.models) == {"flights", "carriers", "flights_v2"}
+    assert diff.stale == ("legacy",)
+
+
+def test_reloader_polls_for_modified_files(config_path):
+    reloader = ModelReloader(config_path)
+    assert not reloader.poll()
+    _write_config(config_path, extra=', "flights_v2": flights')
+    assert reloader.poll()
+    assert not reloader.poll()
+
+
+def test_reload_picks_up_edited_sibling_modules(tmp_path):
+    helper = tmp_path / "bsl_reload_helper.py"
+    helper.write_text("def measure(t):\n    return t.count()\n")
+    config = tmp_path / "semantic_config.py"
+    config.write_text(
+        "import ibis\n"
+        "from bsl_reload_helper import measure\n"
+        "from boring_semantic_layer import to_semantic_table\n"
+        "tbl = ibis.memtable({'carrier': ['AA', 'UA', 'UA']})\n"
+        "m = to_semantic_table(tbl, name='m').with_measures(n=measure)\n"
+        "MODELS = {'m': m}\n"
+    )
+    reloader = ModelReloader(config)
+    current = load_models(config)
+
+    helper.write_text("def measure(t):\n    return t.carrier.nunique()\n")
+    stamp = time.time_ns() + 1_000_000_000
+    os.utime(helper, ns=(stamp, stamp))
+
+    assert reloader.poll()
+    diff = reloader.reload(current)
+    assert diff.changed == ("m",)
+    assert diff.models["m"].query(measures=["n"]).execute()["n"].tolist() == [2]
+
+
+def test_server_swaps_models_without_restart(config_path):
+    app = create_app(config_path=str(config_path), reload_models=True, reload_interval=0.05)
+    with TestClient(app) as client:
+        assert set(client.get("/models").json()) == {"flights", "carriers"}
+        flights = app.state.models["flights"]
+
+        _write_config(config_path, extra=', "flights_v2": flights')
+        deadline = time.monotonic() + 10
+        while "flights_v2" not in client.get("/models").json():
+            assert time.monotonic() < deadline, "models were not reloaded"
+            time.sleep(0.05)
+
+        assert app.state.models["flights"] is flights
+        response = client.post(
+            "/query", json={"model_name": "flights_v2", "measures": ["flight_count"]}
+        )
+        assert response.json()["records"] == [{"flight_count": 3}]
+
+
+def test_broken_config_keeps_serving_previous_models(config_path):
+    app = create_app(config_path=str(config_path), reload_models=True, reload_interval=0.05)
+    with TestClient(app) as client:
+        models = app.state.models
+        config_path.write_text("MODELS = this is not python\n")
+        time.sleep(0.3)
+        assert app.state.models is models
+        assert client.get("/models").status_code == 200
+
+
+def test_reload_requires_a_config():
+    with pytest.raises(ValueError, match="reload_models"):
+        create_app(models={}, reload_models=True)
@@ -0,0 +1,88 @@
+"""Tests for single-flight coalescing of identical concurrent calls."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from boring_semantic_layer.single_flight import SingleFlight, request_key
+
+
+def test_request_key_is_normalized():
+    assert request_key({"b": 1, "a": [1, 2]}) == request_key({"a": [1, 2], "b": 1})
+    assert request_key({"a": 1}) != request_key({"a": 2})
+
+
+def test_concurrent_threads_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {"rows": 3}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flight.do, "q", compute) for _ in range(8)]
+        while flight.stats().coalesced < 7:
+            threading.Event().wait(0.01)
+        release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    stats = flight.stats()
+    assert (stats.in_flight, stats.executed, stats.coalesced) == (0, 1, 7)
+
+
+def test_sequential_calls_are_not_shared():
+    flight = SingleFlight()
+    assert flight.do("q", lambda: object()) is not flight.do("q", lambda: object())
+    assert flight.stats().executed == 2
+
+
+def test_exception_is_shared_and_key_released():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        flight.do("q", fail)
+    assert flight.do("q", lambda: 1) == 1
+
+
+def test_async_waiters_share_one_task():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("q", compute, 42) for _ in range(5)))
+
+    assert asyncio.run(main()) == [42] * 5
+    assert calls == [42]
+    assert flight.stats().in_flight == 0
+
+
+def test_cancelled_waiter_does_not_cancel_shared_task():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do_async("q", compute))
+        follower = asyncio.ensure_future(flight.do_async("q", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(main()) == "done"
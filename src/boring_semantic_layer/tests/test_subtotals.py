@@ -0,0 +1,97 @@
+"""Tests for ``SemanticAggregate.with_subtotals`` (ROLLUP with a grouping id)."""
+
+import ibis
+import pandas as pd
+import pytest
+
+from boring_semantic_layer import QueryError, to_semantic_table
+
+KEYS = ["carrier", "origin"]
+
+
+@pytest.fixture
+def con():
+    return ibis.duckdb.connect(":memory:")
+
+
+@pytest.fixture
+def flights(con):
+    tbl = con.create_table(
+        "flights",
+        pd.DataFrame(
+            {
+                "carrier": ["AA", "AA", "UA", "UA", "AA", None, "UA"],
+                "origin": ["JFK", "LAX", "JFK", "JFK", "SFO", "LAX", None],
+                "distance": [100.0, 200.0, 300.0, 400.0, 500.0, 50.0, 70.0],
+            }
+        ),
+    )
+    return (
+        to_semantic_table(tbl, name="flights")
+        .with_dimensions(carrier=lambda t: t.carrier, origin=lambda t: t.origin)
+        .with_measures(
+            flight_count=lambda t: t.count(),
+            total_distance=lambda t: t.distance.sum(),
+            avg_distance=lambda t: t.distance.mean(),
+            origins=lambda t: t.origin.nunique(),
+        )
+    )
+
+
+def _scans(con, expr):
+    plan = con.raw_sql(f"EXPLAIN {expr.sql()}").fetchall()[0][1]
+    return plan.count("SEQ_SCAN")
+
+
+def _level(df, grouping_id, keys):
+    rows = df[df["grouping_id"] == grouping_id].drop(columns="grouping_id")
+    rows = rows.drop(columns=[key for key in KEYS if key not in keys])
+    return rows.sort_values(keys, na_position="first").reset_index(drop=True) if keys else rows
+
+
+@pytest.mark.parametrize(
+    "measures",
+    [["flight_count", "total_distance", "avg_distance"], ["flight_count", "origins"]],
+    ids=["mergeable", "holistic"],
+)
+def test_levels_match_individual_queries(flights, measures):
+    df = flights.query(dimensions=KEYS, measures=measures).with_subtotals().execute()
+
+    assert list(df.columns) == [*KEYS, "grouping_id", *measures]
+    assert sorted(df["grouping_id"].unique()) == [0, 1, 3]
+    for grouping_id, keys in [(0, KEYS), (1, ["carrier"]), (3, [])]:
+        expected = flights.query(dimensions=keys, measures=measures).execute()
+        if keys:
+            expected = expected.sort_values(keys, na_position="first").reset_index(drop=True)
+        pd.testing.assert_frame_equal(
+            _level(df, grouping_id, keys).reset_index(drop=True),
+            expected[[*keys, *measures]].reset_index(drop=True),
+            check_dtype=False,
+        )
+
+
+def test_mergeable_subtotals_read_the_table_once(con, flights):
+    query = flights.query(dimensions=KEYS, measures=["flight_count", "avg_distance"])
+    assert _scans(con, query.with_subtotals()) == 1
+
+    holistic = flights.query(dimensions=KEYS, measures=["origins"])
+    assert _scans(con, holistic.with_subtotals()) == 3
+
+
+def test_null_member_is_not_a_subtotal(flights):
+    df = (
+        flights.query(dimensions=KEYS, measures=["flight_count"])
+        .with_subtotals(grouping_id="level")
+        .execute()
+    )
+    null_origin = df[df["origin"].isna()]
+    assert sorted(null_origin["level"]) == [0, 1, 1, 1, 3]
+    assert null_origin[null_origin["level"] == 0][["carrier", "flight_count"]].values.tolist() == [
+        ["UA", 1]
+    ]
+
+
+def test_grouping_id_must_not_collide(flights):
+    query = flights.query(dimensions=KEYS, measures=["flight_count"])
+    with pytest.raises(QueryError, match="carrier"):
+        query.with_subtotals(grouping_id="carrier")
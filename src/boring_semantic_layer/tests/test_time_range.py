@@ -0,0 +1,134 @@
+"""Tests for the cached time-range statistics behind ``get_time_range``."""
+
+import datetime as dt
+
+import ibis
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from boring_semantic_layer import register_data_version, to_semantic_table
+from boring_semantic_layer.result_cache import unregister_data_version
+from boring_semantic_layer.time_range import TimeRangeCache, parquet_column_range
+
+
+@pytest.fixture
+def con():
+    return ibis.duckdb.connect(":memory:")
+
+
+def _write_events(path, days, *, row_group_size=2):
+    pq.write_table(
+        pa.table(
+            {
+                "day": pa.array(days, type=pa.date32()),
+                "at": pa.array(
+                    [dt.datetime.combine(day, dt.time(12)) for day in days],
+                    type=pa.timestamp("us"),
+                ),
+                "city": ["Madrid"] * len(days),
+            }
+        ),
+        path,
+        row_group_size=row_group_size,
+    )
+
+
+@pytest.fixture
+def events(con, tmp_path):
+    path = tmp_path / "events.parquet"
+    _write_events(path, [dt.date(2024, 1, d) for d in (5, 1, 20, 9, 13)])
+    tbl = con.read_parquet(path, table_name="events")
+    register_data_version("events", str(path), backend=con)
+    yield path, tbl
+    unregister_data_version("events", backend=con)
+
+
+def _model(tbl):
+    return to_semantic_table(tbl, name="events").with_dimensions(
+        day={"expr": lambda t: t.day, "is_time_dimension": True, "smallest_time_grain": "day"},
+        at={"expr": lambda t: t.at, "is_time_dimension": True, "smallest_time_grain": "day"},
+        local_day={
+            "expr": lambda t: t.at.date(),
+            "is_time_dimension": True,
+            "smallest_time_grain": "day",
+        },
+    )
+
+
+def test_parquet_column_range_spans_row_groups(events):
+    path, _ = events
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+    assert parquet_column_range([str(path)], "day") == (dt.date(2024, 1, 1), dt.date(2024, 1, 20))
+    assert parquet_column_range([str(path)], "missing") is None
+
+
+@pytest.mark.parametrize(
+    "dimension, expected",
+    [
+        ("day", {"start": "2024-01-01", "end": "2024-01-20"}),
+        ("at", {"start": "2024-01-01T12:00:00", "end": "2024-01-20T12:00:00"}),
+    ],
+)
+def test_bare_parquet_column_is_read_from_footers(events, dimension, expected):
+    _, tbl = events
+    time_range = TimeRangeCache().get("events", _model(tbl), dimension)
+    assert time_range.source == "parquet"
+    assert time_range.as_dict() == expected
+
+
+def test_derived_dimension_is_scanned(events):
+    _, tbl = events
+    time_range = TimeRangeCache().get("events", _model(tbl), "local_day")
+    assert time_range.source == "scan"
+    assert time_range.as_dict() == {"start": "2024-01-01", "end": "2024-01-20"}
+
+
+def test_files_of_another_backend_are_not_read(events):
+    other = ibis.duckdb.connect(":memory:")
+    tbl = other.create_table(
+        "events",
+        ibis.memtable(
+            {"day": [dt.date(2025, 6, 1)], "at": [dt.datetime(2025, 6, 1)], "city": ["Lyon"]}
+        ),
+    )
+    time_range = TimeRangeCache().get("events", _model(tbl), "day")
+    assert time_range.source == "scan"
+    assert time_range.as_dict() == {"start": "2025-06-01", "end": "2025-06-01"}
+
+
+def test_unregistered_table_is_scanned(con):
+    tbl = con.create_table(
+        "visits", ibis.memtable({"day": [dt.date(2024, 3, 2), dt.date(2024, 3, 1)]})
+    )
+    model = to_semantic_table(tbl, name="visits").with_dimensions(
+        day={"expr": lambda t: t.day, "is_time_dimension": True, "smallest_time_grain": "day"},
+    )
+    time_range = TimeRangeCache().get("visits", model, "day")
+    assert time_range.source == "scan"
+    assert time_range.as_dict() == {"start": "2024-03-01", "end": "2024-03-02"}
+
+
+def test_cached_until_data_version_changes(events, monkeypatch):
+    import boring_semantic_layer.time_range as time_range_module
+
+    monkeypatch.setattr(time_range_module, "_VERSION_CHECK_INTERVAL", 0.0)
+    path, tbl = events
+    model = _model(tbl)
+    cache = TimeRangeCache()
+    first = cache.get("events", model, "day")
+    assert cache.get("events", model, "day") is first
+
+    _write_events(path, [dt.date(2023, 12, 31), dt.date(2024, 2, 29)])
+    assert cache.get("events", model, "day").as_dict() == {
+        "start": "2023-12-31",
+        "end": "2024-02-29",
+    }
+
+
+def test_max_age_forces_recompute(events):
+    _, tbl = events
+    model = _model(tbl)
+    cache = TimeRangeCache(max_age=0.0)
+    first = cache.get("events", model, "day")
+    assert cache.get("events", model, "day") is not first
@@ -0,0 +1,47 @@
+"""Tests for query phase tracing."""
+
+import ibis
+
+from boring_semantic_layer import to_semantic_table
+from boring_semantic_layer.tracing import QueryTrace, phase, trace, tracing
+
+
+def test_phases_outside_a_trace_are_not_recorded():
+    assert not tracing()
+    with phase("compile"):
+        pass
+    with trace() as query_trace:
+        assert tracing()
+    assert query_trace.phases == {}
+
+
+def test_reentered_phase_is_timed_once():
+    with trace() as query_trace, phase("compile"):
+        with phase("compile"):
+            pass
+        with phase("sql"):
+            pass
+    assert set(query_trace.phases) == {"compile", "sql"}
+    assert query_trace.phases["compile"] >= query_trace.phases["sql"]
+
+
+def test_query_execution_is_traced_by_phase():
+    model = (
+        to_semantic_table(ibis.memtable({"carrier": ["AA", "UA", "UA"]}), name="flights")
+        .with_dimensions(carrier=lambda t: t.carrier)
+        .with_measures(flight_count=lambda t: t.count())
+    )
+    with trace() as query_trace:
+        result = model.query(dimensions=["carrier"], measures=["flight_count"]).execute()
+
+    assert len(result) == 2
+    assert {"normalize", "compile", "execute"} <= set(query_trace.phases)
+    # SQL is only rendered separately when a trace asks for it.
+    assert "sql" not in query_trace.phases
+    assert "sql" not in query_trace.annotations
+
+    with trace(QueryTrace(capture_sql=True)) as query_trace:
+        model.query(dimensions=["carrier"], measures=["flight_count"]).execute()
+
+    assert "sql" in query_trace.phases
+    assert "SELECT" in query_trace.annotations["sql"].upper()
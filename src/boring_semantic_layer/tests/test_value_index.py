@@ -0,0 +1,245 @@
+"""Tests for the dimension value index behind ``search_dimension_values``."""
+
+import ibis
+import pandas as pd
+import pytest
+
+from boring_semantic_layer import (
+    DimensionValueIndex,
+    DimensionValueIndexStore,
+    QueryError,
+    register_data_version,
+    to_semantic_table,
+)
+from boring_semantic_layer.result_cache import unregister_data_version
+
+CITIES = ["Madrid Centro", "madrid-norte", "Barcelona", "Bilbao"]
+
+
+@pytest.fixture
+def con():
+    return ibis.duckdb.connect(":memory:")
+
+
+def _visits(con, time_type="timestamp"):
+    dates = pd.date_range("2024-01-01", periods=13, freq="D")
+    tbl = con.create_table(
+        "visits",
+        pd.DataFrame(
+            {
+                "city": [*CITIES * 3, "Madrid Centro"],
+                "day": dates.date if time_type == "date" else dates,
+            }
+        ),
+    )
+    return to_semantic_table(tbl, name="visits").with_dimensions(
+        city=lambda t: t.city,
+        day={"expr": lambda t: t.day, "is_time_dimension": True, "smallest_time_grain": "day"},
+    )
+
+
+def _values(result):
+    return [(item["value"], item["count"]) for item in result["values"]]
+
+
+@pytest.fixture
+def index():
+    return DimensionValueIndex.from_counts(
+        {"Madrid Centro": 4, "madrid-norte": 3, "Barcelona": 3, "Bilbao": 2, "New York": 1}
+    )
+
+
+def test_orders_by_frequency(index):
+    assert index.values == ("Madrid Centro", "Barcelona", "madrid-norte", "Bilbao", "New York")
+    result = index.search(limit=2)
+    assert result["total_distinct"] == 5
+    assert result["is_complete"] is False
+    assert _values(result) == [("Madrid Centro", 4), ("Barcelona", 3)]
+
+
+@pytest.mark.parametrize(
+    "term, match, expected",
+    [
+        ("MADRID", "contains", ["Madrid Centro", "madrid-norte"]),
+        ("drid n", "contains", ["madrid-norte"]),
+        ("new_york", "contains", ["New York"]),
+        ("b", "contains", ["Barcelona", "Bilbao"]),
+        ("b", "prefix", ["Barcelona", "Bilbao"]),
+        ("centro", "prefix", []),
+        ("madrid c", "prefix", ["Madrid Centro"]),
+    ],
+)
+def test_lookup_modes(index, term, match, expected):
+    result = index.search(term, limit=10, match=match)
+    assert [item["value"] for item in result["values"]] == expected
+
+
+def test_no_match_falls_back_to_top_values(index):
+    result = index.search("zzz", limit=1)
+    assert result["values"] == []
+    assert result["fallback_top_values"] == [{"value": "Madrid Centro", "count": 4}]
+    assert "zzz" in result["note"]
+
+
+def test_unknown_match_mode(index):
+    with pytest.raises(QueryError, match="prefix"):
+        index.search("a", match="fuzzy")
+
+
+def test_store_matches_warehouse(con):
+    store = DimensionValueIndexStore()
+    result = store.search("visits", _visits(con), "city", "madrid")
+    assert result == {
+        "total_distinct": 4,
+        "is_complete": True,
+        "values": [
+            {"value": "Madrid Centro", "count": 4},
+            {"value": "madrid-norte", "count": 3},
+        ],
+    }
+
+
+@pytest.mark.parametrize("time_type", ["timestamp", "date"])
+def test_refresh_counts_only_new_rows(con, time_type):
+    model = _visits(con, time_type)
+    store = DimensionValueIndexStore()
+    before = store.get("visits", model, "city")
+
+    new_days = pd.to_datetime(["2024-02-01", "2024-02-02"])
+    con.insert(
+        "visits",
+        pd.DataFrame(
+            {
+                "city": ["Bilbao", "Zaragoza"],
+                "day": new_days.date if time_type == "date" else new_days,
+            }
+        ),
+    )
+    assert store.get("visits", model, "city") is before  # nothing marked it stale
+
+    after = store.refresh("visits", model, "city")
+    assert after.watermark.startswith("2024-02-02")
+    assert dict(zip(after.values, after.counts, strict=True)) == {
+        "Madrid Centro": 4,
+        "Bilbao": 4,
+        "madrid-norte": 3,
+        "Barcelona": 3,
+        "Zaragoza": 1,
+    }
+    # A second refresh with no new rows changes nothing.
+    assert store.refresh("visits", model, "city").counts == after.counts
+
+
+def test_data_version_change_triggers_refresh(con, monkeypatch):
+    import boring_semantic_layer.value_index as value_index
+
+    monkeypatch.setattr(value_index, "_VERSION_CHECK_INTERVAL", 0.0)
+    version = [1]
+    register_data_version("visits", lambda: version[0])
+    try:
+        model = _visits(con)
+        store = DimensionValueIndexStore()
+        assert store.get("visits", model, "city").total_distinct == 4
+
+        con.insert(
+            "visits",
+            pd.DataFrame({"city": ["Zaragoza"], "day": pd.to_datetime(["2024-03-01"])}),
+        )
+        assert store.get("visits", model, "city").total_distinct == 4
+        version[0] = 2
+        assert store.get("visits", model, "city").total_distinct == 5
+    finally:
+        unregister_data_version("visits")
+
+
+def test_data_version_change_rebuilds_rewritten_history(con, monkeypatch):
+    import boring_semantic_layer.value_index as value_index
+
+    monkeypatch.setattr(value_index, "_VERSION_CHECK_INTERVAL", 0.0)
+    version = [1]
+    register_data_version("visits", lambda: version[0])
+    try:
+        model = _visits(con)
+        store = DimensionValueIndexStore()
+        assert "Barcelona" in store.get("visits", model, "city").values
+
+        con.raw_sql("DELETE FROM visits WHERE city = 'Barcelona'")
+        con.insert("visits", pd.DataFrame({"city": ["Zaragoza"], "day": [pd.NaT]}))
+        version[0] = 2
+        index = store.get("visits", model, "city")
+        assert "Barcelona" not in index.values
+        assert "Zaragoza" in index.values
+    finally:
+        unregister_data_version("visits")
+
+
+def test_expired_index_is_refreshed_incrementally(con):
+    model = _visits(con)
+    store = DimensionValueIndexStore(max_age=0.0)
+    before = store.get("visits", model, "city")
+
+    con.raw_sql("UPDATE visits SET city = 'Bilbao' WHERE city = 'Barcelona'")
+    con.insert(
+        "visits",
+        pd.DataFrame({"city": ["Zaragoza"], "day": pd.to_datetime(["2024-02-01"])}),
+    )
+    index = store.get("visits", model, "city")
+    assert index is not before
+    assert index.watermark.startswith("2024-02-01")
+    # Only rows from the watermark on are read; rewritten history needs a
+    # data version change (or ``refresh(full=True)``) to be reconciled.
+    assert "Barcelona" in index.values
+    assert dict(zip(index.values, index.counts, strict=True))["Zaragoza"] == 1
+
+
+def test_refresh_counts_late_rows_at_the_watermark(con):
+    model = _visits(con)
+    store = DimensionValueIndexStore()
+    before = store.get("visits", model, "city")
+    assert before.watermark.startswith("2024-01-13")
+
+    con.insert(
+        "visits",
+        pd.DataFrame(
+            {
+                "city": ["Zaragoza", "Zaragoza", "Bilbao"],
+                "day": pd.to_datetime(["2024-01-13", "2024-01-13", "2024-01-14"]),
+            }
+        ),
+    )
+    after = store.refresh("visits", model, "city")
+    counts = dict(zip(after.values, after.counts, strict=True))
+    assert counts == {
+        "Madrid Centro": 4,
+        "madrid-norte": 3,
+        "Barcelona": 3,
+        "Bilbao": 4,
+        "Zaragoza": 2,
+    }
+    # Refreshing again recounts the watermark rows without double counting.
+    assert store.refresh("visits", model, "city").counts == after.counts
+
+
+def test_model_without_time_dimension_is_rebuilt(con):
+    tbl = con.create_table("labels", pd.DataFrame({"label": ["a", "b", "a"]}))
+    model = to_semantic_table(tbl, name="labels").with_dimensions(label=lambda t: t.label)
+    store = DimensionValueIndexStore()
+    assert store.get("labels", model, "label").watermark is None
+
+    con.insert("labels", pd.DataFrame({"label": ["b", "b"]}))
+    index = store.refresh("labels", model, "label")
+    assert dict(zip(index.values, index.counts, strict=True)) == {"b": 3, "a": 2}
+
+
+def test_persisted_index_is_reused(con, tmp_path):
+    model = _visits(con)
+    built = DimensionValueIndexStore(tmp_path).get("visits", model, "city")
+    assert (tmp_path / "visits" / "city.parquet").exists()
+
+    loaded = DimensionValueIndexStore(tmp_path).get("visits", model, "city")
+    assert loaded == built
+
+    # Redefining the dimension invalidates the persisted index.
+    upper = model.with_dimensions(city=lambda t: t.city.upper())
+    rebuilt = DimensionValueIndexStore(tmp_path).get("visits", upper, "city")
+    assert "MADRID CENTRO" in rebuilt.values
@@ -0,0 +1,239 @@
+"""Cached time-range statistics behind ``get_time_range``.
+
+Dashboards ask for a model's time range every time they open, and each
+request ran ``min``/``max`` over the full time column. ``TimeRangeCache``
+keeps the answer per model and time dimension:
+
+* when the time dimension is a plain column of a table registered with
+  parquet files for its backend (see ``result_cache.register_data_version``;
+  profiles register the parquet tables they load), the range is read from the
+  row-group statistics in the parquet footers, without scanning data;
+* otherwise it falls back to one ``min``/``max`` aggregate.
+
+A cached range goes stale when the data version of a source table changes
+or when it is older than ``options.time_range_max_age``.
+"""
+
+from __future__ import annotations
+
+import glob
+import logging
+import threading
+import time
+from collections.abc import Iterable
+from datetime import date, datetime
+from typing import Any, Literal
+
+from attrs import evolve, frozen
+
+from .config import options
+from .expr import _source_tables
+from .result_cache import data_files, data_versions
+
+logger = logging.getLogger(__name__)
+
+_VERSION_CHECK_INTERVAL = 1.0
+
+
+@frozen
+class TimeRange:
+    """Earliest and latest value of a time dimension.
+
+    Attributes:
+        start: Minimum value, ISO formatted.
+        end: Maximum value, ISO formatted.
+        source: ``"parquet"`` when read from footer statistics, ``"scan"``
+            when computed by the backend.
+        built_at: Wall-clock time the range was computed.
+        versions: Data versions of the source tables at that time.
+    """
+
+    start: str
+    end: str
+    source: Literal["parquet", "scan"]
+    built_at: float
+    versions: str
+
+    def as_dict(self) -> dict[str, str]:
+        return {"start": self.start, "end": self.end}
+
+
+def parquet_column_range(paths: Iterable[str], column: str) -> tuple[Any, Any] | None:
+    """``(min, max)`` of ``column`` across parquet files, from footers only.
+
+    Returns ``None`` when any file or row group lacks usable min/max
+    statistics, so callers can fall back to scanning.
+    """
+    import pyarrow.parquet as pq
+
+    low = high = None
+    for path in paths:
+        metadata = pq.ParquetFile(path).metadata
+        leaves = [metadata.schema.column(i).path for i in range(metadata.num_columns)]
+        if column not in leaves:
+            return None
+        position = leaves.index(column)
+        for group in range(metadata.num_row_groups):
+            row_group = metadata.row_group(group)
+            chunk = row_group.column(position)
+            stats = chunk.statistics
+            if stats is not None and stats.null_count == row_group.num_rows:
+                continue  # all-null row group: ignored by min/max too
+            if stats is None or not stats.has_min_max or chunk.physical_type == "INT96":
+                return None
+            low = stats.min if low is None else min(low, stats.min)
+            high = stats.max if high is None else max(high, stats.max)
+    if low is None:
+        return None
+    return low, high
+
+
+def _parquet_files(patterns: Iterable[str]) -> list[str] | None:
+    files: list[str] = []
+    for pattern in patterns:
+        if "://" in pattern:
+            return None
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            return None
+        files.extend(matches)
+    if not files or not all(path.lower().endswith(".parquet") for path in files):
+        return None
+    return files
+
+
+def _footer_range(time_col: Any) -> tuple[Any, Any] | None:
+    """The footer-statistics range of ``time_col``, if it is a bare parquet column."""
+    op = time_col.op()
+    rel = getattr(op, "rel", None)
+    if type(op).__name__ != "Field" or type(rel).__name__ != "DatabaseTable":
+        return None
+    patterns = data_files(rel.name, rel.source)
+    files = _parquet_files(patterns) if patterns else None
+    if files is None:
+        return None
+    dtype = time_col.type()
+    if dtype.is_date():
+        expected: tuple[type, ...] = (date,)
+    elif dtype.is_timestamp() and dtype.timezone is None:
+        expected = (datetime,)
+    else:
+        # Zoned timestamps are rendered in the backend's session time zone.
+        return None
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    try:
+        bounds = parquet_column_range(files, op.name)
+    except (OSError, pa.ArrowException):
+        logger.debug("could not read parquet statistics of %s", rel.name, exc_info=True)
+        return None
+    if bounds is None:
+        return None
+    # A datetime is also a date, so a date column must not yield one; a
+    # naive timestamp column must not yield zoned values.
+    if any(
+        not isinstance(value, expected)
+        or (dtype.is_date() and isinstance(value, datetime))
+        or getattr(value, "tzinfo", None) is not None
+        for value in bounds
+    ):
+        return None
+    return bounds
+
+
+def _to_iso(value: Any, time_col: Any) -> str:
+    # Some backends materialize an Ibis date aggregate as a midnight
+    # pandas Timestamp. Preserve the semantic datatype in the HTTP value.
+    if time_col.type().is_date() and callable(as_date := getattr(value, "date", None)):
+        value = as_date()
+    return value.isoformat()
+
+
+def compute_time_range(model: Any, time_dimension: str, versions: str = "") -> TimeRange:
+    """Compute the range of ``time_dimension`` now, preferring footer statistics."""
+    tbl = model.table
+    time_col = model.get_dimensions()[time_dimension](tbl)
+    started = time.time()
+    bounds = _footer_range(time_col)
+    if bounds is not None:
+        source = "parquet"
+        start, end = bounds
+    else:
+        source = "scan"
+        result = tbl.aggregate(start=time_col.min(), end=time_col.max()).execute()
+        start, end = result["start"].iloc[0], result["end"].iloc[0]
+    return TimeRange(
+        start=_to_iso(start, time_col),
+        end=_to_iso(end, time_col),
+        source=source,
+        built_at=started,
+        versions=versions,
+    )
+
+
+@frozen
+class _Entry:
+    model: Any
+    time_range: TimeRange
+    tables: tuple[tuple[str, Any], ...]
+    checked: float
+
+
+class TimeRangeCache:
+    """Thread-safe cache of ``TimeRange`` per model time dimension.
+
+    Args:
+        max_age: Seconds after which a range is recomputed even if no data
+            version changed. Defaults to ``options.time_range_max_age``.
+    """
+
+    def __init__(self, max_age: float | None = None):
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], _Entry] = {}
+
+    @property
+    def max_age(self) -> float | None:
+        return self._max_age if self._max_age is not None else options.time_range_max_age
+
+    def get(self, model_name: str, model: Any, time_dimension: str) -> TimeRange:
+        """The range of ``model_name.time_dimension``, computed if missing or stale."""
+        key = (model_name, time_dimension)
+        entry = self._entries.get(key)
+        if entry is not None and entry.model is model and not self._stale(key, entry):
+            return entry.time_range
+        tables = tuple(_source_tables(model.table)[0])
+        time_range = compute_time_range(model, time_dimension, repr(data_versions(tables)))
+        logger.debug(
+            "time range %s.%s: %s to %s (%s)",
+            model_name,
+            time_dimension,
+            time_range.start,
+            time_range.end,
+            time_range.source,
+        )
+        with self._lock:
+            self._entries[key] = _Entry(model, time_range, tables, time.monotonic())
+        return time_range
+
+    def invalidate(self, model_name: str | None = None) -> None:
+        """Forget cached ranges of ``model_name`` (all models if ``None``)."""
+        with self._lock:
+            for key in [k for k in self._entries if model_name in (None, k[0])]:
+                del self._entries[key]
+
+    def _stale(self, key: tuple[str, str], entry: _Entry) -> bool:
+        max_age = self.max_age
+        if max_age is not None and time.time() - entry.time_range.built_at > max_age:
+            return True
+        now = time.monotonic()
+        if now - entry.checked < _VERSION_CHECK_INTERVAL:
+            return False
+        if repr(data_versions(entry.tables)) != entry.time_range.versions:
+            return True
+        with self._lock:
+            if self._entries.get(key) is entry:
+                self._entries[key] = evolve(entry, checked=now)
+        return False
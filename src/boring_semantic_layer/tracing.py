@@ -0,0 +1,139 @@
+"""Wall-clock timings of the phases of semantic query processing.
+
+A query goes through distinct phases: building semantic ops from a query
+spec (``normalize``), compiling them to an ibis expression (``compile``),
+generating SQL (``sql``), running it on the backend (``execute``),
+converting the result (``convert``) and rendering a chart (``chart``).
+Code on those paths wraps them in ``phase(name)``; the elapsed time is
+added to every ``QueryTrace`` active in the current context::
+
+    with trace() as t:
+        model.query(measures=["flight_count"]).execute()
+    t.phases  # {"normalize": ..., "compile": ..., "execute": ...}
+
+Long compile functions additionally time their steps as sub-phases named
+``<phase>.<step>`` (e.g. ``compile.preagg.combine``) with ``laps``.
+
+Without an active trace, ``phase`` costs one context-variable lookup. The
+SQL is only generated separately (phase ``sql``) for a trace created with
+``capture_sql=True``, as query profiling does; otherwise the backend
+compiles the query once, as it runs it.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from attrs import define, field
+
+PHASES = ("normalize", "compile", "sql", "execute", "convert", "chart")
+
+_ACTIVE: ContextVar[tuple[QueryTrace, ...]] = ContextVar("bsl_query_traces", default=())
+
+
+@define
+class QueryTrace:
+    """Phase timings (seconds) and annotations collected while active.
+
+    A phase entered again while already open (e.g. compiling a
+    sub-expression during compilation) is only timed at the outermost level.
+    Sub-phases (names containing a dot) overlap their phase and nest in each
+    other, so only top-level phases add up to ``total``.
+
+    With ``capture_sql``, the SQL of executed queries is rendered up front
+    and attached as annotation ``sql``, which compiles each query twice.
+    """
+
+    phases: dict[str, float] = field(factory=dict)
+    annotations: dict[str, Any] = field(factory=dict)
+    capture_sql: bool = False
+    _open: dict[str, int] = field(factory=dict, repr=False)
+
+    @property
+    def total(self) -> float:
+        return sum(seconds for name, seconds in self.phases.items() if "." not in name)
+
+    def _add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+def tracing() -> bool:
+    """Whether a ``QueryTrace`` is active in the current context."""
+    return bool(_ACTIVE.get())
+
+
+def capturing_sql() -> bool:
+    """Whether an active ``QueryTrace`` wants the SQL of executed queries."""
+    return any(query_trace.capture_sql for query_trace in _ACTIVE.get())
+
+
+@contextmanager
+def trace(query_trace: QueryTrace | None = None) -> Iterator[QueryTrace]:
+    """Collect phase timings of the enclosed code into ``query_trace``.
+
+    A new ``QueryTrace`` is created when none is given; passing one lets a
+    caller on another thread read the timings after the work is handed off.
+    """
+    if query_trace is None:
+        query_trace = QueryTrace()
+    token = _ACTIVE.set((*_ACTIVE.get(), query_trace))
+    try:
+        yield query_trace
+    finally:
+        _ACTIVE.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the enclosed code as phase ``name`` of the active traces."""
+    traces = _ACTIVE.get()
+    if not traces:
+        yield
+        return
+    for query_trace in traces:
+        query_trace._open[name] = query_trace._open.get(name, 0) + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for query_trace in traces:
+            depth = query_trace._open[name] = query_trace._open[name] - 1
+            if not depth:
+                query_trace._add(name, elapsed)
+
+
+def _no_lap(step: str) -> None:
+    pass
+
+
+def laps(prefix: str) -> Callable[[str], None]:
+    """A recorder of consecutive steps of a long function.
+
+    Each ``lap(step)`` adds the time since the previous lap (or since
+    ``laps`` was called) to sub-phase ``<prefix>.<step>`` of the traces
+    active when ``laps`` was called.
+    """
+    traces = _ACTIVE.get()
+    if not traces:
+        return _no_lap
+    last = time.perf_counter()
+
+    def lap(step: str) -> None:
+        nonlocal last
+        now = time.perf_counter()
+        for query_trace in traces:
+            query_trace._add(f"{prefix}.{step}", now - last)
+        last = now
+
+    return lap
+
+
+def annotate(key: str, value: Any) -> None:
+    """Attach ``key=value`` to the active traces (no-op without one)."""
+    for query_trace in _ACTIVE.get():
+        query_trace.annotations[key] = value
@@ -0,0 +1,481 @@
+"""Materialized value/frequency indexes for dimension value search.
+
+Autocomplete calls ``search_dimension_values`` on every keystroke. Running
+a ``GROUP BY`` plus a distinct count over the base table each time makes
+every keystroke a warehouse round trip. ``DimensionValueIndex`` holds the
+distinct values of one dimension with their frequencies in memory:
+
+* substring lookup scans the normalized values in frequency order and stops
+  as soon as ``limit + 1`` matches are found;
+* prefix lookup bisects a sorted array of the normalized values and keeps
+  the most frequent matches.
+
+``DimensionValueIndexStore`` builds an index on first use and keeps it fresh.
+An index is rebuilt when the data version of a source table changes (see
+``result_cache.register_data_version``), so rewritten, updated or deleted
+rows are reconciled. An index older than ``options.value_index_max_age`` is
+refreshed the cheap way, as is one passed to ``refresh``: when the model has
+a time dimension only the rows from the index's *watermark* (the largest
+time value already counted) on are aggregated and their counts added —
+rows at the watermark itself are recounted, so late arrivals with that time
+value are not missed; otherwise the index is rebuilt. With
+``options.value_index_dir`` set, indexes are also written there as parquet,
+so a restarted server starts warm.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from itertools import islice
+from pathlib import Path
+from typing import Any, Literal
+from urllib.parse import quote
+
+from attrs import evolve, field, frozen
+from ibis.common.collections import FrozenDict
+
+from ._xorq import get_ibis_module
+from .config import options
+from .errors import QueryError, SerializationError
+from .expr import _source_tables
+from .query import _find_any_time_dimension
+from .result_cache import data_versions
+
+logger = logging.getLogger(__name__)
+
+MatchMode = Literal["contains", "prefix"]
+
+_SEPARATORS = re.compile(r"[\s\-_.,]+")
+_METADATA_KEY = b"bsl_value_index"
+_VERSION_CHECK_INTERVAL = 1.0
+
+
+def normalize_value(value: str) -> str:
+    """Lowercase ``value`` and collapse separator runs (space, ``-_.,``) to a space."""
+    return _SEPARATORS.sub(" ", value.lower()).strip()
+
+
+@frozen
+class DimensionValueIndex:
+    """Distinct values of one dimension with their frequencies.
+
+    Build one with ``from_counts``; values are kept in descending frequency
+    order (ties by value) so the top of any lookup is the most frequent.
+
+    Attributes:
+        values: Distinct values, most frequent first.
+        counts: Frequency of each value, aligned with ``values``.
+        watermark: Largest time-dimension value counted, as text, or ``None``
+            when the index can only be rebuilt.
+        watermark_counts: Frequencies counted from rows at ``watermark``;
+            the next refresh recounts those rows and subtracts these.
+        built_at: Wall-clock time of the last build or refresh.
+        versions: Data versions of the source tables at that time.
+        definition: Fingerprint of the model the index was built from.
+    """
+
+    values: tuple[str, ...]
+    counts: tuple[int, ...]
+    watermark: str | None = None
+    watermark_counts: Mapping[str, int] = field(factory=FrozenDict, converter=FrozenDict)
+    built_at: float = field(factory=time.time)
+    versions: str | None = None
+    definition: str | None = None
+    _keys: tuple[str, ...] = field(init=False, repr=False, eq=False)
+    _sorted_keys: tuple[str, ...] = field(init=False, repr=False, eq=False)
+    _sorted_ranks: tuple[int, ...] = field(init=False, repr=False, eq=False)
+
+    def __attrs_post_init__(self):
+        keys = tuple(normalize_value(value) for value in self.values)
+        by_key = sorted(range(len(keys)), key=keys.__getitem__)
+        object.__setattr__(self, "_keys", keys)
+        object.__setattr__(self, "_sorted_keys", tuple(keys[rank] for rank in by_key))
+        object.__setattr__(self, "_sorted_ranks", tuple(by_key))
+
+    @classmethod
+    def from_counts(cls, counts: Mapping[str, int], **kwargs: Any) -> DimensionValueIndex:
+        """Index a ``{value: frequency}`` mapping."""
+        ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return cls(
+            values=tuple(value for value, _ in ordered),
+            counts=tuple(count for _, count in ordered),
+            **kwargs,
+        )
+
+    @property
+    def total_distinct(self) -> int:
+        return len(self.values)
+
+    def merged(self, counts: Mapping[str, int], **kwargs: Any) -> DimensionValueIndex:
+        """A new index with ``counts`` added to the frequencies of this one.
+
+        Values whose frequency drops to zero are removed.
+        """
+        totals = dict(zip(self.values, self.counts, strict=True))
+        for value, count in counts.items():
+            totals[value] = totals.get(value, 0) + count
+        totals = {value: count for value, count in totals.items() if count > 0}
+        return self.from_counts(totals, **{"definition": self.definition, **kwargs})
+
+    def lookup(
+        self,
+        search_term: str | None = None,
+        limit: int | None = None,
+        match: MatchMode = "contains",
+    ) -> list[int]:
+        """Ranks of the values matching ``search_term``, most frequent first.
+
+        At most ``limit`` ranks are returned; ``None`` returns every match.
+        """
+        if limit is not None and limit < 0:
+            raise QueryError(f"limit must be non-negative, got {limit}")
+        if not search_term:
+            return list(range(len(self.values) if limit is None else min(limit, len(self.values))))
+        term = normalize_value(search_term)
+        if match == "contains":
+            hits = (rank for rank, key in enumerate(self._keys) if term in key)
+            return list(islice(hits, limit))
+        if match == "prefix":
+            low = bisect.bisect_left(self._sorted_keys, term)
+            high = bisect.bisect_right(self._sorted_keys, term + "\U0010ffff", lo=low)
+            ranks = self._sorted_ranks[low:high]
+            return sorted(ranks) if limit is None else heapq.nsmallest(limit, ranks)
+        raise QueryError(f"match must be 'contains' or 'prefix', got {match!r}")
+
+    def search(
+        self,
+        search_term: str | None = None,
+        limit: int = 20,
+        match: MatchMode = "contains",
+    ) -> dict[str, Any]:
+        """Most frequent values matching ``search_term``.
+
+        Matching ignores case and treats runs of spaces, ``-``, ``_``, ``.``
+        and ``,`` as one space. When nothing matches, the top values are
+        returned under ``fallback_top_values`` with a note.
+        """
+        ranks = self.lookup(search_term, limit + 1, match)
+        if search_term and not ranks:
+            top = self.lookup(None, limit + 1)
+            return {
+                "total_distinct": self.total_distinct,
+                "is_complete": len(top) <= limit,
+                "values": [],
+                "fallback_top_values": self._entries(top[:limit]),
+                "note": (
+                    f"No matches found for '{search_term}'. "
+                    "Showing top values for reference; use one of these exact spellings."
+                ),
+            }
+        return {
+            "total_distinct": self.total_distinct,
+            "is_complete": len(ranks) <= limit,
+            "values": self._entries(ranks[:limit]),
+        }
+
+    def _entries(self, ranks: Iterable[int]) -> list[dict[str, Any]]:
+        return [{"value": self.values[rank], "count": self.counts[rank]} for rank in ranks]
+
+    def save(self, path: str | os.PathLike) -> None:
+        """Write the index to ``path`` as parquet (atomically)."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        metadata = {
+            "watermark": self.watermark,
+            "watermark_counts": self.watermark_counts,
+            "built_at": self.built_at,
+            "versions": self.versions,
+            "definition": self.definition,
+        }
+        table = pa.table(
+            {
+                "value": pa.array(self.values, type=pa.string()),
+                "count": pa.array(self.counts, type=pa.int64()),
+            }
+        ).replace_schema_metadata({_METADATA_KEY: json.dumps(metadata).encode()})
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> DimensionValueIndex:
+        """Read an index written by ``save``."""
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+        raw = (table.schema.metadata or {}).get(_METADATA_KEY)
+        if raw is None:
+            raise SerializationError(f"{os.fspath(path)!r} is not a dimension value index")
+        metadata = json.loads(raw)
+        return cls(
+            values=tuple(table.column("value").to_pylist()),
+            counts=tuple(table.column("count").to_pylist()),
+            **metadata,
+        )
+
+
+def _value_counts(tbl, value_expr, where=None, edge=None) -> tuple[dict[str, int], dict[str, int]]:
+    """Frequencies of ``value_expr`` over the rows matching ``where``.
+
+    Returns all counts and the counts of the rows matching ``edge`` alone,
+    from one aggregation.
+    """
+    mod = get_ibis_module(tbl)
+    rows = tbl if where is None else tbl.filter(where)
+    rows = rows.select(
+        value_expr.name("_value"),
+        (mod.literal(False) if edge is None else edge.fill_null(False)).name("_edge"),
+    )
+    agg = (
+        rows.filter(lambda t: t["_value"].notnull())
+        .group_by(["_value", "_edge"])
+        .aggregate(frequency=lambda t: t.count())
+    )
+    result = agg.to_pyarrow()
+    counts: dict[str, int] = {}
+    edge_counts: dict[str, int] = {}
+    for value, at_edge, count in zip(
+        result.column("_value").to_pylist(),
+        result.column("_edge").to_pylist(),
+        result.column("frequency").to_pylist(),
+        strict=True,
+    ):
+        counts[str(value)] = counts.get(str(value), 0) + int(count)
+        if at_edge:
+            edge_counts[str(value)] = int(count)
+    return counts, edge_counts
+
+
+def _definition(model: Any) -> str | None:
+    try:
+        return model.fingerprint()
+    except SerializationError:
+        return None
+
+
+@frozen
+class _Entry:
+    model: Any
+    index: DimensionValueIndex
+    tables: tuple[tuple[str, Any], ...]
+    checked: float
+
+
+class DimensionValueIndexStore:
+    """Thread-safe cache of ``DimensionValueIndex`` per model dimension.
+
+    Args:
+        directory: Where indexes are persisted as
+            ``<directory>/<model>/<dimension>.parquet``. Defaults to
+            ``options.value_index_dir``; ``None`` keeps them in memory only.
+        max_age: Seconds after which an index is refreshed (see ``refresh``)
+            even if no data version changed. Defaults to
+            ``options.value_index_max_age``.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike | None = None,
+        max_age: float | None = None,
+    ):
+        self._directory = directory
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._build_locks: dict[tuple[str, str], threading.Lock] = {}
+        self._entries: dict[tuple[str, str], _Entry] = {}
+
+    @property
+    def directory(self) -> Path | None:
+        directory = self._directory if self._directory is not None else options.value_index_dir
+        return Path(directory) if directory is not None else None
+
+    @property
+    def max_age(self) -> float | None:
+        return self._max_age if self._max_age is not None else options.value_index_max_age
+
+    def search(
+        self,
+        model_name: str,
+        model: Any,
+        dimension: str,
+        search_term: str | None = None,
+        limit: int = 20,
+        match: MatchMode = "contains",
+    ) -> dict[str, Any]:
+        """Search the values of ``model_name.dimension``; see ``DimensionValueIndex.search``."""
+        return self.get(model_name, model, dimension).search(search_term, limit, match)
+
+    def get(self, model_name: str, model: Any, dimension: str) -> DimensionValueIndex:
+        """The index of ``dimension``, built, loaded or refreshed as needed."""
+        key = (model_name, dimension)
+        entry = self._entries.get(key)
+        if entry is not None and entry.model is model and self._stale(key, entry) is None:
+            return entry.index
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.model is not model:
+                return self._open(model_name, model, dimension).index
+            if (reason := self._stale(key, entry)) is not None:
+                return self._update(model_name, entry, dimension, full=reason == "versions").index
+            return entry.index
+
+    def refresh(
+        self, model_name: str, model: Any, dimension: str, *, full: bool = False
+    ) -> DimensionValueIndex:
+        """Bring the index up to date now.
+
+        By default only rows appended past the watermark are counted; pass
+        ``full=True`` after history was rewritten or deleted.
+        """
+        key = (model_name, dimension)
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.model is not model:
+                entry = self._open(model_name, model, dimension)
+            return self._update(model_name, entry, dimension, full=full).index
+
+    def invalidate(self, model_name: str | None = None) -> None:
+        """Forget in-memory indexes of ``model_name`` (all models if ``None``)."""
+        with self._lock:
+            for key in [k for k in self._entries if model_name in (None, k[0])]:
+                del self._entries[key]
+
+    def _stale(self, key: tuple[str, str], entry: _Entry) -> Literal["versions", "age"] | None:
+        """Why ``entry`` needs updating: a data version changed, it aged, or ``None``."""
+        now = time.monotonic()
+        # Stat-ing sources on every keystroke would cost more than the lookup.
+        if now - entry.checked >= _VERSION_CHECK_INTERVAL:
+            if repr(data_versions(entry.tables)) != entry.index.versions:
+                return "versions"
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    self._entries[key] = evolve(entry, checked=now)
+        max_age = self.max_age
+        if max_age is not None and time.time() - entry.index.built_at > max_age:
+            return "age"
+        return None
+
+    def _path(self, model_name: str, dimension: str) -> Path | None:
+        directory = self.directory
+        if directory is None:
+            return None
+        return directory / quote(model_name, safe="") / f"{quote(dimension, safe='')}.parquet"
+
+    def _open(self, model_name: str, model: Any, dimension: str) -> _Entry:
+        tables = tuple(_source_tables(model.table)[0])
+        definition = _definition(model)
+        path = self._path(model_name, dimension) if definition is not None else None
+        if path is not None and path.exists():
+            import pyarrow as pa
+
+            try:
+                index = DimensionValueIndex.load(path)
+            except (OSError, pa.ArrowException, SerializationError, ValueError):
+                logger.warning("ignoring unreadable value index %s", path, exc_info=True)
+            else:
+                if index.definition == definition:
+                    entry = self._remember(model_name, dimension, _Entry(model, index, tables, 0.0))
+                    reason = self._stale((model_name, dimension), entry)
+                    if reason is not None:
+                        entry = self._update(
+                            model_name, entry, dimension, full=reason == "versions"
+                        )
+                    return entry
+        return self._update(
+            model_name,
+            _Entry(model, DimensionValueIndex((), (), definition=definition), tables, 0.0),
+            dimension,
+            full=True,
+        )
+
+    def _update(self, model_name: str, entry: _Entry, dimension: str, *, full: bool) -> _Entry:
+        model, index = entry.model, entry.index
+        dims = model.get_dimensions()
+        tbl = model.table
+        value_expr = dims[dimension](tbl)
+        time_name = _find_any_time_dimension(model)
+        versions = repr(data_versions(entry.tables))
+        started = time.time()
+
+        if time_name is None:
+            index = DimensionValueIndex.from_counts(
+                _value_counts(tbl, value_expr)[0],
+                built_at=started,
+                versions=versions,
+                definition=index.definition,
+            )
+        else:
+            time_col = dims[time_name](tbl)
+            mod = get_ibis_module(tbl)
+            high = tbl.select(time_col.name("_time"))["_time"].max().execute()
+            if time_col.type().is_date() and callable(as_date := getattr(high, "date", None)):
+                high = as_date()
+            watermark = None if high is None or high != high else str(high)
+            upper = mod.literal(watermark).cast(time_col.type()) if watermark else None
+            edge = None if upper is None else time_col == upper
+            if full or index.watermark is None:
+                # Rows past the watermark are left for the next incremental refresh.
+                where = None if upper is None else (time_col <= upper) | time_col.isnull()
+                counts, edge_counts = _value_counts(tbl, value_expr, where, edge)
+                index = DimensionValueIndex.from_counts(
+                    counts,
+                    watermark=watermark,
+                    watermark_counts=edge_counts,
+                    built_at=started,
+                    versions=versions,
+                    definition=index.definition,
+                )
+            elif upper is not None:
+                # Recount the rows at the old watermark, minus what they
+                # contributed last time, so late rows with that time count.
+                lower = mod.literal(index.watermark).cast(time_col.type())
+                delta, edge_counts = _value_counts(
+                    tbl, value_expr, (time_col >= lower) & (time_col <= upper), edge
+                )
+                for value, count in index.watermark_counts.items():
+                    delta[value] = delta.get(value, 0) - count
+                index = index.merged(
+                    delta,
+                    watermark=watermark,
+                    watermark_counts=edge_counts,
+                    built_at=started,
+                    versions=versions,
+                )
+            else:
+                index = evolve(index, built_at=started, versions=versions)
+        logger.debug(
+            "value index %s.%s: %d values (%s)",
+            model_name,
+            dimension,
+            index.total_distinct,
+            "full" if full else "refresh",
+        )
+        entry = self._remember(
+            model_name, dimension, _Entry(model, index, entry.tables, time.monotonic())
+        )
+        if (path := self._path(model_name, dimension)) is not None and index.definition:
+            try:
+                index.save(path)
+            except OSError:
+                logger.warning("could not persist value index to %s", path, exc_info=True)
+        return entry
+
+    def _remember(self, model_name: str, dimension: str, entry: _Entry) -> _Entry:
+        with self._lock:
+            self._entries[(model_name, dimension)] = entry
+        return entry